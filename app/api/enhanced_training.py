@@ -1,11 +1,17 @@
 from fastapi import APIRouter, UploadFile, File, BackgroundTasks, WebSocket, HTTPException, Query, Form
 from fastapi.responses import JSONResponse
 from app.preprocessing.profiler import DataProfiler, AutoFeatureEngineer
+from app.preprocessing.column_stats import TEXT_DTYPES, compute_csv_column_stats, is_text_dtype
+from app.preprocessing.ingest import fill_text
 from app.training.advanced_trainer import AdvancedModelTrainer
+from app.storage.dataset_cache import DatasetCache, content_key
 import pandas as pd
 import asyncio
 import json
-import io
+import os
+import shutil
+import tempfile
+import uuid
 from typing import Optional
 import numpy as np
 from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
@@ -26,71 +32,142 @@ router = APIRouter(prefix="/api/training", tags=["enhanced-training"])
 training_progress = {}
 training_results = {}
 
+# Store full-data analyses that refine quick (sampled) ones
+analysis_results = {}
+
+# Parsed uploads and their derived results, keyed by content hash
+dataset_cache = DatasetCache()
+
 @router.post("/analyze")
-async def analyze_dataset(file: UploadFile = File(...)):
+async def analyze_dataset(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    quick: bool = Query(False, description="Return sampled estimates now and refine them in the background")
+):
     """Analyze uploaded dataset and return insights."""
     try:
         if not file.filename.endswith('.csv'):
             raise HTTPException(status_code=400, detail="Only CSV files are supported")
         
-        # Read CSV
-        content = await file.read()
-        df = pd.read_csv(io.StringIO(content.decode('utf-8')))
-        
-        if df.empty:
+        if quick:
+            # Sample by random seeks so multi-GB uploads answer in well under a second
+            profile = DataProfiler().quick_profile_csv(file.file)
+            if profile['shape'][0] == 0:
+                raise HTTPException(status_code=400, detail="Uploaded file is empty")
+            
+            analysis_id = f"analysis_{uuid.uuid4().hex[:12]}"
+            with tempfile.NamedTemporaryFile(suffix='.csv', delete=False) as spooled:
+                shutil.copyfileobj(file.file, spooled)
+            analysis_results[analysis_id] = {"status": "running", "filename": file.filename}
+            background_tasks.add_task(refine_analysis, analysis_id, spooled.name, file.filename)
+            
+            result = _build_upload_analysis(
+                file.filename, profile['shape'][0], profile['shape'][1], profile['missing_values'],
+                profile['unique_counts'], profile['numeric_cols'], profile['categorical_cols']
+            )
+            intervals = profile['confidence_intervals']
+            result.update({
+                "is_estimate": profile['is_estimate'],
+                "analysis_id": analysis_id,
+                "sample_size": profile['sample_size'],
+                "confidence": profile['confidence'],
+                "confidence_intervals": {key: intervals[key]
+                                         for key in ('row_count', 'missing_percentage', 'unique_counts')}
+            })
+            return result
+        
+        # Stream the spooled upload in chunks instead of decoding it into one string
+        stats = dataset_cache.get_or_compute(content_key(file.file), 'column_stats',
+                                             lambda: compute_csv_column_stats(file.file))
+        
+        if stats['n_rows'] == 0:
             raise HTTPException(status_code=400, detail="Uploaded file is empty")
         
-        # Create comprehensive profile for frontend compatibility
-        profile = {
-            "shape": [len(df), len(df.columns)],
-            "missing_values": df.isnull().sum().to_dict(),
-            "data_quality_score": round((1 - df.isnull().sum().sum() / (len(df) * len(df.columns))) * 100, 1),
-            "recommendations": [],
-            "statistical_summary": {
-                "numeric_columns": df.select_dtypes(include=[np.number]).columns.tolist(),
-                "categorical_columns": df.select_dtypes(include=['object']).columns.tolist(),
-                "total_missing": int(df.isnull().sum().sum())
-            },
-            "feature_importance_estimate": {}
-        }
-        
-        # Add recommendations
-        recommendations = []
-        
-        # Target column suggestions
-        for col in df.columns:
-            unique_vals = df[col].nunique()
-            if unique_vals < len(df) * 0.1 and unique_vals > 1:
-                recommendations.append(f"'{col}' could be target (classification)")
-        
-        if df.isnull().sum().sum() > 0:
-            recommendations.append("Handle missing values")
-        
-        numeric_cols = df.select_dtypes(include=[np.number]).columns
-        if len(numeric_cols) > 0:
-            recommendations.append("Scale numeric features")
-            
-        categorical_cols = df.select_dtypes(include=['object']).columns
-        if len(categorical_cols) > 0:
-            recommendations.append("Encode categorical variables")
+        return _build_upload_analysis(
+            file.filename, stats['n_rows'], stats['n_cols'], stats['missing'],
+            stats['nunique'], stats['numeric_cols'], stats['categorical_cols']
+        )
         
-        profile["recommendations"] = recommendations
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error analyzing file: {str(e)}")
+
+@router.get("/analyze/{analysis_id}")
+async def get_refined_analysis(analysis_id: str):
+    """Get the full-data analysis that refines a quick (sampled) analysis"""
+    if analysis_id not in analysis_results:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    
+    return analysis_results[analysis_id]
+
+async def refine_analysis(analysis_id: str, path: str, filename: str):
+    """Background full-data analysis replacing the sampled estimates"""
+    try:
+        stats = await asyncio.to_thread(compute_csv_column_stats, path)
+        result = _build_upload_analysis(
+            filename, stats['n_rows'], stats['n_cols'], stats['missing'],
+            stats['nunique'], stats['numeric_cols'], stats['categorical_cols']
+        )
+        result.update({"is_estimate": False, "analysis_id": analysis_id})
+        analysis_results[analysis_id] = result
         
-        return {
-            "status": "success",
-            "filename": file.filename,
-            "profile": profile,
-            "summary": {
-                "total_rows": len(df),
-                "total_columns": len(df.columns),
-                "data_quality_score": profile["data_quality_score"],
-                "missing_data_percentage": (df.isnull().sum().sum() / df.size) * 100,
-                "recommendation_count": len(recommendations)
-            }
+    except Exception as e:
+        analysis_results[analysis_id] = {
+            "status": "failed",
+            "error": f"Analysis failed: {str(e)}"
         }
+    finally:
+        os.remove(path)
+
+def _build_upload_analysis(filename: str, n_rows: int, n_cols: int, missing: dict, nunique: dict,
+                           numeric_cols: list, categorical_cols: list) -> dict:
+    """Frontend-compatible analysis response from column statistics"""
+    total_missing = sum(missing.values())
+    
+    # Create comprehensive profile for frontend compatibility
+    profile = {
+        "shape": [n_rows, n_cols],
+        "missing_values": missing,
+        "data_quality_score": round((1 - total_missing / (n_rows * n_cols)) * 100, 1),
+        "recommendations": [],
+        "statistical_summary": {
+            "numeric_columns": numeric_cols,
+            "categorical_columns": categorical_cols,
+            "total_missing": int(total_missing)
+        },
+        "feature_importance_estimate": {}
+    }
+    
+    # Add recommendations
+    recommendations = []
+    
+    # Target column suggestions
+    for col, unique_vals in nunique.items():
+        if unique_vals < n_rows * 0.1 and unique_vals > 1:
+            recommendations.append(f"'{col}' could be target (classification)")
+    
+    if total_missing > 0:
+        recommendations.append("Handle missing values")
+    
+    if len(numeric_cols) > 0:
+        recommendations.append("Scale numeric features")
         
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Error analyzing file: {str(e)}")
+    if len(categorical_cols) > 0:
+        recommendations.append("Encode categorical variables")
+    
+    profile["recommendations"] = recommendations
+    
+    return {
+        "status": "success",
+        "filename": filename,
+        "profile": profile,
+        "summary": {
+            "total_rows": n_rows,
+            "total_columns": n_cols,
+            "data_quality_score": profile["data_quality_score"],
+            "missing_data_percentage": (total_missing / (n_rows * n_cols)) * 100,
+            "recommendation_count": len(recommendations)
+        }
+    }
 
 @router.post("/train")
 async def train_model(
@@ -103,7 +180,7 @@ async def train_model(
     """Train model with specified parameters."""
     try:
         content = await file.read()
-        df = pd.read_csv(io.StringIO(content.decode('utf-8')))
+        _, df = dataset_cache.load_csv(content)
         
         if target_column not in df.columns:
             raise HTTPException(status_code=400, detail=f"Target column '{target_column}' not found")
@@ -114,14 +191,17 @@ async def train_model(
         
         # Basic preprocessing
         for col in X.columns:
-            if X[col].dtype in ['object']:
-                X[col] = X[col].fillna(X[col].mode().iloc[0] if not X[col].mode().empty else 'unknown')
+            if pd.api.types.is_datetime64_any_dtype(X[col]):
+                # Dates are parsed at ingest; train on days since epoch
+                X[col] = (X[col] - pd.Timestamp('1970-01-01')).dt.days
+            if is_text_dtype(X[col]):
+                X[col] = fill_text(X[col], X[col].mode().iloc[0] if not X[col].mode().empty else 'unknown')
             else:
                 X[col] = X[col].fillna(X[col].mean())
         
         # Encode categorical variables
         label_encoders = {}
-        for col in X.select_dtypes(include=['object']).columns:
+        for col in X.select_dtypes(include=TEXT_DTYPES).columns:
             le = LabelEncoder()
             X[col] = le.fit_transform(X[col])
             label_encoders[col] = le
@@ -139,7 +219,7 @@ async def train_model(
         is_classification = y.nunique() <= 10
         
         if is_classification:
-            if y.dtype == 'object':
+            if is_text_dtype(y):
                 target_encoder = LabelEncoder()
                 y_train = target_encoder.fit_transform(y_train)
                 y_test = target_encoder.transform(y_test)
@@ -215,7 +295,7 @@ async def auto_feature_engineering(
     """Advanced automated feature engineering with customizable options"""
     try:
         content = await file.read()
-        df = pd.read_csv(io.BytesIO(content))
+        key, df = dataset_cache.load_csv(content)
         
         if df.empty:
             raise HTTPException(status_code=400, detail="Uploaded file is empty")
@@ -225,25 +305,33 @@ async def auto_feature_engineering(
         
         # Simple feature engineering for demo
         original_shape = df.shape
+        original_columns = set(df.columns)
         
-        # Add some basic engineered features
-        numeric_cols = df.select_dtypes(include=[np.number]).columns
-        if len(numeric_cols) > 1:
-            df[f'{numeric_cols[0]}_squared'] = df[numeric_cols[0]] ** 2
+        engineered = dataset_cache.get_frame(key, 'engineered')
+        if engineered is None:
+            # Add some basic engineered features
+            numeric_cols = df.select_dtypes(include=[np.number]).columns
             if len(numeric_cols) > 1:
-                df[f'{numeric_cols[0]}_{numeric_cols[1]}_interaction'] = df[numeric_cols[0]] * df[numeric_cols[1]]
+                # float64 so integer columns downcast at ingest cannot overflow
+                first = df[numeric_cols[0]].astype(np.float64)
+                df[f'{numeric_cols[0]}_squared'] = first ** 2
+                if len(numeric_cols) > 1:
+                    df[f'{numeric_cols[0]}_{numeric_cols[1]}_interaction'] = first * df[numeric_cols[1]].astype(np.float64)
+            dataset_cache.put_frame(key, df, 'engineered')
+            engineered = df
+        df = engineered
         
         return {
             "status": "success",
             "original_shape": original_shape,
             "engineered_shape": df.shape,
-            "new_features": [col for col in df.columns if col not in pd.read_csv(io.BytesIO(content)).columns],
+            "new_features": [col for col in df.columns if col not in original_columns],
             "features_added": df.shape[1] - original_shape[1],
             "transformations_applied": ["Polynomial features", "Feature interactions"],
             "sample_data": df.head(5).fillna(0).to_dict('records'),
             "feature_types": {
                 "numeric": len(df.select_dtypes(include=[np.number]).columns),
-                "categorical": len(df.select_dtypes(include=['object']).columns)
+                "categorical": len(df.select_dtypes(include=TEXT_DTYPES).columns)
             }
         }
         
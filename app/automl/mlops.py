@@ -4,12 +4,16 @@ from datetime import datetime
 
 MODEL_REGISTRY = os.getenv("MODEL_REGISTRY_PATH", "models/")
 
-def save_model(model, name: str, metadata: dict = None):
+def save_model(model, name: str, metadata: dict = None, feature_engineer=None):
+    """Persist a model with its metadata and, if given, the fitted feature engineer it was trained behind"""
     timestamp = datetime.utcnow().strftime("%Y%m%d%H%M%S")
     path = os.path.join(MODEL_REGISTRY, f"{name}_{timestamp}.pkl")
     os.makedirs(MODEL_REGISTRY, exist_ok=True)
     
-    joblib.dump({"model": model, "metadata": metadata or {}}, path)
+    artifact = {"model": model, "metadata": metadata or {}}
+    if feature_engineer is not None:
+        artifact["feature_engineer"] = feature_engineer
+    joblib.dump(artifact, path)
     return path
 
 def load_model(path: str):
@@ -0,0 +1,666 @@
+import copy
+import joblib
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List, Optional, Tuple
+from app.preprocessing.parallel import (
+    PARALLEL_MIN_CELLS, SharedArray, attach_shared, effective_n_jobs, make_executor, split_evenly
+)
+from app.preprocessing.sketches import (
+    CountMinSketch, FrequentItems, HyperLogLog, QuantileSketch, sketch_parameters
+)
+
+# Upper bound on cells per numeric block so temporaries stay bounded on tall frames
+NUMERIC_BLOCK_CELLS = 2 ** 24
+
+# Rows per chunk when streaming a CSV through StreamingColumnStats
+DEFAULT_CHUNKSIZE = 100_000
+
+# Object values made only of digits/punctuation hint at a mistyped numeric column
+NUMERIC_LIKE_PATTERN = r'^[\d\s\-\+\(\)\.]+$'
+
+# Dtypes profiled as categorical/text; compact ingest produces the latter two
+TEXT_DTYPES = ['object', 'category', 'string']
+
+
+def is_text_dtype(series: pd.Series) -> bool:
+    """True for object, category and string columns"""
+    return series.dtype == object or isinstance(series.dtype, (pd.CategoricalDtype, pd.StringDtype))
+
+
+def compute_column_stats(df: pd.DataFrame, n_jobs: Optional[int] = 1, backend: str = 'thread') -> Dict:
+    """Compute every per-column statistic the profiler needs in one pass over the data
+
+    With n_jobs > 1, column groups of large frames are spread over a thread or
+    process pool; results are identical to the serial pass.
+    """
+    n_rows = len(df)
+    missing = df.isnull().sum()
+    numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+    categorical_cols = df.select_dtypes(include=TEXT_DTYPES).columns.tolist()
+
+    n_workers = effective_n_jobs(n_jobs)
+    if n_workers > 1 and df.size >= PARALLEL_MIN_CELLS:
+        numeric, categorical, numeric_like_cols = _parallel_column_stats(
+            df, numeric_cols, categorical_cols, missing, n_workers, backend)
+    else:
+        numeric = _numeric_stats(df, numeric_cols, missing)
+        categorical, numeric_like_cols = _object_stats(df, categorical_cols)
+
+    stats = {
+        'n_rows': n_rows,
+        'n_cols': df.shape[1],
+        'dtypes': df.dtypes.astype(str).to_dict(),
+        'missing': {col: int(count) for col, count in missing.items()},
+        'duplicate_rows': int(df.duplicated().sum()),
+        'numeric_cols': numeric_cols,
+        'categorical_cols': categorical_cols,
+        'numeric_like_cols': numeric_like_cols,
+        'numeric': numeric,
+        'categorical': categorical,
+        'nunique': {}
+    }
+
+    for col in df.columns:
+        if col in stats['numeric']:
+            stats['nunique'][col] = stats['numeric'][col]['unique_count']
+        elif col in stats['categorical']:
+            stats['nunique'][col] = stats['categorical'][col]['unique_count']
+        else:
+            stats['nunique'][col] = int(df[col].nunique())
+
+    return stats
+
+
+def _numeric_stats(df: pd.DataFrame, numeric_cols: List[str], missing: pd.Series) -> Dict:
+    """Vectorized moments, order statistics and outlier counts for numeric columns"""
+    result = {}
+    if not numeric_cols or len(df) == 0:
+        for col in numeric_cols:
+            result[col] = _empty_numeric_stats()
+        return result
+
+    counts = len(df) - missing[numeric_cols].to_numpy()
+    cols_per_block = max(1, NUMERIC_BLOCK_CELLS // len(df))
+    for start in range(0, len(numeric_cols), cols_per_block):
+        stop = start + cols_per_block
+        block_cols = numeric_cols[start:stop]
+        result.update(_unpack_block(block_cols, _frame_block_stats(df, block_cols, counts[start:stop])))
+
+    return result
+
+
+def _parallel_column_stats(df: pd.DataFrame, numeric_cols: List[str], categorical_cols: List[str],
+                           missing: pd.Series, n_workers: int,
+                           backend: str) -> Tuple[Dict, Dict, List[str]]:
+    """Numeric blocks and object column groups computed concurrently on a worker pool
+
+    The process backend copies numeric columns once into a shared-memory matrix
+    that workers map by name; object columns have no shareable buffer and are
+    pickled per group. The thread backend reads the frame in place.
+    """
+    counts = len(df) - missing[numeric_cols].to_numpy()
+    # Several tasks per worker balance uneven columns; the cell cap bounds temporaries per worker
+    max_cols = max(1, NUMERIC_BLOCK_CELLS // (len(df) * n_workers))
+    cols_per_task = max(1, min(max_cols, -(-len(numeric_cols) // (n_workers * 4))))
+    ranges = [(start, min(start + cols_per_task, len(numeric_cols)))
+              for start in range(0, len(numeric_cols), cols_per_task)]
+    object_groups = split_evenly(categorical_cols, n_workers * 4) if categorical_cols else []
+
+    shared = None
+    try:
+        with make_executor(n_workers, backend) as executor:
+            if backend == 'process' and numeric_cols:
+                shared = SharedArray((len(df), len(numeric_cols)))
+                for start, stop in ranges:
+                    shared.array[:, start:stop] = df[numeric_cols[start:stop]].to_numpy(
+                        dtype=np.float64, na_value=np.nan)
+                numeric_futures = [executor.submit(_shared_block_stats, shared.spec, start, stop,
+                                                   counts[start:stop]) for start, stop in ranges]
+                object_futures = [executor.submit(_object_stats, df[group], group)
+                                  for group in object_groups]
+            else:
+                numeric_futures = [executor.submit(_frame_block_stats, df, numeric_cols[start:stop],
+                                                   counts[start:stop]) for start, stop in ranges]
+                object_futures = [executor.submit(_object_stats, df, group) for group in object_groups]
+
+            numeric = {}
+            for (start, stop), future in zip(ranges, numeric_futures):
+                numeric.update(_unpack_block(numeric_cols[start:stop], future.result()))
+            categorical, numeric_like_cols = {}, []
+            for future in object_futures:
+                group_stats, group_numeric_like = future.result()
+                categorical.update(group_stats)
+                numeric_like_cols.extend(group_numeric_like)
+    finally:
+        if shared is not None:
+            shared.close()
+
+    return numeric, categorical, numeric_like_cols
+
+
+def _frame_block_stats(df: pd.DataFrame, block_cols: List[str], counts: np.ndarray) -> Dict[str, np.ndarray]:
+    """Block statistics for a group of numeric columns read straight from the frame"""
+    return _block_stats(df[block_cols].to_numpy(dtype=np.float64, na_value=np.nan), counts)
+
+
+def _shared_block_stats(spec: Tuple[str, Tuple[int, int]], start: int, stop: int,
+                        counts: np.ndarray) -> Dict[str, np.ndarray]:
+    """Process-pool worker: block statistics for a column range of a SharedArray"""
+    shm, values = attach_shared(spec)
+    try:
+        return _block_stats(values[:, start:stop], counts)
+    finally:
+        del values
+        shm.close()
+
+
+def _unpack_block(block_cols: List[str], block: Dict[str, np.ndarray]) -> Dict:
+    """Per-column dicts of plain Python numbers from block statistics"""
+    return {col: {name: _to_python(arr[i]) for name, arr in block.items()}
+            for i, col in enumerate(block_cols)}
+
+
+def _block_stats(values: np.ndarray, counts: np.ndarray) -> Dict[str, np.ndarray]:
+    """Statistics for a 2-D block of float values (NaN = missing), one entry per column"""
+    n_rows = values.shape[0]
+    valid_counts = counts.astype(np.float64)
+
+    # Sorting once yields min/max, exact quantiles and distinct counts; NaNs sort last
+    sorted_vals = np.sort(values, axis=0)
+    row_idx = np.arange(n_rows)[:, None]
+    in_range = row_idx[1:] < counts[None, :]
+    changes = (sorted_vals[1:] != sorted_vals[:-1]) & in_range
+    unique_count = changes.sum(axis=0) + (counts > 0)
+
+    last = np.clip(counts - 1, 0, None)
+    col_min = sorted_vals[0]
+    col_max = np.take_along_axis(sorted_vals, last[None, :], axis=0)[0]
+    q1, median, q3 = (_sorted_quantile(sorted_vals, counts, q) for q in (0.25, 0.5, 0.75))
+    del sorted_vals
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.nansum(values, axis=0) / valid_counts
+        deviations = values - mean
+        squared = deviations * deviations
+        m2 = np.nansum(squared, axis=0)
+        m3 = np.nansum(squared * deviations, axis=0)
+        m4 = np.nansum(squared * squared, axis=0)
+        std = np.sqrt(m2 / (valid_counts - 1))
+
+        zscore_outliers = (np.abs(deviations) > 3 * std).sum(axis=0)
+        del deviations, squared
+
+        iqr = q3 - q1
+        lower, upper = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+        iqr_outliers = ((values < lower) | (values > upper)).sum(axis=0)
+
+        skewness = _skewness(valid_counts, m2, m3)
+        kurtosis = _kurtosis(valid_counts, m2, m4)
+
+    col_min = np.where(counts > 0, col_min, np.nan)
+    return {
+        'count': counts,
+        'unique_count': unique_count,
+        'mean': mean,
+        'std': np.where(counts > 1, std, np.nan),
+        'min': col_min,
+        'max': np.where(counts > 0, col_max, np.nan),
+        'q1': q1,
+        'median': median,
+        'q3': q3,
+        'skewness': skewness,
+        'kurtosis': kurtosis,
+        'iqr_outliers': iqr_outliers,
+        'zscore_outliers': zscore_outliers
+    }
+
+
+def _sorted_quantile(sorted_vals: np.ndarray, counts: np.ndarray, q: float) -> np.ndarray:
+    """Linear-interpolated quantile per column of a NaN-last sorted block"""
+    position = q * np.clip(counts - 1, 0, None)
+    lo = np.floor(position).astype(np.int64)
+    hi = np.ceil(position).astype(np.int64)
+    lo_vals = np.take_along_axis(sorted_vals, lo[None, :], axis=0)[0]
+    hi_vals = np.take_along_axis(sorted_vals, hi[None, :], axis=0)[0]
+    result = lo_vals + (hi_vals - lo_vals) * (position - lo)
+    return np.where(counts > 0, result, np.nan)
+
+
+def _skewness(n: np.ndarray, m2: np.ndarray, m3: np.ndarray) -> np.ndarray:
+    """Bias-corrected sample skewness matching pandas.Series.skew"""
+    result = n * (n - 1) ** 0.5 / (n - 2) * m3 / m2 ** 1.5
+    result = np.where(m2 == 0, 0.0, result)
+    return np.where(n < 3, np.nan, result)
+
+
+def _kurtosis(n: np.ndarray, m2: np.ndarray, m4: np.ndarray) -> np.ndarray:
+    """Bias-corrected excess kurtosis matching pandas.Series.kurtosis"""
+    numerator = n * (n + 1) * (n - 1) * m4
+    denominator = (n - 2) * (n - 3) * m2 ** 2
+    adjustment = 3 * (n - 1) ** 2 / ((n - 2) * (n - 3))
+    result = numerator / denominator - adjustment
+    result = np.where(m2 == 0, 0.0, result)
+    return np.where(n < 4, np.nan, result)
+
+
+def _object_stats(df: pd.DataFrame, categorical_cols: List[str]) -> Tuple[Dict, List[str]]:
+    """Categorical statistics and numeric-looking columns among a group of object columns"""
+    numeric_like_cols = [col for col in categorical_cols
+                         if df[col].str.contains(NUMERIC_LIKE_PATTERN, na=False).any()]
+    return _categorical_stats(df, categorical_cols), numeric_like_cols
+
+
+def _categorical_stats(df: pd.DataFrame, categorical_cols: List[str]) -> Dict:
+    """Cardinality and mode of object columns from a single value_counts per column"""
+    result = {}
+    for col in categorical_cols:
+        counts = df[col].value_counts(dropna=True)
+        counts = counts[counts > 0]  # unused categories of categorical columns
+        result[col] = {
+            'unique_count': int(len(counts)),
+            'most_frequent': str(counts.index[0]) if len(counts) > 0 else 'N/A',
+            'most_frequent_count': int(counts.iloc[0]) if len(counts) > 0 else 0
+        }
+    return result
+
+
+def _empty_numeric_stats() -> Dict:
+    """Statistics for a numeric column with no observed values"""
+    stats = {name: float('nan') for name in ('mean', 'std', 'min', 'max', 'q1', 'median', 'q3',
+                                              'skewness', 'kurtosis')}
+    stats.update({'count': 0, 'unique_count': 0, 'iqr_outliers': 0, 'zscore_outliers': 0})
+    return stats
+
+
+def _to_python(value):
+    """Convert numpy scalars to plain Python numbers for JSON responses"""
+    if isinstance(value, (np.integer, np.bool_)):
+        return int(value)
+    return float(value)
+
+
+def compute_csv_column_stats(source, chunksize: int = DEFAULT_CHUNKSIZE, accuracy: float = 0.01,
+                             **read_csv_kwargs) -> Dict:
+    """Column statistics for a CSV read in bounded-size chunks"""
+    return stream_csv(source, chunksize, accuracy, **read_csv_kwargs).result()
+
+
+def stream_csv(source, chunksize: int = DEFAULT_CHUNKSIZE, accuracy: float = 0.01,
+               **read_csv_kwargs) -> 'StreamingColumnStats':
+    """Feed a CSV path or file object through a StreamingColumnStats accumulator"""
+    accumulator = StreamingColumnStats(**sketch_parameters(accuracy))
+    accumulator.update_many(pd.read_csv(source, chunksize=chunksize, **read_csv_kwargs))
+    return accumulator
+
+
+def stream_frame(df: pd.DataFrame, chunksize: int = DEFAULT_CHUNKSIZE,
+                 accuracy: float = 0.01) -> 'StreamingColumnStats':
+    """Sketch-backed statistics for an in-memory frame, touching one row slice at a time"""
+    accumulator = StreamingColumnStats(**sketch_parameters(accuracy))
+    accumulator.update_frame(df, chunksize)
+    return accumulator
+
+
+class StreamingColumnStats:
+    """Mergeable column statistics accumulated chunk by chunk in bounded memory
+
+    result() returns the same structure as compute_column_stats. Row counts,
+    missing values, moments, min/max and correlations are exact; distinct counts,
+    quantiles, modes, outlier and duplicate counts come from fixed-size sketches.
+    The state persists with save()/load(), so appended rows can be absorbed later
+    in time proportional to the new data.
+
+    With frequency_error set, a Count-Min sketch per categorical column also
+    estimates the count of every value, not just the frequent ones.
+    """
+
+    def __init__(self, sample_size: int = 10_000, hll_precision: int = 14, quantile_k: int = 2000,
+                 frequent_capacity: int = 1000, track_correlations: bool = True,
+                 frequency_error: Optional[float] = None, random_state: int = 42):
+        self.sample_size = sample_size
+        self.hll_precision = hll_precision
+        self.quantile_k = quantile_k
+        self.frequent_capacity = frequent_capacity
+        self.track_correlations = track_correlations
+        self.frequency_error = frequency_error
+        self.random_state = random_state
+        self._rng = np.random.default_rng(random_state)
+
+        self.columns: List[str] = []
+        self.numeric_cols: List[str] = []
+        self.categorical_cols: List[str] = []
+        self.dtypes: Dict[str, str] = {}
+        self.n_rows = 0
+        self.missing: Dict[str, int] = {}
+        self.memory_bytes: Dict[str, int] = {}
+        self.numeric_like: Dict[str, bool] = {}
+        self.distinct: Dict[str, HyperLogLog] = {}
+        self.quantiles: Dict[str, QuantileSketch] = {}
+        self.frequent: Dict[str, FrequentItems] = {}
+        self.frequencies: Dict[str, CountMinSketch] = {}
+        self.row_hashes = HyperLogLog(precision=16)
+        self.moments: Optional[Tuple[np.ndarray, ...]] = None
+        self.col_min: Optional[np.ndarray] = None
+        self.col_max: Optional[np.ndarray] = None
+        self.comoments: Optional[Dict[str, np.ndarray]] = None
+        self.sample: Optional[pd.DataFrame] = None
+        self._sample_keys = np.empty(0)
+
+    def _initialize(self, chunk: pd.DataFrame) -> None:
+        """Fix the schema from the first chunk"""
+        self.columns = chunk.columns.tolist()
+        self.numeric_cols = chunk.select_dtypes(include=[np.number]).columns.tolist()
+        self.categorical_cols = chunk.select_dtypes(include=TEXT_DTYPES).columns.tolist()
+        self.dtypes = chunk.dtypes.astype(str).to_dict()
+        self.missing = {col: 0 for col in self.columns}
+        self.memory_bytes = {col: 0 for col in self.columns}
+        self.numeric_like = {col: False for col in self.categorical_cols}
+        self.distinct = {col: HyperLogLog(self.hll_precision) for col in self.columns}
+        self.quantiles = {col: QuantileSketch(self.quantile_k, seed=self.random_state)
+                          for col in self.numeric_cols}
+        self.frequent = {col: FrequentItems(self.frequent_capacity) for col in self.categorical_cols}
+        if self.frequency_error is not None:
+            self.frequencies = {col: CountMinSketch.from_error(self.frequency_error, seed=self.random_state)
+                                for col in self.categorical_cols}
+
+        p = len(self.numeric_cols)
+        self.moments = tuple(np.zeros(p) for _ in range(5))
+        self.col_min = np.full(p, np.inf)
+        self.col_max = np.full(p, -np.inf)
+        if self.track_correlations:
+            self.comoments = {name: np.zeros((p, p)) for name in ('n', 'sum', 'sumsq', 'cross')}
+            self.comoments['shift'] = np.zeros(p)
+        self.sample = chunk.iloc[:0].copy()
+
+    def update_many(self, chunks: Iterable[pd.DataFrame]) -> 'StreamingColumnStats':
+        """Absorb an iterable of chunks (e.g. pd.read_csv(..., chunksize=n))"""
+        for chunk in chunks:
+            self.update(chunk)
+        return self
+
+    def update_frame(self, df: pd.DataFrame, chunksize: int = DEFAULT_CHUNKSIZE) -> 'StreamingColumnStats':
+        """Absorb an in-memory frame one row slice at a time"""
+        if len(df) == 0:
+            self.update(df)
+        return self.update_many(df.iloc[start:start + chunksize] for start in range(0, len(df), chunksize))
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """Absorb one chunk of rows"""
+        if not self.columns:
+            self._initialize(chunk)
+        elif chunk.columns.tolist() != self.columns:
+            raise ValueError("Chunk columns do not match the columns of the first chunk")
+        if len(chunk) == 0:
+            return
+
+        first_chunk = self.n_rows == 0
+        self.n_rows += len(chunk)
+        for col, count in chunk.isnull().sum().items():
+            self.missing[col] += int(count)
+        for col, usage in chunk.memory_usage(deep=True, index=False).items():
+            self.memory_bytes[col] += int(usage)
+        for col, dtype in chunk.dtypes.astype(str).items():
+            self.dtypes[col] = _combine_dtypes(self.dtypes[col], dtype)
+
+        values = _numeric_values(chunk, self.numeric_cols)
+        self.moments = _merge_moments(self.moments, _chunk_moments(values))
+        with np.errstate(invalid='ignore'):
+            self.col_min = np.fmin(self.col_min, np.nanmin(values, axis=0, initial=np.inf))
+            self.col_max = np.fmax(self.col_max, np.nanmax(values, axis=0, initial=-np.inf))
+        for i, col in enumerate(self.numeric_cols):
+            column = values[:, i]
+            column = column[~np.isnan(column)]
+            self.distinct[col].update_hashes(pd.util.hash_array(column))
+            self.quantiles[col].update(column)
+
+        for col in self.categorical_cols:
+            series = chunk[col]
+            if series.dtype != object:
+                series = series.astype(str).where(series.notna())
+            self.distinct[col].update(series)
+            self.frequent[col].update(series)
+            if col in self.frequencies:
+                self.frequencies[col].update(series)
+            if not self.numeric_like[col] and series.notna().any():
+                self.numeric_like[col] = bool(
+                    series.str.contains(NUMERIC_LIKE_PATTERN, na=False).any())
+
+        for col in self.columns:
+            if col not in self.quantiles and col not in self.frequent:
+                self.distinct[col].update(chunk[col])
+
+        self.row_hashes.update_hashes(pd.util.hash_pandas_object(chunk, index=False).to_numpy())
+        if self.comoments is not None:
+            if first_chunk:
+                with np.errstate(invalid='ignore'):
+                    self.comoments['shift'] = np.nan_to_num(np.nanmean(values, axis=0))
+            _update_comoments(self.comoments, values)
+        self._update_sample(chunk)
+
+    def _update_sample(self, chunk: pd.DataFrame) -> None:
+        """Bottom-k reservoir: keep the rows with the smallest random keys seen so far"""
+        keys = self._rng.random(len(chunk))
+        if len(self.sample) >= self.sample_size:
+            mask = keys < self._sample_keys.max()
+            chunk, keys = chunk[mask], keys[mask]
+        self._absorb_sample(chunk, keys)
+
+    def _absorb_sample(self, rows: pd.DataFrame, keys: np.ndarray) -> None:
+        if len(rows) == 0:
+            return
+        sample = pd.concat([self.sample, rows], ignore_index=True)
+        sample_keys = np.concatenate([self._sample_keys, keys])
+        if len(sample) > self.sample_size:
+            keep = np.sort(np.argpartition(sample_keys, self.sample_size)[:self.sample_size])
+            sample, sample_keys = sample.iloc[keep].reset_index(drop=True), sample_keys[keep]
+        self.sample, self._sample_keys = sample, sample_keys
+
+    def merge(self, other: 'StreamingColumnStats') -> None:
+        """Fold statistics accumulated elsewhere (another file part, worker or batch) into this one"""
+        if other.n_rows == 0:
+            return
+        if self.n_rows == 0:
+            self.__dict__.update(copy.deepcopy(other.__dict__))
+            return
+        if other.columns != self.columns:
+            raise ValueError("Cannot merge statistics computed over different columns")
+        if set(other.frequencies) != set(self.frequencies):
+            raise ValueError("Cannot merge statistics that track value frequencies differently")
+
+        self.n_rows += other.n_rows
+        for col in self.columns:
+            self.missing[col] += other.missing[col]
+            self.memory_bytes[col] += other.memory_bytes[col]
+            self.dtypes[col] = _combine_dtypes(self.dtypes[col], other.dtypes[col])
+            self.distinct[col].merge(other.distinct[col])
+        for col in self.numeric_cols:
+            self.quantiles[col].merge(other.quantiles[col])
+        for col in self.categorical_cols:
+            self.frequent[col].merge(other.frequent[col])
+            if col in self.frequencies:
+                self.frequencies[col].merge(other.frequencies[col])
+            self.numeric_like[col] = self.numeric_like[col] or other.numeric_like[col]
+        self.row_hashes.merge(other.row_hashes)
+
+        self.moments = _merge_moments(self.moments, other.moments)
+        self.col_min = np.fmin(self.col_min, other.col_min)
+        self.col_max = np.fmax(self.col_max, other.col_max)
+        if self.comoments is not None and other.comoments is not None:
+            _merge_comoments(self.comoments, other.comoments)
+        else:
+            self.comoments = None
+        self._absorb_sample(other.sample, other._sample_keys)
+
+    def save(self, path: str) -> str:
+        """Persist the accumulated state, sketches and sample included"""
+        joblib.dump(self, path)
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> 'StreamingColumnStats':
+        """Restore state written by save()"""
+        state = joblib.load(path)
+        if not isinstance(state, cls):
+            raise ValueError(f"{path} does not contain {cls.__name__} state")
+        # States saved before frequency tracking existed track none
+        state.__dict__.setdefault('frequency_error', None)
+        state.__dict__.setdefault('frequencies', {})
+        return state
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Bytes each column would occupy if the whole dataset were loaded"""
+        return dict(self.memory_bytes)
+
+    def correlation_matrix(self) -> pd.DataFrame:
+        """Pairwise-complete Pearson correlations from the accumulated co-moments"""
+        if self.comoments is None:
+            raise ValueError("Correlations were not tracked for this accumulator")
+        n, sums, sumsq, cross = (self.comoments[name] for name in ('n', 'sum', 'sumsq', 'cross'))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            covariance = n * cross - sums * sums.T
+            variance = n * sumsq - sums ** 2
+            corr = covariance / np.sqrt(variance * variance.T)
+        corr = np.clip(corr, -1.0, 1.0)
+        return pd.DataFrame(corr, index=self.numeric_cols, columns=self.numeric_cols)
+
+    def result(self) -> Dict:
+        """Finalize into the compute_column_stats structure"""
+        count, mean, m2, m3, m4 = self.moments if self.moments else (np.zeros(0),) * 5
+        with np.errstate(invalid='ignore', divide='ignore'):
+            std = np.where(count > 1, np.sqrt(m2 / (count - 1)), np.nan)
+            skewness = _skewness(count, m2, m3)
+            kurtosis = _kurtosis(count, m2, m4)
+
+        numeric = {}
+        for i, col in enumerate(self.numeric_cols):
+            sketch = self.quantiles[col]
+            if count[i] == 0:
+                numeric[col] = _empty_numeric_stats()
+                continue
+            q1, median, q3 = sketch.quantile([0.25, 0.5, 0.75])
+            iqr = q3 - q1
+            zscore_outliers = 0
+            if std[i] > 0:
+                zscore_outliers = (sketch.rank(mean[i] - 3 * std[i]) +
+                                   sketch.count - sketch.rank(mean[i] + 3 * std[i], inclusive=True))
+            iqr_outliers = (sketch.rank(q1 - 1.5 * iqr) +
+                            sketch.count - sketch.rank(q3 + 1.5 * iqr, inclusive=True))
+            numeric[col] = {
+                'count': int(count[i]),
+                'unique_count': self.distinct[col].count(),
+                'mean': float(mean[i]),
+                'std': float(std[i]),
+                'min': float(self.col_min[i]),
+                'max': float(self.col_max[i]),
+                'q1': float(q1),
+                'median': float(median),
+                'q3': float(q3),
+                'skewness': float(skewness[i]),
+                'kurtosis': float(kurtosis[i]),
+                'iqr_outliers': int(round(iqr_outliers)),
+                'zscore_outliers': int(round(zscore_outliers))
+            }
+
+        categorical = {}
+        for col in self.categorical_cols:
+            top = self.frequent[col].top(1)
+            if not top and self.n_rows - self.missing[col] > 0:
+                # No value stood out from the summary; estimate the mode from the row sample
+                sample_counts = self.sample[col].value_counts()
+                if len(sample_counts) > 0:
+                    scale = self.n_rows / len(self.sample) if sample_counts.iloc[0] > 1 else 1
+                    top = [(sample_counts.index[0], int(round(sample_counts.iloc[0] * scale)))]
+            categorical[col] = {
+                'unique_count': self.distinct[col].count(),
+                'most_frequent': str(top[0][0]) if top else 'N/A',
+                'most_frequent_count': top[0][1] if top else 0
+            }
+
+        nunique = {col: min(self.distinct[col].count(), self.n_rows - self.missing[col])
+                   for col in self.columns}
+        distinct_rows = min(self.row_hashes.count(), self.n_rows)
+        return {
+            'n_rows': self.n_rows,
+            'n_cols': len(self.columns),
+            'dtypes': dict(self.dtypes),
+            'missing': dict(self.missing),
+            'duplicate_rows': self.n_rows - distinct_rows,
+            'numeric_cols': list(self.numeric_cols),
+            'categorical_cols': list(self.categorical_cols),
+            'numeric_like_cols': [col for col, flag in self.numeric_like.items() if flag],
+            'numeric': numeric,
+            'categorical': categorical,
+            'nunique': nunique
+        }
+
+
+def _numeric_values(chunk: pd.DataFrame, numeric_cols: List[str]) -> np.ndarray:
+    """Float block of the schema's numeric columns, coercing chunks that parsed as text"""
+    block = chunk[numeric_cols]
+    mistyped = [col for col in numeric_cols if not pd.api.types.is_numeric_dtype(block[col])]
+    if mistyped:
+        block = block.copy()
+        for col in mistyped:
+            block[col] = pd.to_numeric(block[col], errors='coerce')
+    return block.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _combine_dtypes(left: str, right: str) -> str:
+    """Dtype that holds values from two chunks that were parsed independently"""
+    if left == right:
+        return left
+    numeric_prefixes = ('int', 'uint', 'float')
+    if left.startswith(numeric_prefixes) and right.startswith(numeric_prefixes):
+        return 'float64'
+    return 'object'
+
+
+def _chunk_moments(values: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """Count, mean and central moment sums (M2, M3, M4) per column of a block"""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        count = (~np.isnan(values)).sum(axis=0).astype(np.float64)
+        mean = np.nan_to_num(np.nansum(values, axis=0) / count)
+        deviations = values - mean
+        squared = deviations * deviations
+        return (count, mean, np.nansum(squared, axis=0),
+                np.nansum(squared * deviations, axis=0), np.nansum(squared * squared, axis=0))
+
+
+def _merge_moments(a: Tuple[np.ndarray, ...], b: Tuple[np.ndarray, ...]) -> Tuple[np.ndarray, ...]:
+    """Combine two moment summaries (Chan et al. / Pebay pairwise update)"""
+    na, mean_a, m2a, m3a, m4a = a
+    nb, mean_b, m2b, m3b, m4b = b
+    n = na + nb
+    with np.errstate(invalid='ignore', divide='ignore'):
+        delta = mean_b - mean_a
+        mean = np.where(n > 0, mean_a + delta * nb / n, 0.0)
+        m2 = m2a + m2b + delta ** 2 * na * nb / n
+        m3 = (m3a + m3b + delta ** 3 * na * nb * (na - nb) / n ** 2
+              + 3 * delta * (na * m2b - nb * m2a) / n)
+        m4 = (m4a + m4b + delta ** 4 * na * nb * (na ** 2 - na * nb + nb ** 2) / n ** 3
+              + 6 * delta ** 2 * (na ** 2 * m2b + nb ** 2 * m2a) / n ** 2
+              + 4 * delta * (na * m3b - nb * m3a) / n)
+    empty = n == 0
+    return (n, mean, np.where(empty, 0.0, m2), np.where(empty, 0.0, m3), np.where(empty, 0.0, m4))
+
+
+def _update_comoments(comoments: Dict[str, np.ndarray], values: np.ndarray) -> None:
+    """Accumulate pairwise-complete sums around a fixed shift for numerical stability"""
+    observed = ~np.isnan(values)
+    mask = observed.astype(np.float64)
+    centered = np.where(observed, values - comoments['shift'], 0.0)
+    comoments['n'] += mask.T @ mask
+    comoments['sum'] += centered.T @ mask
+    comoments['sumsq'] += (centered * centered).T @ mask
+    comoments['cross'] += centered.T @ centered
+
+
+def _merge_comoments(target: Dict[str, np.ndarray], other: Dict[str, np.ndarray]) -> None:
+    """Add another accumulator's co-moments after re-expressing them around target's shift"""
+    d = other['shift'] - target['shift']
+    n, sums = other['n'], other['sum']
+    target['cross'] += other['cross'] + sums * d[None, :] + sums.T * d[:, None] + n * np.outer(d, d)
+    target['sumsq'] += other['sumsq'] + 2 * d[:, None] * sums + n * d[:, None] ** 2
+    target['sum'] += sums + n * d[:, None]
+    target['n'] += n
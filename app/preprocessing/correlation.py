@@ -0,0 +1,219 @@
+import base64
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterator, List, Tuple
+
+# Supported measures of pairwise association between numeric columns
+CORRELATION_METHODS = ('pearson', 'spearman', 'mutual_info')
+
+# Columns per block; a block pair's float32 result is at most this squared
+CORRELATION_BLOCK_COLS = 1024
+
+# Pairs whose absolute association exceeds this are reported as highly correlated
+DEFAULT_THRESHOLD = 0.8
+
+# Highly correlated pairs kept in the compact summary, strongest first
+DEFAULT_TOP_K = 50
+
+# Quantile bins per column for the mutual-information estimate
+MUTUAL_INFO_BINS = 16
+
+# Upper bound on one-hot cells per row slice when counting joint bins
+MUTUAL_INFO_SLICE_CELLS = 2 ** 24
+
+
+def compute_correlations(df: pd.DataFrame, method: str = 'pearson',
+                         threshold: float = DEFAULT_THRESHOLD, top_k: int = DEFAULT_TOP_K,
+                         include_matrix: bool = False) -> Dict:
+    """Compact correlation summary of the numeric columns of df
+
+    Associations are computed blockwise in float32 and only the top_k pairs above
+    threshold are returned; the full matrix is packed as base64 float32 on request.
+    'mutual_info' reports normalized mutual information in [0, 1] from quantile bins.
+    """
+    if method not in CORRELATION_METHODS:
+        raise ValueError(f"method must be one of {CORRELATION_METHODS}")
+    numeric_df = df.select_dtypes(include=[np.number])
+    columns = numeric_df.columns.tolist()
+    if len(columns) < 2:
+        return empty_correlations(method, threshold)
+
+    if method == 'spearman':
+        # Ranks are taken per column, so with missing values this differs from pairwise re-ranking
+        numeric_df = numeric_df.rank()
+    values = numeric_df.to_numpy(dtype=np.float64, na_value=np.nan)
+    blocks = _mutual_info_blocks(values) if method == 'mutual_info' else _pearson_blocks(values)
+    return _summarize_blocks(blocks, columns, method, threshold, top_k, include_matrix)
+
+
+def summarize_correlation_matrix(corr_matrix: pd.DataFrame, method: str = 'pearson',
+                                 threshold: float = DEFAULT_THRESHOLD, top_k: int = DEFAULT_TOP_K,
+                                 include_matrix: bool = False) -> Dict:
+    """Compact summary of an already computed correlation matrix"""
+    columns = corr_matrix.columns.tolist()
+    if len(columns) < 2:
+        return empty_correlations(method, threshold)
+    matrix = corr_matrix.to_numpy(dtype=np.float32)
+    return _summarize_blocks(iter([(0, 0, matrix)]), columns, method, threshold, top_k,
+                             include_matrix)
+
+
+def empty_correlations(method: str = 'pearson', threshold: float = DEFAULT_THRESHOLD) -> Dict:
+    """Summary for data with fewer than two numeric columns"""
+    return {'method': method, 'threshold': threshold, 'high_correlations': [],
+            'high_correlation_count': 0, 'matrix': {}}
+
+
+def unpack_matrix(packed: Dict) -> pd.DataFrame:
+    """Inverse of the packed 'matrix' entry of a correlation summary"""
+    values = np.frombuffer(base64.b64decode(packed['data']), dtype=packed['dtype'])
+    columns = packed['columns']
+    return pd.DataFrame(values.reshape(len(columns), len(columns)), index=columns, columns=columns)
+
+
+def _summarize_blocks(blocks: Iterator[Tuple[int, int, np.ndarray]], columns: List, method: str,
+                      threshold: float, top_k: int, include_matrix: bool) -> Dict:
+    """Top-k strongest pairs above threshold from upper-triangle blocks of the matrix"""
+    p = len(columns)
+    matrix = np.full((p, p), np.nan, dtype=np.float32) if include_matrix else None
+    rows, cols, scores = np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0, np.float32)
+    count = 0
+
+    for row_start, col_start, block in blocks:
+        if matrix is not None:
+            row_stop, col_stop = row_start + block.shape[0], col_start + block.shape[1]
+            matrix[row_start:row_stop, col_start:col_stop] = block
+            matrix[col_start:col_stop, row_start:row_stop] = block.T
+
+        # Strictly upper-triangle cells above threshold; NaN compares False
+        i, j = np.nonzero(np.abs(block) > threshold)
+        i, j = i + row_start, j + col_start
+        upper = j > i
+        i, j = i[upper], j[upper]
+        count += len(i)
+        rows = np.concatenate([rows, i])
+        cols = np.concatenate([cols, j])
+        scores = np.concatenate([scores, block[i - row_start, j - col_start]])
+        if len(scores) > top_k:
+            keep = np.argpartition(-np.abs(scores), top_k - 1)[:top_k] if top_k > 0 else []
+            rows, cols, scores = rows[keep], cols[keep], scores[keep]
+
+    order = np.lexsort((cols, rows, -np.abs(scores)))
+    summary = {
+        'method': method,
+        'threshold': threshold,
+        'high_correlations': [
+            {'feature1': columns[i], 'feature2': columns[j], 'correlation': float(score)}
+            for i, j, score in zip(rows[order], cols[order], scores[order])
+        ],
+        'high_correlation_count': int(count),
+        'matrix': {}
+    }
+    if matrix is not None:
+        summary['matrix'] = {
+            'columns': columns,
+            'dtype': 'float32',
+            'data': base64.b64encode(matrix.tobytes()).decode('ascii')
+        }
+    return summary
+
+
+def _block_ranges(p: int) -> List[Tuple[int, int]]:
+    return [(start, min(start + CORRELATION_BLOCK_COLS, p))
+            for start in range(0, p, CORRELATION_BLOCK_COLS)]
+
+
+def _pearson_blocks(values: np.ndarray) -> Iterator[Tuple[int, int, np.ndarray]]:
+    """Pairwise-complete Pearson correlations, one upper-triangle block at a time
+
+    Columns are standardized in float64 and multiplied in float32. Without missing
+    values each block is a single matrix product; otherwise the pairwise sums over
+    co-observed rows come from products with the validity mask.
+    """
+    mask = ~np.isnan(values)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.nanmean(values, axis=0)
+        std = np.nanstd(values, axis=0)
+        z = (values - mean) / np.where(std > 0, std, 1.0)
+    z = np.where(mask, z, 0.0).astype(np.float32)
+    degenerate = ~(std > 0)
+    complete = bool(mask.all())
+    m = mask.astype(np.float32)
+    z2 = z * z
+    n = values.shape[0]
+
+    ranges = _block_ranges(values.shape[1])
+    for a, (a0, a1) in enumerate(ranges):
+        for b0, b1 in ranges[a:]:
+            za, zb = z[:, a0:a1], z[:, b0:b1]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                if complete:
+                    corr = za.T @ zb / np.float32(n)
+                    pair_counts = None
+                else:
+                    ma, mb = m[:, a0:a1], m[:, b0:b1]
+                    pair_counts = ma.T @ mb
+                    sum_a, sum_b = za.T @ mb, ma.T @ zb
+                    cov = za.T @ zb - sum_a * sum_b / pair_counts
+                    var_a = z2[:, a0:a1].T @ mb - sum_a * sum_a / pair_counts
+                    var_b = ma.T @ z2[:, b0:b1] - sum_b * sum_b / pair_counts
+                    corr = cov / np.sqrt(var_a * var_b)
+            corr = np.clip(corr, -1.0, 1.0)
+            corr[degenerate[a0:a1], :] = np.nan
+            corr[:, degenerate[b0:b1]] = np.nan
+            if pair_counts is not None:
+                corr[pair_counts < 2] = np.nan
+            yield a0, b0, corr
+
+
+def _mutual_info_blocks(values: np.ndarray) -> Iterator[Tuple[int, int, np.ndarray]]:
+    """Normalized mutual information from quantile-binned columns, one block at a time
+
+    Joint bin counts for a whole block pair come from one product of one-hot
+    encodings, accumulated over row slices; missing values fall in no bin.
+    """
+    n, p = values.shape
+    codes = np.full((n, p), -1, dtype=np.int64)
+    for col in range(p):
+        column = values[:, col]
+        valid = ~np.isnan(column)
+        if valid.any():
+            quantiles = np.linspace(0, 1, MUTUAL_INFO_BINS + 1)[1:-1]
+            edges = np.unique(np.quantile(column[valid], quantiles))
+            codes[valid, col] = np.searchsorted(edges, column[valid], side='right')
+
+    ranges = _block_ranges(p)
+    rows_per_slice = max(1, MUTUAL_INFO_SLICE_CELLS // (CORRELATION_BLOCK_COLS * MUTUAL_INFO_BINS))
+    for a, (a0, a1) in enumerate(ranges):
+        for b0, b1 in ranges[a:]:
+            joint = np.zeros(((a1 - a0) * MUTUAL_INFO_BINS, (b1 - b0) * MUTUAL_INFO_BINS),
+                             dtype=np.float32)
+            for start in range(0, n, rows_per_slice):
+                stop = start + rows_per_slice
+                joint += _one_hot(codes[start:stop, a0:a1]).T @ _one_hot(codes[start:stop, b0:b1])
+            joint = joint.reshape(a1 - a0, MUTUAL_INFO_BINS, b1 - b0, MUTUAL_INFO_BINS)
+            yield a0, b0, _normalized_mutual_info(joint.transpose(0, 2, 1, 3))
+
+
+def _one_hot(codes: np.ndarray) -> np.ndarray:
+    """(rows, cols * bins) float32 indicators; code -1 sets no bin"""
+    rows, cols = codes.shape
+    encoded = np.zeros((rows, cols, MUTUAL_INFO_BINS), dtype=np.float32)
+    r, c = np.nonzero(codes >= 0)
+    encoded[r, c, codes[r, c]] = 1.0
+    return encoded.reshape(rows, cols * MUTUAL_INFO_BINS)
+
+
+def _normalized_mutual_info(joint: np.ndarray) -> np.ndarray:
+    """MI / sqrt(H(x) H(y)) per column pair from (pa, pb, bins, bins) joint counts"""
+    totals = joint.sum(axis=(2, 3), keepdims=True)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        pxy = joint / totals
+        px = pxy.sum(axis=3, keepdims=True)
+        py = pxy.sum(axis=2, keepdims=True)
+        mi = np.nansum(np.where(pxy > 0, pxy * np.log(pxy / (px * py)), 0.0), axis=(2, 3))
+        hx = -np.nansum(np.where(px > 0, px * np.log(px), 0.0), axis=(2, 3))
+        hy = -np.nansum(np.where(py > 0, py * np.log(py), 0.0), axis=(2, 3))
+        nmi = mi / np.sqrt(hx * hy)
+    nmi = np.where(totals[:, :, 0, 0] >= 2, np.clip(nmi, 0.0, 1.0), np.nan)
+    return nmi.astype(np.float32)
@@ -0,0 +1,144 @@
+import warnings
+import numpy as np
+import pandas as pd
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from app.preprocessing.column_stats import is_text_dtype
+
+try:
+    from pandas.tseries.api import guess_datetime_format
+except ImportError:  # pandas < 2.2
+    from pandas._libs.tslibs.parsing import guess_datetime_format
+
+# Non-missing values per column used to infer a format
+DATETIME_SAMPLE_SIZE = 100
+
+# Sample values whose guessed formats are tried against the whole sample
+DATETIME_GUESS_VALUES = 5
+
+# Inferred formats remembered across calls, keyed by the sampled values
+DATETIME_CACHE_SIZE = 4096
+
+# Cheap pre-filter: digit groups joined by date/time separators, or a month name next to a day.
+# Values failing it (plain numbers, free text) are never handed to the parser.
+DATETIME_CANDIDATE_PATTERN = (r'\d{1,4}[-/.:T ]\d{1,2}'
+                              r'|[A-Za-z]{3,9}\.? \d{1,2}'
+                              r'|\d{1,2} [A-Za-z]{3,9}')
+
+
+def is_datetime_name(col) -> bool:
+    """Column names mentioning a date or time are treated as datetimes regardless of content"""
+    return 'date' in col.lower() or 'time' in col.lower()
+
+
+def infer_datetime_format(series: pd.Series, min_parsed: float = 0.8,
+                          sample_size: int = DATETIME_SAMPLE_SIZE) -> Optional[str]:
+    """Single explicit format parsing more than min_parsed of a sample of the column
+
+    Returns 'mixed' when no single format does but per-value parsing would, and
+    None for columns that do not look like datetimes.
+    """
+    sample = _spread_sample(series, sample_size)
+    if len(sample) == 0:
+        return None
+    values = tuple(sample.astype(str))
+    fmt, rate, candidate_share = _infer_sample_format(values)
+    if rate > min_parsed:
+        return fmt
+    if candidate_share > min_parsed and _mixed_parse_rate(values) > min_parsed:
+        return 'mixed'
+    return None
+
+
+def infer_datetime_formats(samples: Dict[str, pd.Series], min_parsed: float = 0.8) -> Dict[str, str]:
+    """Formats of the datetime-like columns among sampled object columns
+
+    Module-level so process pools can pickle it.
+    """
+    formats = {}
+    for col, sample in samples.items():
+        fmt = infer_datetime_format(sample, min_parsed, sample_size=len(sample))
+        if fmt is not None:
+            formats[col] = fmt
+    return formats
+
+
+def detect_datetime_columns(df: pd.DataFrame, min_parsed: float = 0.8,
+                            sample_size: int = DATETIME_SAMPLE_SIZE) -> Dict[str, Optional[str]]:
+    """Datetime-like columns of df mapped to their inferred format, in column order
+
+    Columns already parsed to datetime64 and columns named like dates are always
+    included; their format is None when there is nothing to infer.
+    """
+    detected = {}
+    for col in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[col]):
+            detected[col] = None
+            continue
+        named = is_datetime_name(col)
+        fmt = infer_datetime_format(df[col], min_parsed, sample_size) if is_text_dtype(df[col]) else None
+        if named or fmt is not None:
+            detected[col] = fmt
+    return detected
+
+
+def parse_datetime(series: pd.Series, fmt: Optional[str] = None) -> pd.Series:
+    """Vectorized parse with an explicit format; falls back to pandas inference when fmt is None"""
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        return pd.to_datetime(series, format=fmt, errors='coerce')
+
+
+def datetime_sample(df: pd.DataFrame, cols: List[str],
+                    sample_size: int = DATETIME_SAMPLE_SIZE) -> Dict[str, pd.Series]:
+    """Non-missing values spread over each column, skipping empty ones"""
+    samples = {col: _spread_sample(df[col], sample_size) for col in cols}
+    return {col: sample for col, sample in samples.items() if len(sample) > 0}
+
+
+def _spread_sample(series: pd.Series, sample_size: int) -> pd.Series:
+    """Non-missing values at evenly spaced positions
+
+    Spreading the sample over the column disambiguates day/month order more often
+    than its head does, and avoids copying the whole column to drop missing values.
+    """
+    if len(series) <= sample_size:
+        return series.dropna()
+    positions = np.unique(np.linspace(0, len(series) - 1, sample_size).astype(np.int64))
+    sample = series.iloc[positions].dropna()
+    if len(sample) < sample_size // 2:
+        # Mostly missing at the sampled positions; fall back to the leading values
+        sample = series.dropna().head(sample_size)
+    return sample
+
+
+@lru_cache(maxsize=DATETIME_CACHE_SIZE)
+def _infer_sample_format(values: Tuple[str, ...]) -> Tuple[Optional[str], float, float]:
+    """Best guessed format, the share of values it parses, and the share passing the pre-filter"""
+    sample = pd.Series(values, dtype=object)
+    candidates = sample.str.contains(DATETIME_CANDIDATE_PATTERN, regex=True)
+    candidate_share = float(candidates.mean())
+    if candidate_share == 0:
+        return None, 0.0, 0.0
+
+    guesses = []
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        for value in sample[candidates].head(DATETIME_GUESS_VALUES):
+            for dayfirst in (False, True):
+                fmt = guess_datetime_format(value, dayfirst=dayfirst)
+                if fmt is not None and fmt not in guesses:
+                    guesses.append(fmt)
+
+    best_format, best_rate = None, 0.0
+    for fmt in guesses:
+        rate = float(parse_datetime(sample, fmt).notna().mean())
+        if rate > best_rate:
+            best_format, best_rate = fmt, rate
+    return best_format, best_rate, candidate_share
+
+
+@lru_cache(maxsize=DATETIME_CACHE_SIZE)
+def _mixed_parse_rate(values: Tuple[str, ...]) -> float:
+    """Share of values parseable one by one; only tried when no single format fits"""
+    return float(parse_datetime(pd.Series(values, dtype=object), 'mixed').notna().mean())
@@ -0,0 +1,145 @@
+import numpy as np
+import pandas as pd
+from typing import Callable, Dict, List, Optional, Tuple
+from app.preprocessing.parallel import PARALLEL_MIN_CELLS, effective_n_jobs, make_executor, split_evenly
+from app.preprocessing.text import (
+    TEXT_PATTERNS, as_text, character_counts, mean_word_lengths, tokenize, unique_word_counts, word_counts
+)
+
+# Epoch that days_since_epoch counts from
+EPOCH = pd.Timestamp('1970-01-01')
+
+
+def _as_float(x) -> np.ndarray:
+    return x.to_numpy(dtype=np.float64, na_value=np.nan) if isinstance(x, pd.Series) else np.asarray(x, np.float64)
+
+
+# Operations a plan node may apply to the values of its inputs. Nodes store the
+# operation name, not the function, so fitted plans pickle and stay readable.
+FEATURE_OPS: Dict[str, Callable] = {
+    # Numeric; float64 so integer columns downcast at ingest cannot overflow
+    'float': _as_float,
+    'abs': np.abs,
+    'square': np.square,
+    'cube': lambda x: np.power(x, 3),
+    'sqrt': np.sqrt,
+    'log1p': np.log1p,
+    'mul': np.multiply,
+    'div': lambda a, b: a / (b + 1e-8),
+    'add': np.add,
+    'sub': np.subtract,
+    # Datetime parts of a parsed datetime64 column
+    'year': lambda d: d.dt.year,
+    'month': lambda d: d.dt.month,
+    'day': lambda d: d.dt.day,
+    'dayofweek': lambda d: d.dt.dayofweek,
+    'hour': lambda d: d.dt.hour,
+    'quarter': lambda d: d.dt.quarter,
+    'is_weekend': lambda dayofweek: (dayofweek >= 5).astype(int),
+    'is_month_start': lambda d: d.dt.is_month_start.astype(int),
+    'is_month_end': lambda d: d.dt.is_month_end.astype(int),
+    'days_since_epoch': lambda d: (d - EPOCH).dt.days,
+    # Text statistics over the Arrow-backed string form and its tokens (see text.py)
+    'text': as_text,
+    'words': tokenize,
+    'length': character_counts,
+    'count': word_counts,
+    'unique_count': unique_word_counts,
+    'mean_length': mean_word_lengths,
+    'uppercase_count': lambda text: character_counts(text, TEXT_PATTERNS['uppercase_count']),
+    'digit_count': lambda text: character_counts(text, TEXT_PATTERNS['digit_count']),
+    'special_char_count': lambda text: character_counts(text, TEXT_PATTERNS['special_char_count'])
+}
+
+
+class FeaturePlan:
+    """Declarative DAG of engineered features over source columns
+
+    Each node names an operation and its inputs, which are source columns or other
+    nodes. Nothing is computed when nodes are added; evaluate() computes only the
+    requested features and what they depend on, each shared subexpression (a
+    column cast to float, a parsed text column, its word lists) exactly once.
+    Intermediate nodes use names like 'float(x)' so they never clash with columns.
+    Features over different source columns are independent, so evaluate() can
+    spread them over a thread or process pool.
+    """
+
+    def __init__(self):
+        self.nodes: Dict[str, Tuple[str, Tuple[str, ...]]] = {}
+
+    def add(self, name: str, op: str, *inputs: str) -> str:
+        """Register name = op(*inputs) and return name; re-adding an identical node is a no-op"""
+        if op not in FEATURE_OPS:
+            raise ValueError(f"Unknown feature operation: {op}")
+        node = (op, tuple(inputs))
+        if self.nodes.get(name, node) != node:
+            raise ValueError(f"Feature {name} is already defined differently")
+        self.nodes[name] = node
+        return name
+
+    def __contains__(self, name) -> bool:
+        return name in self.nodes
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def sources(self, names: List[str]) -> List[str]:
+        """Columns outside the plan that names depend on, in first-use order"""
+        found, seen = [], set()
+        stack = list(reversed(names))
+        while stack:
+            name = stack.pop()
+            if name in seen:
+                continue
+            seen.add(name)
+            if name in self.nodes:
+                stack.extend(reversed(self.nodes[name][1]))
+            else:
+                found.append(name)
+        return found
+
+    def evaluate(self, df: pd.DataFrame, names: List[str], cache: Optional[Dict] = None,
+                 n_jobs: Optional[int] = 1, backend: str = 'thread') -> Dict:
+        """Values of the requested features computed from the source columns of df
+
+        Pass the same cache to several calls to share subexpressions between them.
+        With n_jobs > 1, features are grouped by the source columns they read and
+        the groups are evaluated concurrently; the result is identical and keeps
+        the order of names. Thread workers share the cache. Process workers receive
+        only their source columns and return only the requested features, so their
+        intermediates are not cached.
+        """
+        cache = {} if cache is None else cache
+        n_workers = effective_n_jobs(n_jobs)
+        if n_workers == 1 or len(df) * len(names) < PARALLEL_MIN_CELLS:
+            return {name: self._resolve(df, name, cache) for name in names}
+
+        groups = {}
+        for name in names:
+            groups.setdefault(tuple(self.sources([name])), []).append(name)
+        # Several tasks per worker balance groups of uneven cost
+        tasks = [sum(task, []) for task in split_evenly(list(groups.values()), n_workers * 4)]
+        with make_executor(n_workers, backend) as executor:
+            if backend == 'process':
+                futures = [executor.submit(_evaluate_names, self, df[self.sources(task)], task) for task in tasks]
+            else:
+                futures = [executor.submit(self.evaluate, df, task, cache) for task in tasks]
+            values = {}
+            for future in futures:
+                values.update(future.result())
+        return {name: values[name] for name in names}
+
+    def _resolve(self, df: pd.DataFrame, name: str, cache: Dict):
+        if name in cache:
+            return cache[name]
+        if name not in self.nodes:
+            return df[name]
+        op, inputs = self.nodes[name]
+        value = FEATURE_OPS[op](*[self._resolve(df, source, cache) for source in inputs])
+        cache[name] = value
+        return value
+
+
+def _evaluate_names(plan: FeaturePlan, df: pd.DataFrame, names: List[str]) -> Dict:
+    """Process-pool task: evaluate names on the source columns shipped with it"""
+    return plan.evaluate(df, names)
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from typing import List, Tuple
+
+# Buckets a hashed column is spread over when none are given
+HASH_BUCKETS = 64
+
+# Key of the value hash; fixed so buckets agree across processes, runs and machines
+HASH_KEY = '0123456789123456'
+
+
+def hash_values(series: pd.Series, n_buckets: int, signed: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+    """Bucket and sign of every value; missing values get sign 0
+
+    Values are hashed in their string form with a fixed key, so a value lands in
+    the same bucket in every chunk and batch, seen at fit time or not. With signed
+    hashing the sign comes from the top hash bit, so colliding values tend to
+    cancel instead of adding up.
+    """
+    if n_buckets < 1:
+        raise ValueError("n_buckets must be at least 1")
+    missing = series.isna().to_numpy()
+    text = series.astype(str).to_numpy(dtype=object)
+    hashes = pd.util.hash_array(text, hash_key=HASH_KEY, categorize=True)
+    buckets = (hashes % np.uint64(n_buckets)).astype(np.int64)
+    signs = np.where(hashes >> np.uint64(63), -1.0, 1.0) if signed else np.ones(len(hashes))
+    signs[missing] = 0.0
+    return buckets, signs
+
+
+def hashed_block(series: pd.Series, n_buckets: int, signed: bool = True) -> sp.csr_matrix:
+    """CSR matrix with one column per bucket and at most one stored value per row"""
+    buckets, signs = hash_values(series, n_buckets, signed)
+    n = len(buckets)
+    block = sp.csr_matrix((signs, buckets, np.arange(n + 1)), shape=(n, n_buckets))
+    block.eliminate_zeros()
+    return block
+
+
+def hashed_frame(series: pd.Series, n_buckets: int, signed: bool = True, prefix: str = '') -> pd.DataFrame:
+    """Dense float64 columns named prefix_hash_<bucket>, aligned with series"""
+    buckets, signs = hash_values(series, n_buckets, signed)
+    values = np.zeros((len(buckets), n_buckets))
+    values[np.arange(len(buckets)), buckets] = signs
+    return pd.DataFrame(values, index=series.index, columns=hashed_names(prefix, n_buckets))
+
+
+def hashed_names(prefix: str, n_buckets: int) -> List[str]:
+    """Column names of the buckets of a hashed column"""
+    return [f'{prefix}_hash_{bucket}' for bucket in range(n_buckets)]
@@ -0,0 +1,113 @@
+import os
+import numpy as np
+import pandas as pd
+from typing import Iterator
+from app.preprocessing.column_stats import DEFAULT_CHUNKSIZE
+from app.preprocessing.datetime_detection import infer_datetime_format, parse_datetime
+
+# String columns with at most this share of distinct values are stored as `category`
+CATEGORY_MAX_RATIO = 0.5
+
+# Handle optional imports gracefully
+try:
+    import pyarrow.parquet as pq
+    ARROW_STRINGS_AVAILABLE = True
+except ImportError:
+    ARROW_STRINGS_AVAILABLE = False
+    print("Warning: pyarrow not available. High-cardinality strings stay Python objects.")
+
+
+def read_csv_compact(source, category_ratio: float = CATEGORY_MAX_RATIO, parse_dates: bool = True,
+                     **read_csv_kwargs) -> pd.DataFrame:
+    """pd.read_csv followed by compact_dtypes"""
+    return compact_dtypes(pd.read_csv(source, **read_csv_kwargs), category_ratio, parse_dates)
+
+
+def read_chunks(source, chunksize: int = DEFAULT_CHUNKSIZE, **read_csv_kwargs) -> Iterator[pd.DataFrame]:
+    """Row chunks of a frame, a Parquet file or directory of files, a CSV path or file object, or an iterable of frames
+
+    Only one chunk is in memory at a time, except for Parquet files without
+    pyarrow, which are read whole.
+    """
+    if isinstance(source, pd.DataFrame):
+        for start in range(0, max(len(source), 1), chunksize):
+            yield source.iloc[start:start + chunksize]
+    elif isinstance(source, (str, os.PathLike)) and (os.path.isdir(source) or str(source).endswith('.parquet')):
+        paths = ([os.path.join(source, name) for name in sorted(os.listdir(source)) if name.endswith('.parquet')]
+                 if os.path.isdir(source) else [source])
+        for path in paths:
+            if ARROW_STRINGS_AVAILABLE:
+                for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+                    yield batch.to_pandas()
+            else:
+                yield pd.read_parquet(path)
+    elif isinstance(source, (str, os.PathLike)) or hasattr(source, 'read'):
+        yield from pd.read_csv(source, chunksize=chunksize, **read_csv_kwargs)
+    else:
+        yield from source
+
+
+def compact_dtypes(df: pd.DataFrame, category_ratio: float = CATEGORY_MAX_RATIO,
+                   parse_dates: bool = True) -> pd.DataFrame:
+    """Copy of df in the smallest dtypes that hold its values exactly
+
+    Integers are downcast, floats become float32 when no value changes, and
+    string columns become `category` (low cardinality), datetime64 (when one
+    explicit format parses every value) or Arrow-backed strings. The saving is
+    recorded in attrs['compaction'] for DataProfiler._calculate_memory_usage.
+    """
+    original_bytes = int(df.memory_usage(deep=True).sum())
+    columns, conversions = [], {}
+    for col in df.columns:
+        series = df[col]
+        compact = _compact_series(series, category_ratio, parse_dates)
+        if compact.dtype != series.dtype:
+            conversions[col] = f"{series.dtype} -> {compact.dtype}"
+        columns.append(compact)
+
+    result = pd.concat(columns, axis=1) if columns else df.copy()
+    result.columns = df.columns
+    compact_bytes = int(result.memory_usage(deep=True).sum())
+    result.attrs['compaction'] = {
+        'original_mb': original_bytes / 1024**2,
+        'compact_mb': compact_bytes / 1024**2,
+        'saved_mb': (original_bytes - compact_bytes) / 1024**2,
+        'conversions': conversions
+    }
+    return result
+
+
+def fill_text(series: pd.Series, value) -> pd.Series:
+    """fillna that also works when value is not yet a category of a categorical column"""
+    if isinstance(series.dtype, pd.CategoricalDtype) and value not in series.cat.categories:
+        series = series.cat.add_categories([value])
+    return series.fillna(value)
+
+
+def _compact_series(series: pd.Series, category_ratio: float, parse_dates: bool) -> pd.Series:
+    dtype = series.dtype
+    if pd.api.types.is_bool_dtype(dtype):
+        return series
+    if pd.api.types.is_integer_dtype(dtype) and dtype.kind in 'iu':
+        return pd.to_numeric(series, downcast='integer' if dtype.kind == 'i' else 'unsigned')
+    if pd.api.types.is_float_dtype(dtype) and dtype.itemsize > 4:
+        narrowed = series.astype(np.float32)
+        with np.errstate(invalid='ignore'):
+            exact = np.array_equal(narrowed.to_numpy(dtype=np.float64), series.to_numpy(), equal_nan=True)
+        return narrowed if exact else series
+    if dtype != object or pd.api.types.infer_dtype(series, skipna=True) != 'string':
+        return series
+
+    if parse_dates:
+        fmt = infer_datetime_format(series)
+        if fmt is not None and fmt != 'mixed':
+            parsed = parse_datetime(series, fmt)
+            if parsed.notna().sum() == series.notna().sum():
+                return parsed
+
+    non_missing = series.notna().sum()
+    if series.nunique() <= category_ratio * non_missing:
+        return series.astype('category')
+    if ARROW_STRINGS_AVAILABLE:
+        return series.astype('string[pyarrow]')
+    return series
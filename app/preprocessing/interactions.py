@@ -0,0 +1,165 @@
+import time
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+
+# Interaction pairs kept by default; the old first-five-columns rule also produced ten
+INTERACTION_TOP_K = 10
+
+# Rows screened at most; pair scores on a uniform subsample rank pairs almost as well
+INTERACTION_SAMPLE_ROWS = 20_000
+
+# Upper bound on float32 cells of the screening matrix, so wide frames screen fewer rows
+INTERACTION_SCREEN_CELLS = 2 ** 24
+
+# Never screen on fewer rows than this, however wide the frame
+INTERACTION_MIN_ROWS = 500
+
+# Columns per block; one block pair costs three (block x block) matrix products
+INTERACTION_BLOCK_COLS = 512
+
+# Most frequent classes of a categorical target screened as separate indicators
+INTERACTION_MAX_CLASSES = 10
+
+# Seconds spent scoring block pairs before the best pairs found so far are returned
+INTERACTION_TIME_BUDGET = 10.0
+
+
+def screen_interactions(df: pd.DataFrame, y, columns: Optional[List[str]] = None,
+                        top_k: int = INTERACTION_TOP_K, time_budget: Optional[float] = INTERACTION_TIME_BUDGET,
+                        sample_rows: int = INTERACTION_SAMPLE_ROWS, random_state: int = 42) -> Dict:
+    """Rank pairwise products (and squares) of numeric columns by how well they explain y
+
+    y is first regressed on the main effects of a row subsample; each candidate
+    z_i * z_j of standardized columns is then scored by its absolute correlation
+    with that residual, so products that only restate a main effect rank low.
+    All pairs of a column block come from three matrix products, which keeps
+    thousands of columns tractable. Non-numeric targets are screened one class
+    indicator at a time and a pair keeps its best class score.
+
+    Returns {'pairs': [(col1, col2, score)] strongest first (at most top_k),
+    'squares': {col: score}, 'screened_pairs': int, 'complete': bool}, where
+    complete is False when time_budget stopped the scan early.
+    """
+    columns = list(df.columns) if columns is None else list(columns)
+    p = len(columns)
+    pair_rows, pair_cols = np.empty(0, np.int64), np.empty(0, np.int64)
+    pair_scores, squares = np.empty(0, np.float32), np.full(p, np.nan, dtype=np.float32)
+    screened, complete = 0, True
+
+    residuals, rows = _target_residuals(df, y, columns, sample_rows, random_state)
+    if residuals is None or p == 0:
+        return _screening_result(columns, pair_rows, pair_cols, pair_scores, squares, screened, complete)
+    z = _standardized(df, columns, rows)
+    residuals = residuals - _main_effects_fit(z, residuals)
+
+    started = time.perf_counter()
+    ranges = [(start, min(start + INTERACTION_BLOCK_COLS, p)) for start in range(0, p, INTERACTION_BLOCK_COLS)]
+    for a, (a0, a1) in enumerate(ranges):
+        for b0, b1 in ranges[a:]:
+            if time_budget is not None and time.perf_counter() - started > time_budget:
+                complete = False
+                break
+            block = _pair_scores(z[:, a0:a1], z[:, b0:b1], residuals)
+            if a0 == b0:
+                squares[a0:a1] = np.diagonal(block)
+            i, j = np.nonzero(np.isfinite(block))
+            i, j = i + a0, j + b0
+            upper = j > i
+            i, j = i[upper], j[upper]
+            screened += len(i)
+            pair_rows = np.concatenate([pair_rows, i])
+            pair_cols = np.concatenate([pair_cols, j])
+            pair_scores = np.concatenate([pair_scores, block[i - a0, j - b0]])
+            if len(pair_scores) > top_k:
+                keep = np.argpartition(-pair_scores, top_k - 1)[:top_k] if top_k > 0 else []
+                pair_rows, pair_cols, pair_scores = pair_rows[keep], pair_cols[keep], pair_scores[keep]
+        if not complete:
+            break
+
+    return _screening_result(columns, pair_rows, pair_cols, pair_scores, squares, screened, complete)
+
+
+def _screening_result(columns: List[str], rows: np.ndarray, cols: np.ndarray, scores: np.ndarray,
+                      squares: np.ndarray, screened: int, complete: bool) -> Dict:
+    order = np.lexsort((cols, rows, -scores))
+    return {
+        'pairs': [(columns[i], columns[j], float(score)) for i, j, score in zip(rows[order], cols[order], scores[order])],
+        'squares': {col: float(score) for col, score in zip(columns, squares) if np.isfinite(score)},
+        'screened_pairs': int(screened),
+        'complete': complete
+    }
+
+
+def _target_residuals(df: pd.DataFrame, y, columns: List[str], sample_rows: int, random_state: int):
+    """(n, classes) centered float32 target matrix on the screened rows, and those row positions
+
+    Numeric targets give one column; other targets one indicator column per frequent class.
+    Rows with a missing target are never screened. Returns (None, rows) when y is
+    None or constant.
+    """
+    n = len(df)
+    valid = np.arange(n) if y is None else np.flatnonzero(pd.notna(np.asarray(y)))
+    n_rows = min(sample_rows, max(INTERACTION_MIN_ROWS, INTERACTION_SCREEN_CELLS // max(1, len(columns))))
+    if len(valid) > n_rows:
+        valid = np.sort(np.random.default_rng(random_state).choice(valid, size=n_rows, replace=False))
+    if y is None or len(valid) < 2:
+        return None, valid
+
+    target = pd.Series(np.asarray(y)[valid])
+    if pd.api.types.is_numeric_dtype(target) and not pd.api.types.is_bool_dtype(target):
+        matrix = target.to_numpy(dtype=np.float64)[:, None]
+    else:
+        codes, _ = pd.factorize(target)
+        classes = np.argsort(-np.bincount(codes), kind='stable')[:INTERACTION_MAX_CLASSES]
+        # Two classes carry one signal; more get one indicator each
+        classes = classes[1:] if len(classes) == 2 else classes
+        matrix = (codes[:, None] == classes[None, :]).astype(np.float64)
+    matrix = matrix - matrix.mean(axis=0)
+    if not (matrix.std(axis=0) > 0).any():
+        return None, valid
+    return matrix.astype(np.float32), valid
+
+
+def _standardized(df: pd.DataFrame, columns: List[str], rows: np.ndarray) -> np.ndarray:
+    """Column-major float32 z-scores of the screened rows; missing values and constants become 0"""
+    z = np.zeros((len(rows), len(columns)), dtype=np.float32, order='F')
+    for k, col in enumerate(columns):
+        values = df[col].to_numpy(dtype=np.float64, na_value=np.nan)[rows]
+        values[~np.isfinite(values)] = np.nan
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean, std = np.nanmean(values), np.nanstd(values)
+        if np.isfinite(std) and std > 0:
+            z[:, k] = np.nan_to_num((values - mean) / std)
+    return z
+
+
+def _main_effects_fit(z: np.ndarray, residuals: np.ndarray) -> np.ndarray:
+    """Least-squares fit of the target on the main effects, when the sample can support one"""
+    if z.shape[1] == 0 or z.shape[1] * 4 > z.shape[0]:
+        # Too wide to regress reliably; screen against the centered target instead
+        return np.zeros_like(residuals)
+    coef, *_ = np.linalg.lstsq(z, residuals, rcond=None)
+    return (z @ coef).astype(np.float32)
+
+
+def _pair_scores(za: np.ndarray, zb: np.ndarray, residuals: np.ndarray) -> np.ndarray:
+    """|corr(z_a * z_b, r)| for every column pair of two blocks, best over target columns
+
+    With E[r] = 0, cov(z_a z_b, r) = E[z_a z_b r] and the product's variance is
+    E[z_a^2 z_b^2] - E[z_a z_b]^2, each a single matrix product over the rows.
+    """
+    n = za.shape[0]
+    mean = za.T @ zb / n
+    var = (za * za).T @ (zb * zb) / n - mean * mean
+    best = np.full(mean.shape, -np.inf, dtype=np.float32)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        scale = np.sqrt(np.where(var > 1e-12, var, np.nan))
+        for k in range(residuals.shape[1]):
+            r = residuals[:, k]
+            r_std = r.std()
+            if not r_std > 0:
+                continue
+            cov = (za * r[:, None]).T @ zb / n
+            best = np.fmax(best, np.abs(cov) / (scale * r_std))
+    return np.where(np.isfinite(best), best, np.nan).astype(np.float32)
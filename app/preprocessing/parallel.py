@@ -0,0 +1,81 @@
+import os
+import numpy as np
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+from typing import List, Optional, Sequence, Tuple
+
+# Supported worker pools for per-column profiling work
+BACKENDS = ('thread', 'process')
+
+# Frames with fewer cells than this are profiled serially; pool start-up would dominate
+PARALLEL_MIN_CELLS = 1_000_000
+
+# Fewer candidate columns than this are checked serially for the same reason
+PARALLEL_MIN_COLUMNS = 64
+
+
+def effective_n_jobs(n_jobs: Optional[int]) -> int:
+    """Worker count following the scikit-learn convention (None = 1, -1 = all cores)"""
+    if n_jobs is None or n_jobs == 0:
+        return 1
+    if n_jobs < 0:
+        return max(1, (os.cpu_count() or 1) + 1 + n_jobs)
+    return n_jobs
+
+
+def check_backend(backend: str) -> None:
+    """Reject unknown pool types up front rather than at the first parallel call"""
+    if backend not in BACKENDS:
+        raise ValueError(f"backend must be one of {BACKENDS}")
+
+
+def make_executor(n_workers: int, backend: str) -> Executor:
+    """Thread pool (NumPy kernels release the GIL) or process pool (pure-Python work)"""
+    check_backend(backend)
+    if backend == 'process':
+        return ProcessPoolExecutor(max_workers=n_workers)
+    return ThreadPoolExecutor(max_workers=n_workers)
+
+
+def split_evenly(items: Sequence, n_parts: int) -> List[list]:
+    """Contiguous groups of near-equal size, never empty"""
+    n_parts = max(1, min(n_parts, len(items)))
+    bounds = np.linspace(0, len(items), n_parts + 1).astype(int)
+    return [list(items[start:stop]) for start, stop in zip(bounds[:-1], bounds[1:])]
+
+
+class SharedArray:
+    """Column-major float64 matrix in shared memory, handed to process workers by name
+
+    Workers attach with attach_shared() and read the buffer in place, so the
+    matrix is written once by the parent and never pickled.
+    """
+
+    def __init__(self, shape: Tuple[int, int]):
+        self.shape = shape
+        self._shm = shared_memory.SharedMemory(create=True, size=max(1, shape[0] * shape[1] * 8))
+        self.array = np.ndarray(shape, dtype=np.float64, buffer=self._shm.buf, order='F')
+
+    @property
+    def spec(self) -> Tuple[str, Tuple[int, int]]:
+        """Picklable handle for attach_shared()"""
+        return self._shm.name, self.shape
+
+    def close(self) -> None:
+        """Release and remove the segment; views of self.array become invalid"""
+        self.array = None
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self) -> 'SharedArray':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def attach_shared(spec: Tuple[str, Tuple[int, int]]) -> Tuple[shared_memory.SharedMemory, np.ndarray]:
+    """Map a SharedArray in a worker; drop the array before calling close() on the segment"""
+    name, shape = spec
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=np.float64, buffer=shm.buf, order='F')
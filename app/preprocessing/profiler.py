@@ -1,7 +1,37 @@
+import glob
+import os
+import joblib
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple, Optional
-from sklearn.feature_selection import SelectKBest, f_classif
+from typing import Callable, Dict, List, Tuple, Optional
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.utils.validation import check_is_fitted
+from app.preprocessing.column_stats import (
+    DEFAULT_CHUNKSIZE, TEXT_DTYPES, StreamingColumnStats, compute_column_stats, is_text_dtype, stream_csv,
+    stream_frame
+)
+from app.preprocessing.correlation import (
+    CORRELATION_METHODS, compute_correlations, empty_correlations, summarize_correlation_matrix
+)
+from app.preprocessing.feature_plan import FeaturePlan
+from app.preprocessing.ingest import fill_text, read_chunks
+from app.preprocessing.interactions import INTERACTION_TIME_BUDGET, INTERACTION_TOP_K, screen_interactions
+from app.preprocessing.datetime_detection import (
+    datetime_sample, detect_datetime_columns, infer_datetime_formats, is_datetime_name, parse_datetime
+)
+from app.preprocessing.parallel import (
+    PARALLEL_MIN_CELLS, PARALLEL_MIN_COLUMNS, check_backend, effective_n_jobs, make_executor, split_evenly
+)
+from app.preprocessing.selection import SELECTION_TIME_BUDGET, screen_features
+from app.preprocessing.hashing import hashed_block, hashed_frame, hashed_names
+from app.preprocessing.sparse import SPARSE_ONE_HOT_MAX_LEVELS, design_matrix, one_hot_block
+from app.preprocessing.sampling import (
+    distinct_interval, exact_interval, mean_interval, median_interval, proportion_interval,
+    sample_csv, scale_sample_stats, stratified_sample, uniform_sample
+)
+from app.preprocessing.sketches import (
+    CountMinSketch, FrequentItems, HyperLogLog, QuantileSketch, sketch_parameters
+)
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -13,125 +43,247 @@ except ImportError:
     CATEGORY_ENCODERS_AVAILABLE = False
     print("Warning: category-encoders not available. Using fallback encoding.")
 
+# Rows fit_chunked holds in memory to choose encoders, plan features and bound generated columns
+FIT_SAMPLE_ROWS = 100_000
+
+# File name of the n-th partition transform_chunked writes
+PARTITION_NAME = 'part-{:05d}.parquet'
+
 class DataProfiler:
-    """Enterprise-grade data profiling with comprehensive analysis"""
+    """Enterprise-grade data profiling with comprehensive analysis
+    
+    mode='approximate' replaces exact distinct counts, quantiles and modes with
+    fixed-size sketches whose error is governed by `accuracy`. n_jobs > 1 spreads
+    per-column work over a thread or process pool (`backend`). Correlations are
+    summarized as the strongest pairs under `correlation_method`; the packed
+    matrix is included only when `correlation_matrix` is set.
+    """
     
-    def __init__(self):
+    def __init__(self, mode: str = 'exact', accuracy: float = 0.01, n_jobs: Optional[int] = 1,
+                 backend: str = 'thread', correlation_method: str = 'pearson',
+                 correlation_matrix: bool = False):
+        if mode not in ('exact', 'approximate'):
+            raise ValueError("mode must be 'exact' or 'approximate'")
+        if correlation_method not in CORRELATION_METHODS:
+            raise ValueError(f"correlation_method must be one of {CORRELATION_METHODS}")
+        check_backend(backend)
         self.profile = {}
+        self.mode = mode
+        self.accuracy = accuracy
+        self.n_jobs = n_jobs
+        self.backend = backend
+        self.correlation_method = correlation_method
+        self.correlation_matrix = correlation_matrix
         
     def analyze_dataset(self, df: pd.DataFrame) -> Dict:
         """Generate comprehensive data profile with enterprise features"""
+        if self.mode == 'approximate':
+            return self._profile_from_accumulator(stream_frame(df, accuracy=self.accuracy))
+        
+        # Every section below reads from this single pass instead of rescanning df
+        stats = compute_column_stats(df, self.n_jobs, self.backend)
+        return self._build_profile(df, stats, self._calculate_memory_usage(df),
+                                   self._compute_correlations(df))
+    
+    def analyze_csv(self, source, chunksize: int = DEFAULT_CHUNKSIZE, **read_csv_kwargs) -> Dict:
+        """Profile a CSV path or file object in bounded memory by streaming it in chunks
+        
+        Returns the same profile shape as analyze_dataset. Sections that need raw rows
+        (datetime detection, feature importance) run on a uniform reservoir sample.
+        """
+        return self._profile_from_accumulator(
+            stream_csv(source, chunksize, self.accuracy, **read_csv_kwargs))
+    
+    def profile_state(self, df: pd.DataFrame, chunksize: int = DEFAULT_CHUNKSIZE) -> StreamingColumnStats:
+        """Mergeable statistics of df for update_profile; persist them with save()"""
+        return stream_frame(df, chunksize, self.accuracy)
+    
+    def update_profile(self, state: StreamingColumnStats, new_rows,
+                       chunksize: int = DEFAULT_CHUNKSIZE) -> Dict:
+        """Absorb appended rows into stored profile state and return the refreshed profile
+        
+        new_rows is a DataFrame or an iterable of chunks (e.g. pd.read_csv with
+        chunksize). Work is proportional to the new rows; the profile has the
+        analyze_csv shape, with sketch-backed distinct counts, quantiles and modes.
+        """
+        if isinstance(new_rows, pd.DataFrame):
+            state.update_frame(new_rows, chunksize)
+        else:
+            state.update_many(new_rows)
+        return self._profile_from_accumulator(state)
+    
+    def quick_profile(self, df: pd.DataFrame, sample_size: int = 10_000, stratify_by: Optional[str] = None,
+                      confidence: float = 0.95, population_rows: Optional[int] = None) -> Dict:
+        """Fast estimated profile from a row sample, with confidence intervals
+        
+        Counts are scaled to the population and intervals are reported under
+        'confidence_intervals'. df may itself be a sample of a larger dataset, in
+        which case population_rows gives the (estimated) full row count.
+        """
+        if stratify_by is not None:
+            sample = stratified_sample(df, sample_size, stratify_by)
+        else:
+            sample = uniform_sample(df, sample_size)
+        population = population_rows if population_rows is not None else len(df)
+        
+        stats = compute_column_stats(sample)
+        intervals = self._sample_intervals(sample, stats, population, confidence)
+        nunique = {col: interval['estimate'] for col, interval in intervals['unique_counts'].items()}
+        scaled_stats = scale_sample_stats(stats, population, nunique)
+        
+        scale = population / len(sample) if len(sample) else 0.0
+        memory_usage = self._calculate_memory_usage(sample)
+        memory_usage = {
+            'total_mb': memory_usage['total_mb'] * scale,
+            'per_column_mb': {col: mb * scale for col, mb in memory_usage['per_column_mb'].items()}
+        }
+        profile = self._build_profile(sample, scaled_stats, memory_usage,
+                                      self._compute_correlations(sample), estimate_importance=False)
+        profile.update({
+            'is_estimate': len(sample) < population,
+            'sample_size': len(sample),
+            'confidence': confidence,
+            'confidence_intervals': intervals
+        })
+        return profile
+    
+    def quick_profile_csv(self, source, sample_size: int = 10_000, confidence: float = 0.95) -> Dict:
+        """Quick profile of a CSV sampled by random seeks, without reading the whole file"""
+        sample, row_count = sample_csv(source, sample_size, confidence=confidence)
+        profile = self.quick_profile(sample, sample_size, confidence=confidence,
+                                     population_rows=row_count['estimate'])
+        profile['is_estimate'] = profile['is_estimate'] or not row_count['exact']
+        profile['confidence_intervals']['row_count'] = row_count
+        return profile
+    
+    def _sample_intervals(self, sample: pd.DataFrame, stats: Dict, population: int, confidence: float) -> Dict:
+        """Confidence intervals for population missing rates, distinct counts, means and medians"""
+        n = len(sample)
+        intervals = {
+            'row_count': exact_interval(population),
+            'missing_percentage': {},
+            'unique_counts': {col: distinct_interval(sample[col], population) for col in sample.columns},
+            'mean': {},
+            'median': {}
+        }
+        for col, count in stats['missing'].items():
+            interval = proportion_interval(count, n, population, confidence)
+            intervals['missing_percentage'][col] = {
+                key: value * 100 if key != 'exact' else value for key, value in interval.items()
+            }
+        for col in stats['numeric_cols']:
+            values = sample[col].dropna().to_numpy(dtype=np.float64)
+            col_population = int(round(population * len(values) / n)) if n else 0
+            intervals['mean'][col] = mean_interval(values, col_population, confidence)
+            intervals['median'][col] = median_interval(np.sort(values), col_population, confidence)
+        return intervals
+    
+    def _profile_from_accumulator(self, accumulator: StreamingColumnStats) -> Dict:
+        """Build a profile from sketch-backed statistics and their reservoir sample"""
+        stats = accumulator.result()
+        memory_usage = accumulator.memory_usage()
+        if self.correlation_method == 'pearson':
+            correlations = summarize_correlation_matrix(accumulator.correlation_matrix(),
+                                                        include_matrix=self.correlation_matrix)
+        else:
+            # Only Pearson co-moments are accumulated; other measures use the row sample
+            correlations = self._compute_correlations(accumulator.sample)
+        return self._build_profile(accumulator.sample, stats, {
+            'total_mb': float(sum(memory_usage.values()) / 1024**2),
+            'per_column_mb': {col: float(usage / 1024**2) for col, usage in memory_usage.items()}
+        }, correlations)
+    
+    def _build_profile(self, df: pd.DataFrame, stats: Dict, memory_usage: Dict, correlations: Dict,
+                       estimate_importance: bool = True) -> Dict:
+        """Assemble profile sections from precomputed statistics; df may be a row sample"""
+        n_rows = stats['n_rows']
         profile = {
-            'shape': df.shape,
-            'memory_usage': self._calculate_memory_usage(df),
-            'missing_values': df.isnull().sum().to_dict(),
-            'missing_percentage': (df.isnull().sum() / len(df) * 100).to_dict(),
-            'dtypes': df.dtypes.astype(str).to_dict(),
-            'numeric_cols': df.select_dtypes(include=[np.number]).columns.tolist(),
-            'categorical_cols': df.select_dtypes(include=['object']).columns.tolist(),
+            'shape': (n_rows, stats['n_cols']),
+            'memory_usage': memory_usage,
+            'missing_values': stats['missing'],
+            'missing_percentage': {col: (count / n_rows * 100 if n_rows else 0.0)
+                                   for col, count in stats['missing'].items()},
+            'dtypes': stats['dtypes'],
+            'numeric_cols': stats['numeric_cols'],
+            'categorical_cols': stats['categorical_cols'],
             'datetime_cols': self._detect_datetime_cols(df),
-            'high_cardinality': [col for col in df.columns if df[col].nunique() > 50],
-            'low_cardinality': [col for col in df.columns if df[col].nunique() <= 10],
-            'unique_counts': {col: int(df[col].nunique()) for col in df.columns},
-            'outliers': self._detect_outliers(df),
-            'correlations': self._compute_correlations(df),
-            'feature_importance_estimate': self._estimate_feature_importance(df),
-            'data_quality_score': self._calculate_data_quality_score(df),
-            'recommendations': self._generate_recommendations(df),
-            'statistical_summary': self._generate_statistical_summary(df)
+            'high_cardinality': [col for col, count in stats['nunique'].items() if count > 50],
+            'low_cardinality': [col for col, count in stats['nunique'].items() if count <= 10],
+            'unique_counts': dict(stats['nunique']),
+            'outliers': self._detect_outliers(df, stats),
+            'correlations': correlations,
+            'feature_importance_estimate': self._estimate_feature_importance(df) if estimate_importance else {},
+            'data_quality_score': self._calculate_data_quality_score(df, stats),
+            'statistical_summary': self._generate_statistical_summary(df, stats)
         }
+        profile['recommendations'] = self._generate_recommendations(df, profile)
         return profile
     
     def _calculate_memory_usage(self, df: pd.DataFrame) -> Dict:
         """Calculate memory usage statistics"""
         memory_usage = df.memory_usage(deep=True)
-        return {
+        usage = {
             'total_mb': float(memory_usage.sum() / 1024**2),
             'per_column_mb': {col: float(usage / 1024**2) 
                             for col, usage in memory_usage.items()}
         }
+        
+        # Frames from the compact ingest stage report what their dtypes saved
+        compaction = df.attrs.get('compaction')
+        if compaction:
+            usage.update({
+                'original_mb': float(compaction['original_mb']),
+                'saved_mb': float(compaction['saved_mb']),
+                'dtype_conversions': dict(compaction['conversions'])
+            })
+        return usage
     
     def _detect_datetime_cols(self, df: pd.DataFrame) -> List[str]:
         """Detect potential datetime columns"""
-        datetime_cols = []
-        for col in df.columns:
-            if 'date' in col.lower() or 'time' in col.lower():
-                datetime_cols.append(col)
-            elif df[col].dtype == 'object':
-                # Try to parse a sample
-                sample = df[col].dropna().head(100)
-                if len(sample) > 0:
-                    try:
-                        pd.to_datetime(sample, infer_datetime_format=True, errors='coerce')
-                        parsed_count = pd.to_datetime(sample, errors='coerce').notna().sum()
-                        if parsed_count / len(sample) > 0.8:  # 80% successfully parsed
-                            datetime_cols.append(col)
-                    except:
-                        pass
-        return datetime_cols
-        
-    def _detect_outliers(self, df: pd.DataFrame) -> Dict:
+        named = {col for col in df.columns
+                 if is_datetime_name(col) or pd.api.types.is_datetime64_any_dtype(df[col])}
+        
+        # Infer a format from a sample of every other text column
+        samples = datetime_sample(df, [col for col in df.columns
+                                       if col not in named and is_text_dtype(df[col])])
+        
+        n_workers = effective_n_jobs(self.n_jobs)
+        if n_workers > 1 and len(samples) >= PARALLEL_MIN_COLUMNS:
+            groups = split_evenly(list(samples), n_workers * 4)
+            with make_executor(n_workers, self.backend) as executor:
+                parsed = set().union(*executor.map(
+                    infer_datetime_formats, [{col: samples[col] for col in group} for group in groups]))
+        else:
+            parsed = set(infer_datetime_formats(samples))
+        
+        return [col for col in df.columns if col in named or col in parsed]
+        
+    def _detect_outliers(self, df: pd.DataFrame, stats: Optional[Dict] = None) -> Dict:
         """Advanced outlier detection using multiple methods"""
+        stats = stats or compute_column_stats(df)
         outliers = {}
-        numeric_cols = df.select_dtypes(include=[np.number]).columns
         
-        for col in numeric_cols:
-            try:
-                col_data = df[col].dropna()
-                if len(col_data) == 0:
-                    outliers[col] = {'iqr': 0, 'zscore': 0, 'isolation_forest': 0}
-                    continue
-                
-                # IQR method
-                Q1, Q3 = col_data.quantile([0.25, 0.75])
-                IQR = Q3 - Q1
-                lower, upper = Q1 - 1.5*IQR, Q3 + 1.5*IQR
-                iqr_outliers = len(col_data[(col_data < lower) | (col_data > upper)])
-                
-                # Z-Score method
-                z_scores = np.abs((col_data - col_data.mean()) / col_data.std())
-                zscore_outliers = len(z_scores[z_scores > 3])
-                
-                outliers[col] = {
-                    'iqr': iqr_outliers,
-                    'zscore': zscore_outliers,
-                    'percentage': float(iqr_outliers / len(col_data) * 100)
-                }
-                
-            except Exception as e:
-                outliers[col] = {'iqr': 0, 'zscore': 0, 'percentage': 0.0}
+        for col, col_stats in stats['numeric'].items():
+            count = col_stats['count']
+            if count == 0:
+                outliers[col] = {'iqr': 0, 'zscore': 0, 'isolation_forest': 0}
+                continue
+            
+            # IQR and Z-Score counts come from the shared single-pass statistics
+            outliers[col] = {
+                'iqr': col_stats['iqr_outliers'],
+                'zscore': col_stats['zscore_outliers'],
+                'percentage': float(col_stats['iqr_outliers'] / count * 100)
+            }
                 
         return outliers
         
     def _compute_correlations(self, df: pd.DataFrame) -> Dict:
         """Compute comprehensive correlation analysis"""
         try:
-            numeric_df = df.select_dtypes(include=[np.number])
-            if len(numeric_df.columns) > 1:
-                corr_matrix = numeric_df.corr()
-                
-                # Find highly correlated pairs
-                high_corr_pairs = []
-                for i in range(len(corr_matrix.columns)):
-                    for j in range(i+1, len(corr_matrix.columns)):
-                        corr_val = corr_matrix.iloc[i, j]
-                        if abs(corr_val) > 0.8 and not pd.isna(corr_val):
-                            high_corr_pairs.append({
-                                'feature1': corr_matrix.columns[i],
-                                'feature2': corr_matrix.columns[j],
-                                'correlation': float(corr_val)
-                            })
-                
-                return {
-                    'matrix': {col1: {col2: float(corr_matrix.loc[col1, col2]) 
-                                     if not pd.isna(corr_matrix.loc[col1, col2]) else 0.0
-                                     for col2 in corr_matrix.columns}
-                              for col1 in corr_matrix.columns},
-                    'high_correlations': high_corr_pairs
-                }
+            return compute_correlations(df, self.correlation_method, include_matrix=self.correlation_matrix)
         except Exception:
-            pass
-        return {'matrix': {}, 'high_correlations': []}
+            return empty_correlations(self.correlation_method)
     
     def _estimate_feature_importance(self, df: pd.DataFrame) -> Dict:
         """Estimate feature importance for numeric target if available"""
@@ -161,23 +313,23 @@ class DataProfiler:
             pass
         return {}
     
-    def _calculate_data_quality_score(self, df: pd.DataFrame) -> float:
+    def _calculate_data_quality_score(self, df: pd.DataFrame, stats: Optional[Dict] = None) -> float:
         """Calculate overall data quality score (0-100)"""
         try:
+            stats = stats or compute_column_stats(df)
+            n_rows, n_cols = stats['n_rows'], stats['n_cols']
             scores = []
             
             # Completeness score
-            completeness = 1 - df.isnull().sum().sum() / (df.shape[0] * df.shape[1])
+            completeness = 1 - sum(stats['missing'].values()) / (n_rows * n_cols)
             scores.append(completeness * 100)
             
             # Uniqueness score (avoiding duplicates)
-            uniqueness = 1 - df.duplicated().sum() / len(df)
+            uniqueness = 1 - stats['duplicate_rows'] / n_rows
             scores.append(uniqueness * 100)
             
             # Consistency score (valid data types)
-            consistency = 1 - len([col for col in df.columns 
-                                 if df[col].dtype == 'object' and 
-                                 df[col].str.contains(r'^[\d\s\-\+\(\)\.]+$', na=False).any()]) / df.shape[1]
+            consistency = 1 - len(stats['numeric_like_cols']) / n_cols
             scores.append(consistency * 100)
             
             return float(np.mean(scores))
@@ -185,338 +337,766 @@ class DataProfiler:
         except Exception:
             return 75.0  # Default reasonable score
     
-    def _generate_statistical_summary(self, df: pd.DataFrame) -> Dict:
+    def _generate_statistical_summary(self, df: pd.DataFrame, stats: Optional[Dict] = None) -> Dict:
         """Generate comprehensive statistical summary"""
+        stats = stats or compute_column_stats(df)
         summary = {}
         
         # Numeric columns summary
-        numeric_cols = df.select_dtypes(include=[np.number]).columns
-        if len(numeric_cols) > 0:
-            numeric_summary = df[numeric_cols].describe()
+        if stats['numeric']:
             summary['numeric'] = {
                 col: {
-                    'mean': float(numeric_summary.loc['mean', col]),
-                    'std': float(numeric_summary.loc['std', col]),
-                    'min': float(numeric_summary.loc['min', col]),
-                    'max': float(numeric_summary.loc['max', col]),
-                    'median': float(df[col].median()),
-                    'skewness': float(df[col].skew()),
-                    'kurtosis': float(df[col].kurtosis())
-                } for col in numeric_cols
+                    'mean': col_stats['mean'],
+                    'std': col_stats['std'],
+                    'min': col_stats['min'],
+                    'max': col_stats['max'],
+                    'median': col_stats['median'],
+                    'skewness': col_stats['skewness'],
+                    'kurtosis': col_stats['kurtosis']
+                } for col, col_stats in stats['numeric'].items()
             }
         
         # Categorical columns summary
-        categorical_cols = df.select_dtypes(include=['object']).columns
-        if len(categorical_cols) > 0:
-            summary['categorical'] = {
-                col: {
-                    'unique_count': int(df[col].nunique()),
-                    'most_frequent': str(df[col].mode().iloc[0]) if len(df[col].mode()) > 0 else 'N/A',
-                    'most_frequent_count': int(df[col].value_counts().iloc[0]) if len(df[col]) > 0 else 0
-                } for col in categorical_cols
-            }
+        if stats['categorical']:
+            summary['categorical'] = {col: dict(col_stats) for col, col_stats in stats['categorical'].items()}
         
         return summary
         
-    def _generate_recommendations(self, df: pd.DataFrame) -> List[str]:
+    def _generate_recommendations(self, df: pd.DataFrame, profile: Optional[Dict] = None) -> List[str]:
         """Generate comprehensive automated recommendations"""
+        if profile is None:
+            profile = self.analyze_dataset(df)
         recommendations = []
         
         # Missing value recommendations
-        missing_cols = df.columns[df.isnull().sum() > 0].tolist()
+        missing_cols = [col for col, count in profile['missing_values'].items() if count > 0]
         if missing_cols:
-            high_missing = [col for col in missing_cols if df[col].isnull().sum() / len(df) > 0.5]
+            high_missing = [col for col in missing_cols if profile['missing_percentage'][col] > 50]
             if high_missing:
                 recommendations.append(f"Consider dropping columns with >50% missing values: {', '.join(high_missing[:3])}")
             else:
                 recommendations.append(f"Handle missing values in: {', '.join(missing_cols[:3])}")
         
         # Datetime recommendations
-        datetime_cols = self._detect_datetime_cols(df)
+        datetime_cols = profile['datetime_cols']
         if datetime_cols:
             recommendations.append(f"Extract datetime features from: {', '.join(datetime_cols[:3])}")
             
         # High cardinality recommendations
-        categorical_cols = df.select_dtypes(include=['object']).columns
-        for col in categorical_cols:
-            unique_count = df[col].nunique()
+        for col in profile['categorical_cols']:
+            unique_count = profile['unique_counts'][col]
             if unique_count > 50:
                 recommendations.append(f"Apply target encoding for high cardinality: {col}")
             elif unique_count <= 10:
                 recommendations.append(f"Apply one-hot encoding for: {col}")
         
         # Correlation recommendations
-        correlations = self._compute_correlations(df)
+        correlations = profile['correlations']
         if correlations.get('high_correlations'):
             high_corr = correlations['high_correlations'][:2]  # Top 2
             for pair in high_corr:
                 recommendations.append(f"High correlation detected: {pair['feature1']} ↔ {pair['feature2']} ({pair['correlation']:.2f})")
         
         # Outlier recommendations
-        outliers = self._detect_outliers(df)
+        outliers = profile['outliers']
         high_outlier_cols = [col for col, stats in outliers.items() 
                            if isinstance(stats, dict) and stats.get('percentage', 0) > 10]
         if high_outlier_cols:
             recommendations.append(f"Review outliers in: {', '.join(high_outlier_cols[:3])}")
         
         # Data quality recommendations
-        quality_score = self._calculate_data_quality_score(df)
+        quality_score = profile['data_quality_score']
         if quality_score < 70:
             recommendations.append("Data quality score is low. Consider data cleaning.")
         
         return recommendations
 
-class AutoFeatureEngineer:
-    """Enterprise-grade automated feature engineering"""
+class AutoFeatureEngineer(BaseEstimator, TransformerMixin):
+    """Enterprise-grade automated feature engineering, fitted once and replayed by transform()
     
-    def __init__(self):
+    mode: 'exact' statistics, or 'approximate' from fixed-memory sketches.
+    max_interactions, interaction_time_budget: pairs kept by screening against the target.
+    max_features, selection_time_budget: numeric outputs kept by screen_features.
+    sparse_output: return a CSR design matrix with sparse one-hot blocks.
+    hash_buckets, signed_hashing: hash text columns too large for the other encodings.
+    n_jobs, backend: thread or process pool for per-column work and generated features.
+    """
+    
+    def __init__(self, mode: str = 'exact', accuracy: float = 0.01, max_interactions: int = INTERACTION_TOP_K,
+                 interaction_time_budget: Optional[float] = INTERACTION_TIME_BUDGET, n_jobs: Optional[int] = 1,
+                 backend: str = 'thread', max_features: Optional[int] = None,
+                 selection_time_budget: Optional[float] = SELECTION_TIME_BUDGET, sparse_output: bool = False,
+                 hash_buckets: Optional[int] = None, signed_hashing: bool = True):
+        if mode not in ('exact', 'approximate'):
+            raise ValueError("mode must be 'exact' or 'approximate'")
+        check_backend(backend)
         self.transformations_applied = []
+        self.mode = mode
+        self.accuracy = accuracy
+        self.max_interactions = max_interactions
+        self.interaction_time_budget = interaction_time_budget
+        self.n_jobs = n_jobs
+        self.backend = backend
+        self.max_features = max_features
+        self.selection_time_budget = selection_time_budget
+        self.sparse_output = sparse_output
+        self.hash_buckets = hash_buckets
+        self.signed_hashing = signed_hashing
         
     def engineer_features(self, df: pd.DataFrame, target_col: Optional[str] = None) -> pd.DataFrame:
-        """Apply comprehensive feature engineering pipeline"""
-        df_engineered = df.copy()
-        self.transformations_applied = []
-        
+        """Fit on df and return it engineered; df is returned unchanged if fitting fails"""
         try:
-            # 1. Handle missing values
-            df_engineered = self._handle_missing_values(df_engineered)
-            
-            # 2. Extract datetime features
-            df_engineered = self._extract_datetime_features(df_engineered)
-            
-            # 3. Encode categorical variables
-            df_engineered = self._encode_categoricals(df_engineered, target_col)
-            
-            # 4. Create polynomial features
-            df_engineered = self._create_polynomial_features(df_engineered)
-            
-            # 5. Extract text features
-            df_engineered = self._extract_text_features(df_engineered)
-            
-            # 6. Create interaction features
-            df_engineered = self._create_interaction_features(df_engineered)
-            
-            # 7. Apply feature scaling preparation
-            df_engineered = self._prepare_scaling_features(df_engineered)
-            
+            return self.fit_transform(df, target_col=target_col)
         except Exception as e:
             print(f"Feature engineering warning: {e}")
             return df
-            
-        return df_engineered
+    
+    def fit(self, X: pd.DataFrame, y=None, target_col: Optional[str] = None) -> 'AutoFeatureEngineer':
+        """Learn every stage from X; y (or X[target_col]) feeds target encoding"""
+        self.fit_transform(X, y, target_col)
+        return self
+    
+    def fit_transform(self, X: pd.DataFrame, y=None, target_col: Optional[str] = None):
+        """Learn each stage on the output of the previous one and return X engineered
+        
+        target_col is kept out of every stage and passed through unchanged, so a
+        fitted engineer can score batches that have no target.
+        """
+        self.transformations_applied = []
+        self.target_col_ = target_col if target_col in X.columns else None
+        df = X.drop(columns=[self.target_col_]) if self.target_col_ else X.copy()
+        if y is None and self.target_col_:
+            y = X[self.target_col_]
+        if y is not None and not isinstance(y, pd.Series):
+            y = pd.Series(np.asarray(y), index=X.index)
+        self.feature_names_in_ = np.asarray(df.columns, dtype=object)
+        self.feature_plan_ = FeaturePlan()
+        self.selected_features_ = None
+        self.feature_selection_ = None
+        # Subexpressions shared between stages (float casts, word lists) are computed once
+        cache = {}
+        
+        # 1. Handle missing values
+        self._fit_missing_values(df)
+        df = self._handle_missing_values(df)
+        
+        # 2. Extract datetime features
+        self._fit_datetime_features(df)
+        df = self._parse_datetime_columns(df)
+        df = self._materialize(df, self._plan_datetime_features(df), cache)
+        
+        # 3. Encode categorical variables
+        self._fit_categoricals(df, y)
+        blocks = self._sparse_blocks(df)
+        df = self._encode_categoricals(df)
+        
+        # 4. Create polynomial features
+        self._fit_interaction_screening(df, y)
+        df = self._materialize(df, self._plan_polynomial_features(df), cache)
+        
+        # 5. Extract text features
+        df = self._materialize(df, self._plan_text_features(df), cache)
+        
+        # 6. Create interaction features
+        df = self._materialize(df, self._plan_interaction_features(df), cache)
+        cache.clear()
+        # Kept until now because plan nodes over the datetime parts trace back to them
+        df = df.drop(columns=self._parsed_datetime_columns(df))
+        
+        # 7. Apply feature scaling preparation
+        self._fit_scaling_features(df)
+        df = self._prepare_scaling_features(df)
+        
+        self.feature_names_out_ = list(df.columns)
+        self.numeric_features_ = list(self._select_columns(df, [np.number, 'bool']))
+        
+        # 8. Select features
+        if self.max_features is not None and y is not None:
+            df = self._select_engineered_features(df, y)
+        
+        if self.sparse_output:
+            return self._design_matrix(df, blocks)
+        return self._attach_target(df, X)
+    
+    def transform(self, X: pd.DataFrame):
+        """Apply the fitted stages to new rows; nothing is re-estimated
+        
+        Only the output columns (all, or those passed to select_features) and the
+        plan nodes they depend on are computed, so only their source columns need
+        to be present. Extra columns are ignored; output columns keep the fitted order.
+        """
+        check_is_fitted(self, 'feature_names_out_')
+        features = self._dense_features()
+        sources = self._input_columns(features)
+        absent = [col for col in sources if col not in X.columns]
+        if absent:
+            raise ValueError(f"Columns seen in fit are missing: {absent}")
+        df = X[sources].copy()
+        
+        df = self._handle_missing_values(df)
+        df = self._parse_datetime_columns(df)
+        blocks = self._sparse_blocks(df)
+        df = self._encode_categoricals(df)
+        values = self.feature_plan_.evaluate(df, [name for name in features if name in self.feature_plan_],
+                                             n_jobs=self.n_jobs, backend=self.backend)
+        df = pd.DataFrame({name: values[name] if name in values else df[name] for name in features},
+                          index=df.index)
+        df = self._prepare_scaling_features(df)
+        
+        if self.sparse_output:
+            return self._design_matrix(df, blocks)
+        return self._attach_target(df, X)
+    
+    def fit_chunked(self, source, target_col: Optional[str] = None, chunksize: int = DEFAULT_CHUNKSIZE,
+                    sample_rows: int = FIT_SAMPLE_ROWS, **read_csv_kwargs) -> 'AutoFeatureEngineer':
+        """Fit on data too large for memory in one pass over its chunks
+        
+        source is anything read_chunks accepts: a CSV or Parquet path, a frame or an
+        iterable of frames. Fill values, cardinalities, categories, frequency tables
+        and clip bounds of input columns come from mergeable sketches fed every
+        chunk; encoders, the feature plan and clip bounds of generated columns are
+        learned on a uniform sample of sample_rows rows.
+        """
+        streamed = StreamingColumnStats(sample_size=sample_rows, track_correlations=False,
+                                        frequency_error=self.accuracy / 100, **sketch_parameters(self.accuracy))
+        streamed.update_many(read_chunks(source, chunksize, **read_csv_kwargs))
+        if streamed.n_rows == 0:
+            raise ValueError("No rows to fit on")
+        self._streamed = streamed
+        try:
+            self.fit_transform(streamed.sample, target_col=target_col)
+        finally:
+            del self._streamed
+        self.transformations_applied.insert(
+            0, f"Fitted statistics on {streamed.n_rows} rows and features on a {len(streamed.sample)}-row sample")
+        return self
+    
+    def transform_chunked(self, source, output_dir: str, chunksize: int = DEFAULT_CHUNKSIZE,
+                          **read_csv_kwargs) -> Dict:
+        """Stream chunks of source through transform() and write each as a Parquet partition of output_dir
+        
+        Partitions are cast to the dtypes of the first one, so the directory reads
+        back as a single dataset with pd.read_parquet(output_dir). Clipped integer
+        columns are written as float64, since clipping to fractional bounds turns
+        them float in chunks that reach a bound. Returns
+        {'path', 'partitions', 'n_rows', 'columns'}.
+        """
+        check_is_fitted(self, 'feature_names_out_')
+        if self.sparse_output:
+            raise ValueError("Sparse design matrices cannot be written as Parquet partitions")
+        os.makedirs(output_dir, exist_ok=True)
+        if glob.glob(os.path.join(output_dir, PARTITION_NAME.replace('{:05d}', '*'))):
+            raise ValueError(f"{output_dir} already holds partitions; write to an empty directory")
+        partitions, n_rows, dtypes = [], 0, None
+        for chunk in read_chunks(source, chunksize, **read_csv_kwargs):
+            if len(chunk) == 0:
+                continue
+            engineered = self.transform(chunk)
+            if dtypes is None:
+                dtypes = {col: np.dtype(np.float64) if col in self.clip_bounds_ and
+                          pd.api.types.is_integer_dtype(dtype) else dtype
+                          for col, dtype in engineered.dtypes.items()}
+            engineered = engineered.astype(dtypes)
+            path = os.path.join(output_dir, PARTITION_NAME.format(len(partitions)))
+            engineered.to_parquet(path, index=False)
+            partitions.append(path)
+            n_rows += len(engineered)
+        return {'path': output_dir, 'partitions': partitions, 'n_rows': n_rows,
+                'columns': list(dtypes) if dtypes is not None else []}
+    
+    def select_features(self, features: Optional[List[str]]) -> 'AutoFeatureEngineer':
+        """Restrict transform() to these output columns; None restores all of them"""
+        check_is_fitted(self, 'feature_names_out_')
+        if features is None:
+            self.selected_features_ = None
+            return self
+        unknown = set(features) - set(self.feature_names_out_)
+        if unknown:
+            raise ValueError(f"Not produced by this engineer: {sorted(unknown)}")
+        wanted = set(features)
+        self.selected_features_ = [col for col in self.feature_names_out_ if col in wanted]
+        return self
+    
+    def get_feature_names_out(self, input_features=None) -> np.ndarray:
+        """Engineered column names transform() returns, target excluded"""
+        check_is_fitted(self, 'feature_names_out_')
+        names = self._dense_features()
+        if self.sparse_output:
+            names = names + [name for col, encoding in self._sparse_encodings().items()
+                             for name in self._encoded_columns(col, encoding)]
+        return np.asarray(names, dtype=object)
+    
+    def save(self, path: str) -> str:
+        """Persist the fitted engineer, e.g. next to the model it feeds"""
+        joblib.dump(self, path)
+        return path
+    
+    @classmethod
+    def load(cls, path: str) -> 'AutoFeatureEngineer':
+        """Restore an engineer written by save()"""
+        engineer = joblib.load(path)
+        if not isinstance(engineer, cls):
+            raise ValueError(f"{path} does not contain a fitted {cls.__name__}")
+        return engineer
+    
+    def _attach_target(self, df: pd.DataFrame, X: pd.DataFrame) -> pd.DataFrame:
+        """Append the untouched target column when the input has one"""
+        if self.target_col_ and self.target_col_ in X.columns:
+            df[self.target_col_] = X[self.target_col_]
+        return df
+    
+    def _dense_features(self) -> List[str]:
+        """Engineered frame columns transform() computes; numeric ones only for sparse output"""
+        names = self.selected_features_ if self.selected_features_ is not None else self.feature_names_out_
+        if self.sparse_output:
+            numeric = set(self.numeric_features_)
+            return [name for name in names if name in numeric]
+        return list(names)
+    
+    def _input_columns(self, features: List[str]) -> List[str]:
+        """Input columns the given output columns are derived from, in input order
+        
+        Sparse-encoded columns are always needed: their indicators are always output.
+        """
+        encoded_sources = {encoded: col for col, encoding in self.category_encodings_.items()
+                           for encoded in self._encoded_columns(col, encoding)}
+        needed = {encoded_sources.get(col, col) for col in self.feature_plan_.sources(features)}
+        needed |= set(self._sparse_encodings())
+        return [col for col in self.feature_names_in_ if col in needed]
+    
+    def _materialize(self, df: pd.DataFrame, names: List[str], cache: Dict) -> pd.DataFrame:
+        """Evaluate planned features and append them to df"""
+        return self._append_features(df, self.feature_plan_.evaluate(df, names, cache, self.n_jobs, self.backend))
+    
+    def _fit_missing_values(self, df: pd.DataFrame) -> None:
+        """Learn a fill value for every numeric and text column, missing in training or not"""
+        self.fill_values_ = {}
+        for col, fill_val in zip(df.columns, self._map_columns(self._fill_value, df, df.columns)):
+            if fill_val is None:
+                continue
+            self.fill_values_[col] = fill_val
+            if self._has_missing(df, col):
+                strategy = 'mode/Unknown' if is_text_dtype(df[col]) else 'median'
+                self.transformations_applied.append(f"Filled missing values in {col} with {strategy}")
+    
+    def _fill_value(self, series: pd.Series):
+        """Median of a numeric column, mode (or 'Unknown') of a text column, None for other dtypes"""
+        if pd.api.types.is_integer_dtype(series) or pd.api.types.is_float_dtype(series):
+            return self._quantiles(series, [0.5], self._source_sketch('quantiles', series.name))[0]
+        if is_text_dtype(series):
+            return self._most_frequent(series, 'Unknown', self._source_sketch('frequent', series.name))
+        return None
     
     def _handle_missing_values(self, df: pd.DataFrame) -> pd.DataFrame:
         """Intelligent missing value handling"""
-        for col in df.columns:
-            missing_pct = df[col].isnull().sum() / len(df)
-            
-            if missing_pct > 0:
-                if df[col].dtype in ['int64', 'float64']:
-                    # Numeric: fill with median
-                    df[col] = df[col].fillna(df[col].median())
-                    self.transformations_applied.append(f"Filled missing values in {col} with median")
-                    
-                elif df[col].dtype == 'object':
-                    # Categorical: fill with mode or 'Unknown'
-                    mode_val = df[col].mode()
-                    fill_val = mode_val.iloc[0] if len(mode_val) > 0 else 'Unknown'
-                    df[col] = df[col].fillna(fill_val)
-                    self.transformations_applied.append(f"Filled missing values in {col} with mode/Unknown")
+        for col, fill_val in self.fill_values_.items():
+            if col in df.columns and df[col].isnull().any():
+                df[col] = fill_text(df[col], fill_val)
         
         return df
-        
-    def _extract_datetime_features(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Advanced datetime feature extraction"""
-        datetime_cols = []
-        
-        # Detect datetime columns
-        for col in df.columns:
-            if 'date' in col.lower() or 'time' in col.lower():
-                datetime_cols.append(col)
-            elif df[col].dtype == 'object':
-                try:
-                    sample = df[col].dropna().head(50)
-                    if len(sample) > 0:
-                        parsed = pd.to_datetime(sample, errors='coerce')
-                        if parsed.notna().sum() / len(sample) > 0.7:
-                            datetime_cols.append(col)
-                except:
-                    pass
-        
-        # Extract features
-        for col in datetime_cols:
+    
+    def _fit_datetime_features(self, df: pd.DataFrame) -> None:
+        """Detect datetime columns together with the one format that parses each"""
+        self.datetime_formats_ = detect_datetime_columns(df, min_parsed=0.7)
+    
+    def _parse_datetime_columns(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Parse detected datetime columns with their fitted formats"""
+        for col, fmt in self.datetime_formats_.items():
+            if col not in df.columns:
+                continue
             try:
-                df[col] = pd.to_datetime(df[col], errors='coerce')
-                
-                if df[col].dtype == 'datetime64[ns]':
-                    # Basic datetime features
-                    df[f'{col}_year'] = df[col].dt.year
-                    df[f'{col}_month'] = df[col].dt.month
-                    df[f'{col}_day'] = df[col].dt.day
-                    df[f'{col}_dayofweek'] = df[col].dt.dayofweek
-                    df[f'{col}_hour'] = df[col].dt.hour
-                    df[f'{col}_quarter'] = df[col].dt.quarter
-                    
-                    # Advanced datetime features
-                    df[f'{col}_is_weekend'] = (df[col].dt.dayofweek >= 5).astype(int)
-                    df[f'{col}_is_month_start'] = df[col].dt.is_month_start.astype(int)
-                    df[f'{col}_is_month_end'] = df[col].dt.is_month_end.astype(int)
-                    df[f'{col}_days_since_epoch'] = (df[col] - pd.Timestamp('1970-01-01')).dt.days
-                    
-                    self.transformations_applied.append(f"Extracted datetime features from {col}")
-                    
+                df[col] = parse_datetime(df[col], fmt)
             except Exception as e:
                 print(f"Error processing datetime column {col}: {e}")
                 continue
-                
-        return df
         
-    def _encode_categoricals(self, df: pd.DataFrame, target_col: Optional[str] = None) -> pd.DataFrame:
-        """Advanced categorical encoding with multiple strategies"""
-        categorical_cols = df.select_dtypes(include=['object']).columns
+        return df
         
-        for col in categorical_cols:
-            if col == target_col:
+    def _plan_datetime_features(self, df: pd.DataFrame) -> List[str]:
+        """Advanced datetime feature extraction"""
+        plan, names = self.feature_plan_, []
+        for col in self.datetime_formats_:
+            if df[col].dtype != 'datetime64[ns]':
                 continue
+            # Basic datetime features
+            for part in ('year', 'month', 'day', 'dayofweek', 'hour', 'quarter'):
+                names.append(plan.add(f'{col}_{part}', part, col))
+            
+            # Advanced datetime features
+            names.append(plan.add(f'{col}_is_weekend', 'is_weekend', f'{col}_dayofweek'))
+            names.append(plan.add(f'{col}_is_month_start', 'is_month_start', col))
+            names.append(plan.add(f'{col}_is_month_end', 'is_month_end', col))
+            names.append(plan.add(f'{col}_days_since_epoch', 'days_since_epoch', col))
+            
+            self.transformations_applied.append(f"Extracted datetime features from {col}")
                 
+        return names
+    
+    def _parsed_datetime_columns(self, df: pd.DataFrame) -> List[str]:
+        """Parsed datetime columns; their parts replace them since estimators cannot take datetime64"""
+        return [col for col in self.datetime_formats_ if col in df.columns and df[col].dtype == 'datetime64[ns]']
+    
+    def _fit_categoricals(self, df: pd.DataFrame, y: Optional[pd.Series] = None) -> None:
+        """Choose an encoding per text column by cardinality and learn what it needs"""
+        self.category_encodings_ = {}
+        for col in self._select_columns(df, TEXT_DTYPES):
             try:
-                unique_count = df[col].nunique()
+                unique_count = self._nunique(df[col], self._source_sketch('distinct', col))
                 
                 if unique_count == 1:
                     # Drop constant columns
-                    df.drop(col, axis=1, inplace=True)
+                    self.category_encodings_[col] = {'strategy': 'drop'}
                     self.transformations_applied.append(f"Dropped constant column: {col}")
                     
                 elif unique_count <= 5:
                     # One-hot encode low cardinality
-                    dummies = pd.get_dummies(df[col], prefix=col, drop_first=True, dummy_na=True)
-                    df = pd.concat([df.drop(col, axis=1), dummies], axis=1)
+                    self.category_encodings_[col] = {'strategy': 'one_hot',
+                                                     'categories': self._categories(df[col], col)}
                     self.transformations_applied.append(f"One-hot encoded: {col}")
                     
+                elif self.sparse_output and unique_count <= SPARSE_ONE_HOT_MAX_LEVELS:
+                    # Sparse indicators keep every level without dense columns
+                    self.category_encodings_[col] = {'strategy': 'sparse_one_hot',
+                                                     'categories': self._categories(df[col], col)}
+                    self.transformations_applied.append(f"Sparse one-hot encoded: {col}")
+                    
+                elif self.hash_buckets is not None and (unique_count > 20 or self.sparse_output):
+                    # Hashing keeps no per-value state and maps unseen values to buckets
+                    self.category_encodings_[col] = {'strategy': 'hashing', 'n_buckets': self.hash_buckets,
+                                                     'signed': self.signed_hashing}
+                    self.transformations_applied.append(f"Hash encoded: {col}")
+                    
                 elif unique_count <= 20:
                     # Ordinal encoding for medium cardinality
-                    df[f'{col}_encoded'] = pd.Categorical(df[col]).codes
-                    df.drop(col, axis=1, inplace=True)
+                    self.category_encodings_[col] = {'strategy': 'ordinal',
+                                                     'categories': self._categories(df[col], col)}
                     self.transformations_applied.append(f"Ordinal encoded: {col}")
                     
-                elif CATEGORY_ENCODERS_AVAILABLE and target_col and target_col in df.columns:
+                elif CATEGORY_ENCODERS_AVAILABLE and y is not None:
                     # Target encoding for high cardinality
-                    if df[target_col].dtype in ['int64', 'float64']:
+                    if pd.api.types.is_integer_dtype(y) or pd.api.types.is_float_dtype(y):
                         encoder = TargetEncoder()
-                        df[f'{col}_target_encoded'] = encoder.fit_transform(df[col], df[target_col])
-                        df.drop(col, axis=1, inplace=True)
+                        encoder.fit(df[col], y)
+                        self.category_encodings_[col] = {'strategy': 'target', 'encoder': encoder}
                         self.transformations_applied.append(f"Target encoded: {col}")
                 else:
                     # Frequency encoding as fallback
-                    freq_map = df[col].value_counts().to_dict()
-                    df[f'{col}_frequency'] = df[col].map(freq_map)
-                    df.drop(col, axis=1, inplace=True)
+                    self.category_encodings_[col] = {'strategy': 'frequency',
+                                                     'counts': self._frequency_table(
+                                                         df[col], self._source_sketch('frequencies', col))}
                     self.transformations_applied.append(f"Frequency encoded: {col}")
                     
             except Exception as e:
                 print(f"Error encoding {col}: {e}")
                 continue
-                
-        return df
-        
-    def _create_polynomial_features(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Create polynomial and interaction features"""
-        numeric_cols = df.select_dtypes(include=[np.number]).columns[:6]  # Limit to prevent explosion
         
-        # Square and cube features
-        for col in numeric_cols:
-            try:
-                if df[col].std() > 0:  # Avoid constant columns
-                    df[f'{col}_squared'] = df[col] ** 2
-                    df[f'{col}_cubed'] = df[col] ** 3
-                    df[f'{col}_sqrt'] = np.sqrt(np.abs(df[col]))
-                    df[f'{col}_log'] = np.log1p(np.abs(df[col]))
-                    
-                    self.transformations_applied.append(f"Created polynomial features for: {col}")
-            except Exception:
+    def _encode_categoricals(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Advanced categorical encoding with multiple strategies"""
+        encoded, present = [], [col for col in self.category_encodings_ if col in df.columns]
+        sparse = self._sparse_encodings()
+        for col in present:
+            encoding = self.category_encodings_[col]
+            strategy = encoding['strategy']
+            if col in sparse:
+                # Encoded by _sparse_blocks
                 continue
-                
-        return df
+            if strategy == 'one_hot':
+                values = pd.Series(pd.Categorical(df[col], categories=encoding['categories']), index=df.index)
+                encoded.append(pd.get_dummies(values, prefix=col, drop_first=True, dummy_na=True))
+            elif strategy == 'ordinal':
+                codes = pd.Categorical(df[col], categories=encoding['categories']).codes
+                encoded.append(pd.Series(codes, index=df.index, name=f'{col}_encoded'))
+            elif strategy == 'target':
+                values = encoding['encoder'].transform(df[col])
+                encoded.append(pd.Series(np.asarray(values).ravel(), index=df.index, name=f'{col}_target_encoded'))
+            elif strategy == 'frequency':
+                encoded.append(self._frequencies(df[col], encoding['counts']).rename(f'{col}_frequency'))
+            elif strategy == 'hashing':
+                encoded.append(hashed_frame(df[col], encoding['n_buckets'], encoding['signed'], prefix=col))
         
-    def _create_interaction_features(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Create feature interactions"""
-        numeric_cols = df.select_dtypes(include=[np.number]).columns[:5]
-        
-        for i, col1 in enumerate(numeric_cols):
-            for col2 in numeric_cols[i+1:]:
-                try:
-                    # Multiplication
-                    df[f'{col1}_x_{col2}'] = df[col1] * df[col2]
-                    # Division (safe)
-                    df[f'{col1}_div_{col2}'] = df[col1] / (df[col2] + 1e-8)
-                    # Addition
-                    df[f'{col1}_plus_{col2}'] = df[col1] + df[col2]
-                    # Subtraction
-                    df[f'{col1}_minus_{col2}'] = df[col1] - df[col2]
-                    
-                    self.transformations_applied.append(f"Created interaction features: {col1} × {col2}")
-                except Exception:
-                    continue
-                    
-        return df
+        # Encoded columns replace their sources, appended in encoding order
+        return self._concat_columns([df] + encoded, drop=present)
+    
+    @staticmethod
+    def _encoded_columns(col: str, encoding: Dict) -> List[str]:
+        """Names of the columns an encoding produces from col"""
+        strategy = encoding['strategy']
+        if strategy == 'one_hot':
+            # get_dummies with drop_first and dummy_na
+            return [f'{col}_{category}' for category in encoding['categories'][1:]] + [f'{col}_nan']
+        if strategy == 'sparse_one_hot':
+            # one_hot_block: every level, then missing and unseen values
+            return [f'{col}_{category}' for category in encoding['categories']] + [f'{col}_nan']
+        if strategy == 'hashing':
+            return hashed_names(col, encoding['n_buckets'])
+        suffixes = {'ordinal': 'encoded', 'target': 'target_encoded', 'frequency': 'frequency'}
+        return [f'{col}_{suffixes[strategy]}'] if strategy in suffixes else []
+    
+    def _sparse_encodings(self) -> Dict:
+        """Encodings emitted as sparse blocks: sparse one-hot, and hashing with sparse output"""
+        strategies = ('sparse_one_hot', 'hashing') if self.sparse_output else ('sparse_one_hot',)
+        return {col: encoding for col, encoding in self.category_encodings_.items()
+                if encoding['strategy'] in strategies}
+    
+    def _sparse_blocks(self, df: pd.DataFrame) -> List:
+        """CSR block of every sparse-encoded column, in encoding order"""
+        blocks = []
+        for col, encoding in self._sparse_encodings().items():
+            if col not in df.columns:
+                continue
+            if encoding['strategy'] == 'hashing':
+                blocks.append(hashed_block(df[col], encoding['n_buckets'], encoding['signed']))
+            else:
+                blocks.append(one_hot_block(df[col], encoding['categories']))
+        return blocks
+    
+    def _design_matrix(self, df: pd.DataFrame, blocks: List):
+        """Numeric engineered columns followed by the sparse indicator blocks"""
+        return design_matrix(df[self._dense_features()], blocks)
+    
+    def _fit_interaction_screening(self, df: pd.DataFrame, y: Optional[pd.Series]) -> None:
+        """Score squares and pairwise products of all numeric columns against the target"""
+        self.interaction_screening_ = None
+        if y is None:
+            return
+        screening = screen_interactions(df, y, self._select_columns(df, [np.number]), self.max_interactions,
+                                        self.interaction_time_budget)
+        if screening['squares']:
+            self.interaction_screening_ = screening
+            self.transformations_applied.append(
+                f"Screened {screening['screened_pairs']} candidate interactions against the target")
+    
+    def _plan_polynomial_features(self, df: pd.DataFrame) -> List[str]:
+        """Square, cube, sqrt and log of non-constant numeric columns, at most six to prevent explosion
         
-    def _extract_text_features(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Advanced text feature extraction"""
-        # Identify text columns
-        text_cols = []
-        for col in df.select_dtypes(include=['object']).columns:
+        Columns whose square best explains the target come first when it was screened.
+        """
+        plan, names = self.feature_plan_, []
+        self.polynomial_cols_ = []
+        if self.interaction_screening_ is not None:
+            squares = self.interaction_screening_['squares']
+            candidates = sorted(squares, key=lambda col: -squares[col])[:6]
+        else:
+            candidates = self._select_columns(df, [np.number])[:6]
+        for col in candidates:
             try:
-                avg_length = df[col].astype(str).str.len().mean()
-                if avg_length > 20:
-                    text_cols.append(col)
+                if not df[col].std() > 0:  # Avoid constant columns
+                    continue
             except Exception:
                 continue
-        
-        # Extract comprehensive text features
-        for col in text_cols:
-            try:
-                # Basic text features
-                df[f'{col}_length'] = df[col].astype(str).str.len()
-                df[f'{col}_word_count'] = df[col].astype(str).str.split().str.len()
-                df[f'{col}_char_count'] = df[col].astype(str).str.len()
-                df[f'{col}_unique_words'] = df[col].astype(str).apply(
-                    lambda x: len(set(str(x).split())) if pd.notna(x) else 0
-                )
-                
-                # Advanced text features
-                df[f'{col}_uppercase_count'] = df[col].astype(str).str.count(r'[A-Z]')
-                df[f'{col}_digit_count'] = df[col].astype(str).str.count(r'\d')
-                df[f'{col}_special_char_count'] = df[col].astype(str).str.count(r'[^a-zA-Z0-9\s]')
-                df[f'{col}_avg_word_length'] = df[col].astype(str).apply(
-                    lambda x: np.mean([len(word) for word in str(x).split()]) if str(x).split() else 0
-                )
-                
-                self.transformations_applied.append(f"Extracted text features from: {col}")
+            # float64 so downcast integer columns cannot overflow; |x| is shared by sqrt and log
+            values, magnitude = plan.add(f'float({col})', 'float', col), f'abs({col})'
+            plan.add(magnitude, 'abs', values)
+            names += [plan.add(f'{col}_squared', 'square', values), plan.add(f'{col}_cubed', 'cube', values),
+                      plan.add(f'{col}_sqrt', 'sqrt', magnitude), plan.add(f'{col}_log', 'log1p', magnitude)]
+            self.polynomial_cols_.append(col)
+            self.transformations_applied.append(f"Created polynomial features for: {col}")
                 
+        return names
+    
+    def _plan_text_features(self, df: pd.DataFrame) -> List[str]:
+        """Statistics of text columns averaging more than 20 characters"""
+        plan, names = self.feature_plan_, []
+        self.text_cols_ = []
+        for col in self._select_columns(df, TEXT_DTYPES):
+            try:
+                if not df[col].astype(str).str.len().mean() > 20:
+                    continue
             except Exception:
                 continue
+            # The string form is built and tokenized once for all statistics
+            text = plan.add(f'text({col})', 'text', col)
+            words = plan.add(f'words({col})', 'words', text)
+            
+            # Basic text features
+            names += [plan.add(f'{col}_length', 'length', text),
+                      plan.add(f'{col}_word_count', 'count', words),
+                      plan.add(f'{col}_unique_words', 'unique_count', words)]
+            
+            # Advanced text features
+            names += [plan.add(f'{col}_uppercase_count', 'uppercase_count', text),
+                      plan.add(f'{col}_digit_count', 'digit_count', text),
+                      plan.add(f'{col}_special_char_count', 'special_char_count', text),
+                      plan.add(f'{col}_avg_word_length', 'mean_length', words)]
+            self.text_cols_.append(col)
+            self.transformations_applied.append(f"Extracted text features from: {col}")
                 
-        return df
+        return names
+    
+    def _plan_interaction_features(self, df: pd.DataFrame) -> List[str]:
+        """Product, ratio, sum and difference of the screened pairs, or of pairs among the first five numeric columns"""
+        plan, names = self.feature_plan_, []
+        if self.interaction_screening_ is not None:
+            self.interaction_pairs_ = [(col1, col2) for col1, col2, _ in self.interaction_screening_['pairs']]
+        else:
+            numeric_cols = self._select_columns(df, [np.number])[:5]
+            self.interaction_pairs_ = [(col1, col2) for i, col1 in enumerate(numeric_cols)
+                                       for col2 in numeric_cols[i+1:]]
+        for col1, col2 in self.interaction_pairs_:
+            # float64 so downcast integer columns cannot overflow
+            left, right = plan.add(f'float({col1})', 'float', col1), plan.add(f'float({col2})', 'float', col2)
+            names += [plan.add(f'{col1}_x_{col2}', 'mul', left, right),
+                      plan.add(f'{col1}_div_{col2}', 'div', left, right),
+                      plan.add(f'{col1}_plus_{col2}', 'add', left, right),
+                      plan.add(f'{col1}_minus_{col2}', 'sub', left, right)]
+            self.transformations_applied.append(f"Created interaction features: {col1} × {col2}")
+                    
+        return names
+    
+    def _select_engineered_features(self, df: pd.DataFrame, y: pd.Series) -> pd.DataFrame:
+        """Restrict the output to the screened numeric features and every non-numeric column"""
+        numeric = list(self._select_columns(df, [np.number]))
+        self.feature_selection_ = screen_features(df, y, numeric, self.max_features,
+                                                  time_budget=self.selection_time_budget)
+        kept = set(self.feature_selection_['selected']) | (set(df.columns) - set(numeric))
+        self.select_features([col for col in df.columns if col in kept])
+        self.transformations_applied.append(
+            f"Selected {self.feature_selection_['n_selected']} of {len(numeric)} numeric features")
+        return df[self.selected_features_]
+    
+    def _fit_scaling_features(self, df: pd.DataFrame) -> None:
+        """Learn 1%/99% clip bounds per numeric column and the median fill after clipping
+        
+        Hashed indicators are left alone: a bucket set in under 1% of rows would clip to 0.
+        """
+        hashed = {name for col, encoding in self.category_encodings_.items() if encoding['strategy'] == 'hashing'
+                  for name in self._encoded_columns(col, encoding)}
+        columns = [col for col in self._select_columns(df, [np.number]) if col not in hashed]
+        bounds = self._map_columns(self._clip_bounds, df, columns)
+        self.clip_bounds_ = {col: col_bounds for col, col_bounds in zip(columns, bounds) if col_bounds is not None}
+    
+    def _clip_bounds(self, series: pd.Series) -> Optional[Tuple[float, float, float]]:
+        """(1% quantile, 99% quantile, median after clipping) of a column, None if they cannot be computed"""
+        try:
+            Q1, Q3 = self._quantiles(series, [0.01, 0.99], self._source_sketch('quantiles', series.name))
+            clipped = series.clip(lower=Q1, upper=Q3).replace([np.inf, -np.inf], np.nan)
+            return Q1, Q3, self._quantiles(clipped, [0.5])[0]
+        except Exception:
+            return None
         
     def _prepare_scaling_features(self, df: pd.DataFrame) -> pd.DataFrame:
         """Prepare features for scaling by handling extreme values"""
-        numeric_cols = df.select_dtypes(include=[np.number]).columns
-        
-        for col in numeric_cols:
-            try:
-                # Cap extreme outliers
-                Q1, Q3 = df[col].quantile([0.01, 0.99])
-                df[col] = df[col].clip(lower=Q1, upper=Q3)
-                
-                # Handle infinite values
-                df[col] = df[col].replace([np.inf, -np.inf], np.nan)
-                df[col] = df[col].fillna(df[col].median())
-                
-            except Exception:
-                continue
+        # Existing columns are overwritten in place; only inserts fragment the frame
+        columns = [col for col in self.clip_bounds_ if col in df.columns]
+        for col, values in zip(columns, self._map_columns(self._clip, df, columns)):
+            df[col] = values
                 
         return df
     
+    def _clip(self, series: pd.Series) -> pd.Series:
+        """Cap extreme outliers at the fitted bounds, then fill infinite values with the median"""
+        Q1, Q3, median = self.clip_bounds_[series.name]
+        return series.clip(lower=Q1, upper=Q3).replace([np.inf, -np.inf], np.nan).fillna(median)
+    
+    def _map_columns(self, func: Callable, df: pd.DataFrame, columns) -> List:
+        """[func(df[col]) for col in columns], on the worker pool when the frame is large enough"""
+        n_workers = effective_n_jobs(self.n_jobs)
+        if n_workers == 1 or len(df) * len(columns) < PARALLEL_MIN_CELLS:
+            return [func(df[col]) for col in columns]
+        with make_executor(n_workers, self.backend) as executor:
+            # Process workers receive the engineer with every task batch, so batch generously
+            return list(executor.map(func, (df[col] for col in columns),
+                                     chunksize=max(1, len(columns) // (n_workers * 4))))
+    
+    @staticmethod
+    def _append_features(df: pd.DataFrame, features: Dict) -> pd.DataFrame:
+        """Add a stage's generated columns with one concat instead of one insert per column
+        
+        Generated names that already exist replace the old column in its position, as df[name] = ... did.
+        """
+        for name in df.columns.intersection(list(features)):
+            df[name] = features[name]
+        added = {name: values for name, values in features.items() if name not in df.columns}
+        if not added:
+            return df
+        return AutoFeatureEngineer._concat_columns([df, pd.DataFrame(added, index=df.index)])
+    
+    @staticmethod
+    def _concat_columns(frames: List, drop=()) -> pd.DataFrame:
+        """Column-wise concat, leaving drop out of the first frame, that reuses the input blocks
+        
+        Without copy-on-write pandas consolidates the result (and drop copies),
+        copying the whole frame at every stage; with it the new blocks are attached
+        as-is. Inputs are always frames this engineer owns, so sharing is safe.
+        """
+        with pd.option_context('mode.copy_on_write', True):
+            first = frames[0].drop(columns=list(drop)) if len(drop) else frames[0]
+            return pd.concat([first] + list(frames[1:]), axis=1)
+    
+    @staticmethod
+    def _select_columns(df: pd.DataFrame, include: List) -> pd.Index:
+        """select_dtypes(include).columns, evaluated on an empty slice so no data is copied"""
+        return df.head(0).select_dtypes(include=include).columns
+    
+    def _source_sketch(self, kind: str, col: str):
+        """StreamingColumnStats sketch `kind` of input column col while fit_chunked runs, else None"""
+        streamed = getattr(self, '_streamed', None)
+        return None if streamed is None else getattr(streamed, kind).get(col)
+    
+    def _has_missing(self, df: pd.DataFrame, col: str) -> bool:
+        """Whether col has missing values, in any chunk when fitting chunked"""
+        streamed = getattr(self, '_streamed', None)
+        if streamed is not None and col in streamed.missing:
+            return streamed.missing[col] > 0
+        return bool(df[col].isnull().any())
+    
+    def _categories(self, series: pd.Series, col: str) -> list:
+        """Sorted distinct values, over every chunk when fitting chunked
+        
+        The frequent-items summary is exact while a column has fewer distinct values
+        than its capacity; beyond that only the most frequent values are known.
+        """
+        summary = self._source_sketch('frequent', col)
+        values = series if summary is None else list(summary.counts.index)
+        return list(pd.Categorical(values).categories)
+    
+    def _nunique(self, series: pd.Series, sketch: Optional[HyperLogLog] = None) -> int:
+        """Distinct non-missing values, via HyperLogLog in approximate mode or from a given sketch"""
+        if sketch is None and self.mode == 'exact':
+            return series.nunique()
+        if sketch is None:
+            sketch = HyperLogLog(sketch_parameters(self.accuracy)['hll_precision'])
+            sketch.update(series)
+        return sketch.count()
+    
+    def _quantiles(self, series: pd.Series, q: List[float], sketch: Optional[QuantileSketch] = None) -> List[float]:
+        """Quantiles of a numeric column, via a KLL sketch in approximate mode or from a given sketch"""
+        if sketch is None and self.mode == 'exact':
+            return series.quantile(q).tolist()
+        if sketch is None:
+            sketch = QuantileSketch(sketch_parameters(self.accuracy)['quantile_k'])
+            sketch.update(series.to_numpy(dtype=np.float64, na_value=np.nan))
+        return sketch.quantile(q).tolist()
+    
+    def _most_frequent(self, series: pd.Series, default=None, summary: Optional[FrequentItems] = None):
+        """Mode of a column, via a Misra-Gries summary in approximate mode or from a given summary"""
+        if summary is None and self.mode == 'exact':
+            mode_val = series.mode()
+            return mode_val.iloc[0] if len(mode_val) > 0 else default
+        if summary is None:
+            summary = FrequentItems(sketch_parameters(self.accuracy)['frequent_capacity'])
+            summary.update(series)
+        top = summary.top(1)
+        return top[0][0] if top else default
+    
+    def _frequency_table(self, series: pd.Series, sketch: Optional[CountMinSketch] = None):
+        """Training value counts, or a Count-Min sketch of them in approximate mode or when given one"""
+        if sketch is not None:
+            return sketch
+        if self.mode == 'exact':
+            return series.value_counts().to_dict()
+        sketch = CountMinSketch.from_error(self.accuracy / 100)
+        sketch.update(series)
+        return sketch
+    
+    def _frequencies(self, series: pd.Series, table) -> pd.Series:
+        """Training occurrence count of each row's value; values unseen in training count 0"""
+        if isinstance(table, CountMinSketch):
+            return pd.Series(table.estimate(series), index=series.index)
+        # Mapping a categorical would return a categorical; map its values instead
+        values = series.astype(object) if isinstance(series.dtype, pd.CategoricalDtype) else series
+        return values.map(table).fillna(0)
+    
     def get_transformation_summary(self) -> List[str]:
         """Get summary of all transformations applied"""
         return self.transformations_applied
@@ -0,0 +1,191 @@
+import io
+import math
+import os
+import numpy as np
+import pandas as pd
+from statistics import NormalDist
+from typing import Dict, Tuple
+
+# Below this many bytes a CSV is read in full rather than sampled by seeking
+FULL_READ_BYTES = 8 * 1024 ** 2
+
+
+def uniform_sample(df: pd.DataFrame, sample_size: int, random_state: int = 42) -> pd.DataFrame:
+    """Simple random sample of rows without replacement"""
+    if len(df) <= sample_size:
+        return df
+    return df.sample(n=sample_size, random_state=random_state)
+
+
+def stratified_sample(df: pd.DataFrame, sample_size: int, by: str, random_state: int = 42) -> pd.DataFrame:
+    """Proportional stratified sample that keeps at least one row of every stratum"""
+    if len(df) <= sample_size:
+        return df
+    codes, _ = pd.factorize(df[by], use_na_sentinel=False)
+    counts = np.bincount(codes)
+    allocation = np.maximum(1, np.round(counts * sample_size / len(df))).astype(np.int64)
+
+    # Keep the rows with the smallest random keys per stratum. An oversampled
+    # Bernoulli pass first narrows the candidates so only they need sorting.
+    rng = np.random.default_rng(random_state)
+    keys = rng.random(len(df))
+    threshold = np.minimum(1.0, (1.5 * allocation + 10) / counts)
+    candidates = np.flatnonzero(keys < threshold[codes])
+    candidate_counts = np.bincount(codes[candidates], minlength=len(counts))
+    if (candidate_counts < allocation).any():
+        candidates, candidate_counts = np.arange(len(df)), counts
+
+    order = candidates[np.lexsort((keys[candidates], codes[candidates]))]
+    starts = np.cumsum(candidate_counts) - candidate_counts
+    position = np.arange(len(order)) - np.repeat(starts, candidate_counts)
+    selected = order[position < allocation[codes[order]]]
+    return df.iloc[np.sort(selected)]
+
+
+def sample_csv(source, sample_size: int = 10_000, random_state: int = 42,
+               confidence: float = 0.95) -> Tuple[pd.DataFrame, Dict]:
+    """Row sample of a CSV path or seekable file object without reading the whole file
+
+    Large files are sampled by seeking to random byte offsets and taking the line
+    after each one, so a line's chance of selection depends on its predecessor's
+    length rather than its own. Returns the sample and a row-count estimate with
+    bounds. Assumes no quoted fields span lines.
+    """
+    handle = open(source, 'rb') if isinstance(source, (str, os.PathLike)) else source
+    try:
+        handle.seek(0, os.SEEK_END)
+        size = handle.tell()
+        handle.seek(0)
+        if size <= FULL_READ_BYTES:
+            df = pd.read_csv(handle)
+            return uniform_sample(df, sample_size, random_state), exact_interval(len(df))
+
+        header = handle.readline()
+        body_bytes = size - len(header)
+        rng = np.random.default_rng(random_state)
+        lines = []
+        for offset in np.sort(rng.integers(0, size, sample_size)):
+            handle.seek(int(offset))
+            handle.readline()
+            line = handle.readline()
+            if line.strip():
+                lines.append(line if line.endswith(b'\n') else line + b'\n')
+
+        sample = pd.read_csv(io.BytesIO(header + b''.join(lines)))
+        lengths = np.array([len(line) for line in lines], dtype=np.float64)
+        return sample.reset_index(drop=True), _row_count_interval(body_bytes, lengths, confidence)
+    finally:
+        if handle is not source:
+            handle.close()
+        else:
+            handle.seek(0)
+
+
+def _row_count_interval(body_bytes: int, lengths: np.ndarray, confidence: float) -> Dict:
+    """Rows implied by the file size and the sampled mean line length"""
+    z = z_score(confidence)
+    mean_length = lengths.mean()
+    margin = z * lengths.std(ddof=1) / math.sqrt(len(lengths)) if len(lengths) > 1 else 0.0
+    return {
+        'estimate': int(round(body_bytes / mean_length)),
+        'lower': int(math.floor(body_bytes / (mean_length + margin))),
+        'upper': int(math.ceil(body_bytes / max(mean_length - margin, 1.0))),
+        'exact': False
+    }
+
+
+def z_score(confidence: float) -> float:
+    """Two-sided standard normal critical value"""
+    return NormalDist().inv_cdf((1 + confidence) / 2)
+
+
+def exact_interval(value) -> Dict:
+    """Degenerate interval for a quantity that was computed on the full data"""
+    return {'estimate': value, 'lower': value, 'upper': value, 'exact': True}
+
+
+def proportion_interval(successes: int, n: int, population: int, confidence: float) -> Dict:
+    """Wilson score interval for a proportion, with finite-population correction"""
+    if n == 0:
+        return {'estimate': 0.0, 'lower': 0.0, 'upper': 1.0, 'exact': False}
+    if n >= population:
+        return exact_interval(successes / n)
+    z = z_score(confidence)
+    p = successes / n
+    fpc = math.sqrt((population - n) / (population - 1))
+    denominator = 1 + z ** 2 / n
+    center = (p + z ** 2 / (2 * n)) / denominator
+    half = z * math.sqrt(p * (1 - p) / n + z ** 2 / (4 * n ** 2)) / denominator * fpc
+    return {'estimate': p, 'lower': max(0.0, center - half), 'upper': min(1.0, center + half),
+            'exact': False}
+
+
+def mean_interval(values: np.ndarray, population: int, confidence: float) -> Dict:
+    """Normal-approximation interval for a mean, with finite-population correction"""
+    n = len(values)
+    if n == 0:
+        return {'estimate': float('nan'), 'lower': float('nan'), 'upper': float('nan'), 'exact': False}
+    mean = float(values.mean())
+    if n >= population:
+        return exact_interval(mean)
+    std = float(values.std(ddof=1)) if n > 1 else 0.0
+    margin = z_score(confidence) * std / math.sqrt(n) * math.sqrt((population - n) / (population - 1))
+    return {'estimate': mean, 'lower': mean - margin, 'upper': mean + margin, 'exact': False}
+
+
+def median_interval(sorted_values: np.ndarray, population: int, confidence: float) -> Dict:
+    """Distribution-free interval for the median from order statistics of the sample"""
+    n = len(sorted_values)
+    if n == 0:
+        return {'estimate': float('nan'), 'lower': float('nan'), 'upper': float('nan'), 'exact': False}
+    median = float(np.median(sorted_values))
+    if n >= population:
+        return exact_interval(median)
+    half_width = z_score(confidence) * math.sqrt(n) / 2
+    lower = max(0, int(math.floor(n / 2 - half_width)) - 1)
+    upper = min(n - 1, int(math.ceil(n / 2 + half_width)))
+    return {'estimate': median, 'lower': float(sorted_values[lower]), 'upper': float(sorted_values[upper]),
+            'exact': False}
+
+
+def distinct_interval(series: pd.Series, population: int) -> Dict:
+    """Guaranteed-error (GEE) estimate of the distinct count of the full column
+
+    Values seen once in the sample may each stand for up to population/n
+    distinct values; the estimate takes the geometric mean of the extremes.
+    """
+    counts = series.value_counts(dropna=True)
+    n = len(series)
+    distinct = int(len(counts))
+    if n == 0 or n >= population:
+        return exact_interval(distinct)
+    singletons = int((counts == 1).sum())
+    ratio = population / n
+    non_missing = int(round(counts.sum() * ratio))
+    return {
+        'estimate': min(non_missing, int(round(math.sqrt(ratio) * singletons + distinct - singletons))),
+        'lower': distinct,
+        'upper': min(non_missing, int(round(ratio * singletons + distinct - singletons))),
+        'exact': False
+    }
+
+
+def scale_sample_stats(stats: Dict, population: int, nunique: Dict[str, int]) -> Dict:
+    """Rescale count-type statistics computed on a sample to the full population"""
+    scale = population / stats['n_rows'] if stats['n_rows'] else 0.0
+    scaled = dict(stats)
+    scaled['n_rows'] = population
+    scaled['missing'] = {col: int(round(count * scale)) for col, count in stats['missing'].items()}
+    scaled['duplicate_rows'] = int(round(stats['duplicate_rows'] * scale))
+    scaled['nunique'] = dict(nunique)
+    scaled['numeric'] = {
+        col: dict(col_stats, **{name: int(round(col_stats[name] * scale))
+                                for name in ('count', 'iqr_outliers', 'zscore_outliers')})
+        for col, col_stats in stats['numeric'].items()
+    }
+    scaled['categorical'] = {
+        col: dict(col_stats, unique_count=nunique[col],
+                  most_frequent_count=int(round(col_stats['most_frequent_count'] * scale)))
+        for col, col_stats in stats['categorical'].items()
+    }
+    return scaled
@@ -0,0 +1,234 @@
+import time
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+from sklearn.feature_selection import f_classif, f_regression, mutual_info_classif, mutual_info_regression
+from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
+
+# Features kept by default; enough for any model family, small enough to train fast
+SELECTION_MAX_FEATURES = 100
+
+# Rows scored at most; univariate rankings on a uniform subsample are stable well below this
+SELECTION_SAMPLE_ROWS = 20_000
+
+# Features correlated above this with a better-scoring kept feature are pruned as redundant
+SELECTION_CORRELATION_THRESHOLD = 0.95
+
+# Columns per block in scoring and correlation pruning; the budget is checked between blocks
+SELECTION_BLOCK_COLS = 256
+
+# Mutual information costs about a thousand times the F-test per column, so its blocks are smaller
+SELECTION_MI_BLOCK_COLS = 8
+
+# Seconds spent selecting before the features already ranked are used
+SELECTION_TIME_BUDGET = 30.0
+
+# Rows of the probe model timed on all and on the selected features
+SELECTION_PROBE_ROWS = 2_000
+
+# Integer targets with at most this many distinct values are scored as classes
+SELECTION_MAX_CLASSES = 10
+
+# Univariate scores: F-test (linear, fast) or mutual information (nonlinear, slower)
+SELECTION_SCORINGS = ('f_test', 'mutual_info')
+
+
+def screen_features(df: pd.DataFrame, y, columns: Optional[List[str]] = None,
+                    max_features: Optional[int] = SELECTION_MAX_FEATURES, scoring: str = 'f_test',
+                    correlation_threshold: float = SELECTION_CORRELATION_THRESHOLD,
+                    time_budget: Optional[float] = SELECTION_TIME_BUDGET, sample_rows: int = SELECTION_SAMPLE_ROWS,
+                    measure_savings: bool = True, random_state: int = 42) -> Dict:
+    """Choose a small, non-redundant subset of numeric columns that explains y
+
+    Cheapest filters run first: constant columns and exact duplicates are dropped
+    on all rows. The rest is scored against y on a row subsample, then pruned
+    greedily in score order, dropping any feature correlated above
+    correlation_threshold with one already kept; the max_features best survive.
+    When time_budget runs out, unscored features rank after scored ones and
+    candidates beyond the first pruning block are not checked for correlation.
+
+    Returns {'selected': kept columns in input order, 'dropped': {'constant': [...],
+    'duplicate': {col: duplicate of}, 'correlated': {col: kept feature},
+    'low_score': [...]}, 'scores', 'task', 'n_features_in', 'n_selected',
+    'complete', 'seconds', 'training_time'}, where training_time times a probe
+    decision tree on all and on the selected features (None unless measure_savings,
+    or when the budget is spent).
+    """
+    if scoring not in SELECTION_SCORINGS:
+        raise ValueError(f"scoring must be one of {SELECTION_SCORINGS}")
+    started = time.perf_counter()
+    columns = list(df.select_dtypes(include=[np.number]).columns) if columns is None else list(columns)
+    dropped = {'constant': [], 'duplicate': {}, 'correlated': {}, 'low_score': []}
+    target, labeled = _target(y)
+    task = 'classification' if _is_classification(target) else 'regression'
+
+    candidates = []
+    for col in columns:
+        values = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        values = values[np.isfinite(values)]
+        if len(values) == 0 or values.min() == values.max():
+            dropped['constant'].append(col)
+        else:
+            candidates.append(col)
+    candidates, dropped['duplicate'] = _drop_duplicates(df, candidates)
+
+    rows = np.flatnonzero(labeled)
+    if len(rows) > sample_rows:
+        rows = np.sort(np.random.default_rng(random_state).choice(rows, size=sample_rows, replace=False))
+    X = _filled_matrix(df, candidates, rows)
+    ys = target[rows]
+
+    def out_of_time() -> bool:
+        return time_budget is not None and time.perf_counter() - started > time_budget
+
+    scores = np.full(len(candidates), np.nan)
+    step = SELECTION_MI_BLOCK_COLS if scoring == 'mutual_info' else SELECTION_BLOCK_COLS
+    for start in range(0, len(candidates), step):
+        if out_of_time():
+            break
+        block = slice(start, start + step)
+        scores[block] = _univariate_scores(X[:, block], ys, task, scoring, random_state)
+    complete = bool(np.isfinite(scores).all()) if len(candidates) else True
+
+    # Scored features first, best first; unscored keep input order behind them
+    order = sorted(range(len(candidates)), key=lambda i: (not np.isfinite(scores[i]), -np.nan_to_num(scores[i])))
+    kept, redundant = _prune_correlated(X, order, correlation_threshold, max_features, out_of_time)
+    complete = complete and redundant is not None
+    for i, j in (redundant or {}).items():
+        dropped['correlated'][candidates[i]] = candidates[j]
+    if max_features is not None:
+        dropped['low_score'] = [candidates[i] for i in kept[max_features:]]
+        kept = kept[:max_features]
+    keep = {candidates[i] for i in kept}
+    selected = [col for col in columns if col in keep]
+
+    return {
+        'selected': selected,
+        'dropped': dropped,
+        'scores': {col: float(score) for col, score in zip(candidates, scores) if np.isfinite(score)},
+        'task': task,
+        'n_features_in': len(columns),
+        'n_selected': len(selected),
+        'complete': complete,
+        'seconds': time.perf_counter() - started,
+        'training_time': _probe_training_time(X, ys, task, candidates, selected, random_state)
+        if measure_savings and len(candidates) and not out_of_time() else None
+    }
+
+
+def _target(y):
+    """Target as a NumPy array and the mask of rows where it is present"""
+    target = np.asarray(y)
+    return target, np.asarray(pd.notna(target))
+
+
+def _is_classification(target: np.ndarray) -> bool:
+    """Non-numeric targets, and integer-valued ones with few distinct values, are classes"""
+    series = pd.Series(target).dropna()
+    if not pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+        return True
+    values = series.to_numpy(dtype=np.float64)
+    return bool(np.all(values == np.round(values))) and series.nunique() <= SELECTION_MAX_CLASSES
+
+
+def _drop_duplicates(df: pd.DataFrame, columns: List[str]):
+    """Columns without exact duplicates, and {duplicate: first column with the same values}
+
+    Columns are bucketed by a hash of their values and compared only within a bucket.
+    """
+    first_by_hash, kept, duplicates = {}, [], {}
+    for col in columns:
+        key = int(pd.util.hash_pandas_object(df[col], index=False).sum())
+        original = next((other for other in first_by_hash.get(key, []) if df[other].equals(df[col])), None)
+        if original is None:
+            first_by_hash.setdefault(key, []).append(col)
+            kept.append(col)
+        else:
+            duplicates[col] = original
+    return kept, duplicates
+
+
+def _filled_matrix(df: pd.DataFrame, columns: List[str], rows: np.ndarray) -> np.ndarray:
+    """Column-major float32 values of the sampled rows, non-finite values replaced by the column median"""
+    X = np.empty((len(rows), len(columns)), dtype=np.float32, order='F')
+    for k, col in enumerate(columns):
+        values = df[col].to_numpy(dtype=np.float64, na_value=np.nan)[rows]
+        finite = np.isfinite(values)
+        values[~finite] = np.median(values[finite]) if finite.any() else 0.0
+        X[:, k] = values
+    return X
+
+
+def _univariate_scores(X: np.ndarray, y: np.ndarray, task: str, scoring: str, random_state: int) -> np.ndarray:
+    """F statistic or mutual information of each column with y; NaN where undefined"""
+    if scoring == 'mutual_info':
+        score_func = mutual_info_classif if task == 'classification' else mutual_info_regression
+        scores = score_func(X, y, random_state=random_state)
+    else:
+        score_func = f_classif if task == 'classification' else f_regression
+        with np.errstate(invalid='ignore', divide='ignore'):
+            scores = score_func(X, y)[0]
+    return np.where(np.isfinite(scores), scores, np.nan)
+
+
+def _prune_correlated(X: np.ndarray, order: List[int], threshold: float, max_features: Optional[int],
+                      out_of_time):
+    """Greedy representatives in score order: a feature is kept unless it is correlated with a kept one
+
+    Returns (kept indices in score order, {pruned index: kept index}); the mapping
+    is None when the budget ran out, in which case later features were kept unchecked.
+    Stops once max_features are kept, since no later feature could be selected.
+    """
+    n = X.shape[0]
+    mean, std = X.mean(axis=0), X.std(axis=0)
+    std[std == 0] = 1
+    kept, redundant = [], {}
+    for start in range(0, len(order), SELECTION_BLOCK_COLS):
+        if max_features is not None and len(kept) >= max_features:
+            break
+        block = order[start:start + SELECTION_BLOCK_COLS]
+        # The first block always runs; it is cheap and usually holds every feature kept
+        if start and out_of_time():
+            return kept + order[start:], None
+        zb = (X[:, block] - mean[block]) / std[block]
+        # Correlations with features kept in earlier blocks, then within the block in score order
+        if kept:
+            zk = (X[:, kept] - mean[kept]) / std[kept]
+            previous = np.abs(zk.T @ zb) / n
+            best_previous, nearest = previous.max(axis=0), np.asarray(kept)[previous.argmax(axis=0)]
+        else:
+            best_previous, nearest = np.zeros(len(block)), np.zeros(len(block), dtype=int)
+        within = np.abs(zb.T @ zb) / n
+        block_kept = []
+        for j, i in enumerate(block):
+            if best_previous[j] > threshold:
+                redundant[i] = int(nearest[j])
+                continue
+            match = next((k for k in block_kept if within[j, k] > threshold), None)
+            if match is not None:
+                redundant[i] = block[match]
+                continue
+            block_kept.append(j)
+        kept += [block[j] for j in block_kept]
+    return kept, redundant
+
+
+def _probe_training_time(X: np.ndarray, y: np.ndarray, task: str, candidates: List[str], selected: List[str],
+                         random_state: int) -> Dict:
+    """Fit time of a depth-limited decision tree on all candidates versus the selected features"""
+    rows = slice(0, min(len(X), SELECTION_PROBE_ROWS))
+    probe = DecisionTreeClassifier if task == 'classification' else DecisionTreeRegressor
+    positions = {col: k for k, col in enumerate(candidates)}
+    timings = []
+    for block in (X[rows], X[rows][:, [positions[col] for col in selected]]):
+        if block.shape[1] == 0:
+            timings.append(0.0)
+            continue
+        started = time.perf_counter()
+        probe(max_depth=6, random_state=random_state).fit(block, y[rows])
+        timings.append(time.perf_counter() - started)
+    return {
+        'all_features_seconds': timings[0],
+        'selected_seconds': timings[1],
+        'saving': 1 - timings[1] / timings[0] if timings[0] > 0 else 0.0
+    }
@@ -0,0 +1,276 @@
+import math
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple, Union
+
+# Largest batch a quantile sketch sorts at once; bigger inputs are fed in slices
+SKETCH_BATCH_SIZE = 1 << 16
+
+
+def sketch_parameters(accuracy: float = 0.01) -> Dict[str, int]:
+    """Size every sketch from one accuracy knob (target relative error of distinct counts)
+
+    Quantile and frequency summaries are sized ten times tighter than the knob
+    because outlier counts and modes read their tails, where rank error hurts most.
+    """
+    if not 0 < accuracy < 1:
+        raise ValueError("accuracy must be between 0 and 1")
+    return {
+        'hll_precision': int(min(18, max(4, math.ceil(math.log2((1.04 / accuracy) ** 2))))),
+        'quantile_k': int(math.ceil(20 / accuracy)),
+        'frequent_capacity': int(math.ceil(10 / accuracy))
+    }
+
+
+def hash_values(values, dropna: bool = True) -> np.ndarray:
+    """64-bit hashes of the values; numbers hash by float value so int and float chunks agree"""
+    series = values if isinstance(values, pd.Series) else pd.Series(values)
+    if dropna:
+        series = series.dropna()
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return pd.util.hash_array(series.to_numpy(dtype=np.float64))
+    return pd.util.hash_array(series.astype(str).to_numpy(dtype=object))
+
+
+class HyperLogLog:
+    """Mergeable distinct-count sketch with ~1.04/sqrt(2**precision) relative error
+
+    Like HLL++, distinct hashes are kept exactly until there are more than a
+    quarter as many as registers, so low-cardinality columns are counted exactly.
+    """
+
+    def __init__(self, precision: int = 14):
+        if not 4 <= precision <= 18:
+            raise ValueError("precision must be between 4 and 18")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+        self.exact_limit = len(self.registers) // 4
+        self.exact: Optional[np.ndarray] = np.empty(0, dtype=np.uint64)
+
+    def update(self, values) -> None:
+        """Add a batch of raw values"""
+        self.update_hashes(hash_values(values))
+
+    def update_hashes(self, hashes: np.ndarray) -> None:
+        """Add a batch of precomputed 64-bit hashes"""
+        if len(hashes) == 0:
+            return
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if self.exact is not None:
+            self.exact = np.union1d(self.exact, pd.unique(hashes))
+            if len(self.exact) <= self.exact_limit:
+                return
+            hashes, self.exact = self.exact, None
+        self._update_registers(hashes)
+
+    def _update_registers(self, hashes: np.ndarray) -> None:
+        suffix_bits = 64 - self.precision
+        index = (hashes >> np.uint64(suffix_bits)).astype(np.int64)
+        suffix = hashes & np.uint64((1 << suffix_bits) - 1)
+
+        # Rank of the leftmost 1-bit; suffixes fit in 53 bits so frexp is exact
+        _, bit_length = np.frexp(suffix.astype(np.float64))
+        rank = (suffix_bits - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: 'HyperLogLog') -> None:
+        """Fold another sketch of the same precision into this one"""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision")
+        if other.exact is not None:
+            self.update_hashes(other.exact)
+            return
+        if self.exact is not None:
+            self._update_registers(self.exact)
+            self.exact = None
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def count(self) -> int:
+        """Estimated number of distinct values seen"""
+        if self.exact is not None:
+            return len(self.exact)
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros > 0:
+            # Linear counting is far more accurate for small cardinalities
+            estimate = m * np.log(m / zeros)
+        return int(round(estimate))
+
+
+class QuantileSketch:
+    """Mergeable KLL-style quantile sketch; exact until more than k values are seen"""
+
+    def __init__(self, k: int = 2000, seed: int = 42):
+        self.k = k
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values) -> None:
+        """Add a batch of numeric values, ignoring NaNs"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self.count += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        for start in range(0, len(values), SKETCH_BATCH_SIZE):
+            self.levels[0] = np.concatenate([self.levels[0], values[start:start + SKETCH_BATCH_SIZE]])
+            self._compress()
+
+    def merge(self, other: 'QuantileSketch') -> None:
+        """Fold another sketch into this one"""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+
+    def _capacity(self, level: int) -> int:
+        # Lower levels hold lighter items, so they get geometrically smaller buffers
+        depth = len(self.levels) - 1 - level
+        return max(8, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                keep = items[:len(items) % 2]
+                paired = items[len(items) % 2:]
+                promoted = paired[self._rng.integers(2)::2]
+                self.levels[level] = keep
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    @property
+    def is_exact(self) -> bool:
+        """True while no compaction has happened and all values are retained"""
+        return len(self.levels) == 1
+
+    def _weighted_items(self) -> Tuple[np.ndarray, np.ndarray]:
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2.0 ** level)
+                                  for level, items in enumerate(self.levels)])
+        order = np.argsort(values, kind='stable')
+        return values[order], np.cumsum(weights[order])
+
+    def quantile(self, q: Union[float, List[float]]) -> Union[float, np.ndarray]:
+        """Estimated quantile(s); linear interpolation while the sketch is still exact"""
+        scalar = np.isscalar(q)
+        q = np.atleast_1d(np.asarray(q, dtype=np.float64))
+        if self.count == 0:
+            result = np.full(len(q), np.nan)
+        elif self.is_exact:
+            result = np.quantile(self.levels[0], q)
+        else:
+            values, cumulative = self._weighted_items()
+            positions = np.searchsorted(cumulative, q * cumulative[-1], side='left')
+            result = values[np.clip(positions, 0, len(values) - 1)]
+            result = np.where(q <= 0, self.min, np.where(q >= 1, self.max, result))
+        return float(result[0]) if scalar else result
+
+    def rank(self, x: float, inclusive: bool = False) -> float:
+        """Estimated number of values below x (or at most x when inclusive)"""
+        if self.count == 0:
+            return 0.0
+        values, cumulative = self._weighted_items()
+        position = np.searchsorted(values, x, side='right' if inclusive else 'left')
+        return float(cumulative[position - 1]) if position > 0 else 0.0
+
+
+class FrequentItems:
+    """Misra-Gries heavy-hitter summary; counts are exact until more than capacity distinct values are seen"""
+
+    def __init__(self, capacity: int = 1000):
+        self.capacity = capacity
+        self.counts = pd.Series(dtype=np.int64)
+        self.error = 0
+
+    def update(self, values) -> None:
+        """Add a batch of values, ignoring missing ones"""
+        series = values if isinstance(values, pd.Series) else pd.Series(values)
+        for start in range(0, len(series), SKETCH_BATCH_SIZE):
+            self._absorb(series.iloc[start:start + SKETCH_BATCH_SIZE].value_counts(dropna=True))
+
+    def merge(self, other: 'FrequentItems') -> None:
+        """Fold another summary into this one"""
+        self._absorb(other.counts)
+        self.error += other.error
+
+    def _absorb(self, counts: pd.Series) -> None:
+        merged = self.counts.add(counts, fill_value=0) if len(self.counts) else counts.copy()
+        if len(merged) > self.capacity:
+            merged = merged.sort_values(ascending=False)
+            cutoff = merged.iloc[self.capacity]
+            merged = merged.iloc[:self.capacity] - cutoff
+            merged = merged[merged > 0]
+            self.error += int(cutoff)
+        self.counts = merged.astype(np.int64)
+
+    def top(self, n: int = 1) -> List[Tuple[object, int]]:
+        """Most frequent values with their (lower-bound) counts"""
+        top = self.counts.sort_values(ascending=False, kind='stable').head(n)
+        return [(value, int(count)) for value, count in top.items()]
+
+
+class CountMinSketch:
+    """Frequency estimates in fixed memory for any value, including ones never seen
+
+    Estimates never undercount and overcount by at most e / width of the total
+    with probability 1 - exp(-depth).
+    """
+
+    def __init__(self, width: int = 2048, depth: int = 5, seed: int = 42):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self.total = 0
+        rng = np.random.default_rng(seed)
+        # Odd multipliers give independent-enough rows from a single 64-bit hash
+        self._multipliers = rng.integers(1, 2 ** 63, size=depth, dtype=np.uint64) | np.uint64(1)
+
+    @classmethod
+    def from_error(cls, epsilon: float, delta: float = 0.01, seed: int = 42) -> 'CountMinSketch':
+        """Size the sketch so overcounts exceed epsilon * total with probability below delta"""
+        return cls(width=int(math.ceil(math.e / epsilon)), depth=int(math.ceil(math.log(1 / delta))),
+                   seed=seed)
+
+    def _buckets(self, hashes: np.ndarray) -> np.ndarray:
+        mixed = hashes[None, :] * self._multipliers[:, None]
+        return ((mixed >> np.uint64(32)) % np.uint64(self.width)).astype(np.int64)
+
+    def update(self, values) -> None:
+        """Count a batch of values, ignoring missing ones"""
+        hashes = hash_values(values)
+        if len(hashes) == 0:
+            return
+        for row, buckets in enumerate(self._buckets(hashes)):
+            self.table[row] += np.bincount(buckets, minlength=self.width)
+        self.total += len(hashes)
+
+    def merge(self, other: 'CountMinSketch') -> None:
+        """Fold in a sketch built with the same width, depth and seed"""
+        if other.table.shape != self.table.shape or not np.array_equal(other._multipliers, self._multipliers):
+            raise ValueError("Cannot merge Count-Min sketches with different shapes or seeds")
+        self.table += other.table
+        self.total += other.total
+
+    def estimate(self, values) -> np.ndarray:
+        """Estimated count per value, aligned with the input; NaN where the value is missing"""
+        series = values if isinstance(values, pd.Series) else pd.Series(values)
+        buckets = self._buckets(hash_values(series, dropna=False))
+        counts = np.take_along_axis(self.table, buckets, axis=1).min(axis=0).astype(np.float64)
+        counts[series.isna().to_numpy()] = np.nan
+        return counts
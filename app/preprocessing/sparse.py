@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from typing import List
+
+# Most levels a column may have to be one-hot encoded into the sparse design matrix
+SPARSE_ONE_HOT_MAX_LEVELS = 10_000
+
+
+def one_hot_block(series: pd.Series, categories: list) -> sp.csr_matrix:
+    """CSR indicators, one column per category plus a last one for missing and unseen values
+
+    Every row has exactly one stored value, so the block costs 12 bytes per row
+    whatever the number of categories.
+    """
+    codes = pd.Categorical(series, categories=categories).codes.astype(np.int64)
+    codes[codes < 0] = len(categories)
+    n = len(codes)
+    return sp.csr_matrix((np.ones(n), codes, np.arange(n + 1)), shape=(n, len(categories) + 1))
+
+
+def design_matrix(dense: pd.DataFrame, blocks: List[sp.spmatrix]) -> sp.csr_matrix:
+    """The numeric columns of dense followed by the sparse blocks, as one float64 CSR matrix"""
+    parts = [sp.csr_matrix(dense.to_numpy(dtype=np.float64, na_value=np.nan))] + list(blocks)
+    return sp.hstack(parts, format='csr', dtype=np.float64)
@@ -1,7 +1,89 @@
+import numpy as np
+import pandas as pd
+from itertools import chain
+from typing import Dict, Optional
 from sklearn.feature_extraction.text import TfidfVectorizer
 
+# Handle optional imports gracefully
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    ARROW_TEXT_AVAILABLE = True
+except ImportError:
+    ARROW_TEXT_AVAILABLE = False
+    print("Warning: pyarrow not available. Text statistics use Python string methods.")
+
+# Characters counted by the character-class statistics. ASCII classes, since Arrow's RE2 and
+# Python's re disagree on what \d and \s match beyond ASCII
+TEXT_PATTERNS = {
+    'uppercase_count': r'[A-Z]',
+    'digit_count': r'[0-9]',
+    'special_char_count': r'[^a-zA-Z0-9 \t\n\r\f\v]'
+}
+
+
 def text_vectorize(corpus, max_features=5000):
     """Convert text corpus to TF-IDF features."""
     vectorizer = TfidfVectorizer(max_features=max_features, stop_words='english')
     X = vectorizer.fit_transform(corpus)
     return X, vectorizer
+
+
+def as_text(series: pd.Series) -> pd.Series:
+    """String form of every value, Arrow-backed when pyarrow is available"""
+    text = series.astype(str)
+    return text.astype('string[pyarrow]') if ARROW_TEXT_AVAILABLE else text
+
+
+def tokenize(text: pd.Series) -> Dict:
+    """Whitespace tokens of every row as flat arrays
+
+    Returns {'rows': row position of each token, 'lengths': its length in
+    characters, 'codes': its index in the column vocabulary, 'vocabulary_size',
+    'n_rows'}; every word statistic is a bincount over these.
+    """
+    n = len(text)
+    if ARROW_TEXT_AVAILABLE and isinstance(text.dtype, pd.StringDtype):
+        lists = pc.utf8_split_whitespace(pa.array(text))
+        tokens = pc.list_flatten(lists)
+        rows = np.asarray(pc.list_parent_indices(lists), dtype=np.int64)
+        lengths = np.asarray(pc.utf8_length(tokens), dtype=np.int64)
+        # Leading and trailing whitespace yields empty tokens; str.split() has none
+        kept = lengths > 0
+        encoded = pc.dictionary_encode(tokens.filter(pa.array(kept)))
+        codes = np.asarray(encoded.indices, dtype=np.int64)
+        vocabulary_size = len(encoded.dictionary)
+        rows, lengths = rows[kept], lengths[kept]
+    else:
+        lists = text.astype(object).str.split()
+        tokens = pd.Series(list(chain.from_iterable(lists)), dtype=object)
+        rows = np.repeat(np.arange(n), lists.str.len().to_numpy(dtype=np.int64))
+        lengths = tokens.str.len().to_numpy(dtype=np.int64)
+        codes, vocabulary = pd.factorize(tokens)
+        vocabulary_size = len(vocabulary)
+    return {'rows': rows, 'lengths': lengths, 'codes': codes, 'vocabulary_size': vocabulary_size, 'n_rows': n}
+
+
+def character_counts(text: pd.Series, pattern: Optional[str] = None) -> np.ndarray:
+    """Characters per row, or matches of a regex pattern per row"""
+    counts = text.str.len() if pattern is None else text.str.count(pattern)
+    return counts.to_numpy(dtype=np.int64)
+
+
+def word_counts(tokens: Dict) -> np.ndarray:
+    """Words per row"""
+    return np.bincount(tokens['rows'], minlength=tokens['n_rows'])
+
+
+def unique_word_counts(tokens: Dict) -> np.ndarray:
+    """Distinct words per row, from distinct (row, word) keys"""
+    keys = pd.unique(tokens['rows'] * max(1, tokens['vocabulary_size']) + tokens['codes'])
+    return np.bincount(keys // max(1, tokens['vocabulary_size']), minlength=tokens['n_rows'])
+
+
+def mean_word_lengths(tokens: Dict) -> np.ndarray:
+    """Mean word length per row; 0 for rows without words"""
+    total = np.bincount(tokens['rows'], weights=tokens['lengths'], minlength=tokens['n_rows'])
+    count = word_counts(tokens)
+    return np.divide(total, count, out=np.zeros(tokens['n_rows']), where=count > 0)
+
@@ -0,0 +1,173 @@
+import hashlib
+import io
+import os
+import shutil
+import time
+import uuid
+import joblib
+import pandas as pd
+from pathlib import Path
+from app.preprocessing.ingest import compact_dtypes
+from typing import Any, Callable, List, Optional, Tuple
+
+DATASET_CACHE_PATH = os.getenv("DATASET_CACHE_PATH", "cache/datasets/")
+DATASET_CACHE_MAX_BYTES = int(os.getenv("DATASET_CACHE_MAX_MB", "2048")) * 1024 ** 2
+DATASET_CACHE_MAX_ENTRIES = int(os.getenv("DATASET_CACHE_MAX_ENTRIES", "64"))
+
+# Bytes read at a time when hashing a file-like upload
+HASH_BLOCK_SIZE = 1 << 20
+
+# Handle optional imports gracefully
+try:
+    import pyarrow  # noqa: F401
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+    print("Warning: pyarrow not available. Dataset cache will store pickled frames.")
+
+
+def content_key(content) -> str:
+    """SHA-256 of upload bytes or of a seekable binary file object (rewound afterwards)"""
+    digest = hashlib.sha256()
+    if isinstance(content, (bytes, bytearray, memoryview)):
+        digest.update(content)
+        return digest.hexdigest()
+    content.seek(0)
+    for block in iter(lambda: content.read(HASH_BLOCK_SIZE), b''):
+        digest.update(block)
+    content.seek(0)
+    return digest.hexdigest()
+
+
+class DatasetCache:
+    """Content-addressed on-disk cache of parsed uploads and results derived from them
+
+    Each upload hash owns a directory holding the parsed frame (parquet, or a
+    pickle when a column cannot be stored as parquet) and named results such as
+    profiles or engineered features. Whole entries are evicted least recently
+    used first once the cache exceeds max_bytes or max_entries.
+    """
+
+    def __init__(self, base_path: str = DATASET_CACHE_PATH, max_bytes: int = DATASET_CACHE_MAX_BYTES,
+                 max_entries: int = DATASET_CACHE_MAX_ENTRIES):
+        self.base_path = Path(base_path)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._last_use_ns = 0
+
+    def load_csv(self, content: bytes) -> Tuple[str, pd.DataFrame]:
+        """Content key and compact-dtype frame of CSV upload bytes, parsing only on a cache miss"""
+        key = content_key(content)
+        df = self.get_frame(key)
+        if df is None:
+            df = compact_dtypes(pd.read_csv(io.BytesIO(content)))
+            self.put_frame(key, df)
+        return key, df
+
+    def get_frame(self, key: str, name: str = 'frame') -> Optional[pd.DataFrame]:
+        """Cached frame, or None on a miss"""
+        entry = self._entry(key)
+        for path, reader in ((entry / f"{name}.parquet", pd.read_parquet),
+                             (entry / f"{name}.pkl", pd.read_pickle)):
+            if path.exists():
+                self._touch(entry)
+                # Arrow-backed strings would otherwise come back as Python strings
+                with pd.option_context('mode.string_storage', 'pyarrow' if PARQUET_AVAILABLE else 'python'):
+                    return reader(path)
+        return None
+
+    def put_frame(self, key: str, df: pd.DataFrame, name: str = 'frame') -> None:
+        """Store a frame in columnar form, falling back to pickle for unsupported columns"""
+        entry = self._entry(key)
+        if PARQUET_AVAILABLE:
+            try:
+                self._write(entry / f"{name}.parquet", lambda path: df.to_parquet(path))
+                self._evict()
+                return
+            except Exception:
+                # Mixed-type object columns and non-string labels have no parquet form
+                pass
+        self._write(entry / f"{name}.pkl", lambda path: df.to_pickle(path))
+        self._evict()
+
+    def get_result(self, key: str, name: str) -> Optional[Any]:
+        """Cached derived result (profile, statistics, ...), or None on a miss"""
+        entry = self._entry(key)
+        path = entry / f"{name}.joblib"
+        if not path.exists():
+            return None
+        self._touch(entry)
+        return joblib.load(path)
+
+    def put_result(self, key: str, name: str, value: Any) -> None:
+        """Store a derived result next to the dataset it came from"""
+        self._write(self._entry(key) / f"{name}.joblib", lambda path: joblib.dump(value, path))
+        self._evict()
+
+    def get_or_compute(self, key: str, name: str, compute: Callable[[], Any]) -> Any:
+        """Cached result, computing and storing it on a miss"""
+        value = self.get_result(key, name)
+        if value is None:
+            value = compute()
+            self.put_result(key, name, value)
+        return value
+
+    def clear(self) -> None:
+        """Remove every cached entry"""
+        shutil.rmtree(self.base_path, ignore_errors=True)
+
+    def size_bytes(self) -> int:
+        """Total bytes held by the cache"""
+        return sum(size for _, _, size in self._entries())
+
+    def _entry(self, key: str) -> Path:
+        return self.base_path / key
+
+    def _touch(self, entry: Path) -> None:
+        # Directory mtime records last use, so recency survives restarts. Explicit,
+        # strictly increasing stamps keep the order on filesystems with coarse clocks.
+        self._last_use_ns = max(time.time_ns(), self._last_use_ns + 1)
+        try:
+            os.utime(entry, ns=(self._last_use_ns, self._last_use_ns))
+        except OSError:
+            pass
+
+    def _write(self, path: Path, writer: Callable[[str], Any]) -> None:
+        """Write through a temporary file so concurrent readers never see partial files
+
+        Disk errors are reported and swallowed; a cache that cannot write only loses hits.
+        """
+        temp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            writer(str(temp_path))
+            os.replace(temp_path, path)
+            self._touch(path.parent)
+        except OSError as e:
+            print(f"Warning: could not write {path} to the dataset cache: {e}")
+        finally:
+            if temp_path.exists():
+                temp_path.unlink()
+
+    def _entries(self) -> List[Tuple[int, Path, int]]:
+        """(last use, directory, bytes) of every entry"""
+        if not self.base_path.exists():
+            return []
+        entries = []
+        for entry in self.base_path.iterdir():
+            if entry.is_dir():
+                try:
+                    size = sum(path.stat().st_size for path in entry.iterdir())
+                    entries.append((entry.stat().st_mtime_ns, entry, size))
+                except OSError:
+                    continue
+        return entries
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until both limits hold; the newest entry always stays"""
+        entries = sorted(self._entries(), key=lambda item: item[0])
+        total = sum(size for _, _, size in entries)
+        while len(entries) > 1 and (total > self.max_bytes or len(entries) > self.max_entries):
+            _, entry, size = entries.pop(0)
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
@@ -1,6 +1,10 @@
-from sklearn.model_selection import cross_val_score, StratifiedKFold, train_test_split
+from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier, ExtraTreesClassifier
-from sklearn.svm import SVC
+from sklearn.ensemble import HistGradientBoostingClassifier
+from sklearn.svm import SVC, LinearSVC
+from sklearn.calibration import CalibratedClassifierCV
+from sklearn.kernel_approximation import Nystroem
+from sklearn.pipeline import make_pipeline
 from sklearn.linear_model import LogisticRegression, RidgeClassifier
 from sklearn.naive_bayes import GaussianNB
 from sklearn.neighbors import KNeighborsClassifier
@@ -8,8 +12,14 @@ from sklearn.metrics import classification_report, confusion_matrix, roc_auc_sco
 from sklearn.preprocessing import StandardScaler, LabelEncoder
 import numpy as np
 import pandas as pd
+import scipy.sparse as sp
+import os
 from .experiment_tracker import ExperimentTracker
-import time
+from app.preprocessing.column_stats import is_text_dtype
+from app.preprocessing.selection import screen_features
+from .cost_model import CostModel
+from .halving import successive_halving
+from .scheduler import schedule_training, take_rows
 
 # Optional dependencies with graceful fallback
 try:
@@ -24,14 +34,30 @@ try:
 except ImportError:
     LIGHTGBM_AVAILABLE = False
 
+# Models, and stand-ins by cost name, that need dense input; skipped or not swapped in when X is sparse
+DENSE_INPUT_MODELS = ('naive_bayes', 'hist_gradient_boosting')
+
+# Models from cheapest to most expensive to cross-validate on large data; the start order when pruning
+MODEL_COST_ORDER = ('naive_bayes', 'ridge_classifier', 'logistic_regression', 'extra_trees', 'random_forest',
+                    'lightgbm', 'xgboost', 'gradient_boosting', 'knn', 'svm_linear', 'svm_rbf')
+
 class AdvancedModelTrainer:
     """Enterprise-grade model trainer with comprehensive algorithms and evaluation"""
     
-    def __init__(self):
+    def __init__(self, cost_model_path=None):
         self.models = self._initialize_models()
         self.experiment_tracker = ExperimentTracker()
         self.scaler = StandardScaler()
         self.label_encoder = LabelEncoder()
+        self.feature_selection = None
+        self.halving = None
+        # Training times calibrate the cost model; with a path it carries over between runs
+        self.cost_model_path = cost_model_path
+        if cost_model_path and os.path.exists(cost_model_path):
+            self.cost_model = CostModel.load(cost_model_path)
+        else:
+            self.cost_model = CostModel()
+        self.cost_plan = None
         
     def _initialize_models(self):
         """Initialize all available models with optimized parameters"""
@@ -85,73 +111,140 @@ class AdvancedModelTrainer:
             )
             
         return models
+    
+    def _fast_equivalents(self):
+        """Faster stand-ins for models that scale badly with rows: {model: (cost name, estimator)}"""
+        return {
+            'gradient_boosting': ('hist_gradient_boosting', HistGradientBoostingClassifier(
+                random_state=42, max_iter=100, max_depth=6, learning_rate=0.1
+            )),
+            'svm_linear': ('linear_svc', CalibratedClassifierCV(
+                LinearSVC(random_state=42, C=1.0), cv=3
+            )),
+            'svm_rbf': ('nystroem_svc', CalibratedClassifierCV(
+                make_pipeline(Nystroem(random_state=42, n_components=300), LinearSVC(random_state=42, C=1.0)), cv=3
+            ))
+        }
+        
+    def train_multiple_models(self, X, y, test_size=0.2, cv_folds=5, max_features=None, feature_names=None,
+                              n_jobs=None, time_budget=None, reuse_fold_models=False, prune_top_k=None,
+                              model_time_budget=None, memory_budget_mb=None):
+        """Train and comprehensively evaluate multiple models
         
-    def train_multiple_models(self, X, y, test_size=0.2, cv_folds=5):
-        """Train and comprehensively evaluate multiple models"""
+        X may be a sparse matrix; models in DENSE_INPUT_MODELS are then skipped.
+        n_jobs: core budget shared by models training concurrently (see schedule_training);
+        the default None trains them one by one in this process, each on every core.
+        max_features: features screened on the training split (self.feature_selection).
+        time_budget: seconds for successive halving across the models (self.halving).
+        reuse_fold_models: average the CV fold models instead of refitting.
+        prune_top_k: abandon models between folds once they cannot reach the top k.
+        model_time_budget, memory_budget_mb: swap, subsample or skip models by predicted cost (self.cost_plan).
+        """
         results = {}
         
         # Prepare data
         X, y = self._prepare_data(X, y)
+        sparse_input = sp.issparse(X)
+        if sparse_input and max_features is not None:
+            raise ValueError("max_features requires dense input; select features before sparse encoding")
+        if feature_names is None and hasattr(X, 'columns'):
+            feature_names = X.columns
         
         # Train-test split for holdout evaluation
         X_train, X_test, y_train, y_test = train_test_split(
             X, y, test_size=test_size, random_state=42, stratify=y
         )
         
+        # Select features on the training split only, so the holdout stays unseen
+        self.feature_selection = None
+        if max_features is not None:
+            self.feature_selection = screen_features(X_train, y_train, max_features=max_features)
+            selected = self.feature_selection['selected']
+            X_train, X_test = X_train[selected], X_test[selected]
+            saving = self.feature_selection['training_time']
+            print(f"Selected {len(selected)} of {X.shape[1]} features"
+                  + (f" (probe training time -{saving['saving']:.0%})" if saving else ""))
+        
         print(f"Training {len(self.models)} models on {X_train.shape[0]} samples with {X_train.shape[1]} features...")
         
+        candidates = {}
         for name, model in self.models.items():
-            print(f"\n🔄 Training {name.replace('_', ' ').title()}...")
-            start_time = time.time()
-            
-            try:
-                # Cross-validation on training set
-                cv_scores = cross_val_score(
-                    model, X_train, y_train,
-                    cv=StratifiedKFold(n_splits=cv_folds, shuffle=True, random_state=42),
-                    scoring='accuracy', n_jobs=-1
-                )
-                
-                # Train on full training set
-                model.fit(X_train, y_train)
-                
-                # Predictions
-                y_train_pred = model.predict(X_train)
-                y_test_pred = model.predict(X_test)
-                y_test_proba = model.predict_proba(X_test) if hasattr(model, 'predict_proba') else None
-                
-                # Comprehensive metrics
-                metrics = self._calculate_comprehensive_metrics(
-                    y_train, y_train_pred, y_test, y_test_pred, y_test_proba
-                )
-                
-                # Add CV and timing metrics
-                metrics.update({
-                    'cv_mean_accuracy': float(cv_scores.mean()),
-                    'cv_std_accuracy': float(cv_scores.std()),
-                    'training_time_seconds': float(time.time() - start_time),
-                    'cv_scores': [float(score) for score in cv_scores]
-                })
-                
-                # Feature importance
-                feature_importance = self._get_feature_importance(model, X_train.columns if hasattr(X_train, 'columns') else None)
-                
-                # Log experiment
-                run_id = self._log_experiment_safely(model, metrics, feature_importance)
-                
+            if sparse_input and name in DENSE_INPUT_MODELS:
+                print(f"⏭️ {name}: skipped, needs dense input")
                 results[name] = {
-                    'model': model,
-                    'metrics': metrics,
-                    'feature_importance': feature_importance,
-                    'run_id': run_id,
-                    'status': 'success'
+                    'error': 'Model does not accept sparse input',
+                    'metrics': self._get_default_metrics(),
+                    'status': 'skipped'
                 }
-                
-                print(f"✅ {name}: CV Acc = {metrics['cv_mean_accuracy']:.4f} ± {metrics['cv_std_accuracy']:.4f}, "
-                      f"Test Acc = {metrics['test_accuracy']:.4f}")
-                
-            except Exception as e:
-                error_msg = str(e)
+            else:
+                candidates[name] = model
+        
+        # Cost pre-filter: (cost name, rows, subsampled) of each model, for calibration
+        self.cost_plan = None
+        costed = {name: (name, X_train.shape[0], False) for name in candidates}
+        if model_time_budget is not None or memory_budget_mb is not None:
+            equivalents = {name: equivalent for name, equivalent in self._fast_equivalents().items()
+                           if not (sparse_input and equivalent[0] in DENSE_INPUT_MODELS)}
+            self.cost_plan = self.cost_model.plan(candidates, X_train.shape[0], X_train.shape[1], cv_folds,
+                                                  model_time_budget, memory_budget_mb, equivalents)
+            for name, decision in self.cost_plan.items():
+                action = decision['action']
+                costed[name] = (decision['cost_name'], decision['rows'], action == 'subsample')
+                if action == 'skip':
+                    print(f"⏭️ {name}: skipped, predicted to exceed the budget")
+                    results[name] = {
+                        'error': 'Predicted to exceed the training budget',
+                        'metrics': self._get_default_metrics(),
+                        'cost': self._cost_report(decision),
+                        'status': 'skipped'
+                    }
+                    del candidates[name]
+                elif action != 'train':
+                    print(f"💡 {name}: {action} ({decision['cost_name']}, {decision['rows']} rows), "
+                          f"predicted {decision['predicted_seconds']:.0f}s")
+                    candidates[name] = decision['model']
+        
+        # Budgeted mode: only the halving survivors get full CV, possibly on a row subsample
+        self.halving = None
+        if time_budget is not None:
+            self.halving = successive_halving(candidates, X_train, y_train, time_budget, cv_folds, n_jobs)
+            for name, error in self.halving['failed'].items():
+                print(f"❌ {name}: Training failed - {error}")
+                results[name] = {'error': error, 'metrics': self._get_default_metrics(), 'status': 'failed'}
+            for name, rung in self.halving['eliminated'].items():
+                print(f"✂️ {name}: eliminated at {rung['rows']} rows")
+                results[name] = {
+                    'error': f"Eliminated by successive halving at {rung['rows']} rows",
+                    'metrics': self._get_default_metrics(),
+                    'halving': rung,
+                    'status': 'eliminated'
+                }
+            candidates = {name: candidates[name] for name in self.halving['survivors']}
+            rows = self.halving['final_rows']
+            if rows is not None:
+                X_train, y_train = take_rows(X_train, rows), take_rows(y_train, rows)
+        
+        order = None
+        if prune_top_k is not None:
+            order = sorted(candidates, key=lambda name: MODEL_COST_ORDER.index(name)
+                           if name in MODEL_COST_ORDER else len(MODEL_COST_ORDER))
+        training = schedule_training(candidates, X_train, y_train, X_test, y_test, cv_folds, n_jobs,
+                                     reuse_folds=reuse_fold_models, order=order, prune_top_k=prune_top_k)
+        for name, outcome in training:
+            if 'pruned' in outcome:
+                pruning = outcome['pruned']
+                print(f"✂️ {name}: pruned after {pruning['folds']} folds "
+                      f"(CV Acc at most {pruning['upper_bound']:.4f} < {pruning['threshold']:.4f})")
+                results[name] = {
+                    'error': f"Pruned after {pruning['folds']} of {cv_folds} folds",
+                    'metrics': self._get_default_metrics(),
+                    'pruning': {key: value.tolist() if key == 'cv_scores' else value for key, value in pruning.items()},
+                    'status': 'pruned'
+                }
+                continue
+            
+            if 'error' in outcome:
+                error_msg = outcome['error']
                 print(f"❌ {name}: Training failed - {error_msg}")
                 
                 results[name] = {
@@ -159,18 +252,70 @@ class AdvancedModelTrainer:
                     'metrics': self._get_default_metrics(),
                     'status': 'failed'
                 }
-                
-        return results
+                continue
+            
+            # Workers return a fitted copy; keep it as the trainer's model unless it is a stand-in
+            # or a FoldEnsemble, which later runs could not clone
+            model = outcome['model']
+            stand_in = self.cost_plan is not None and self.cost_plan[name]['action'] != 'train'
+            if not (reuse_fold_models or stand_in):
+                self.models[name] = model
+            cv_scores = outcome['cv_scores']
+            
+            # Comprehensive metrics
+            metrics = self._calculate_comprehensive_metrics(
+                y_train, outcome['y_train_pred'], y_test, outcome['y_test_pred'], outcome['y_test_proba'],
+                outcome['y_train_fit_pred']
+            )
+            
+            # Add CV and timing metrics
+            metrics.update({
+                'cv_mean_accuracy': float(cv_scores.mean()),
+                'cv_std_accuracy': float(cv_scores.std()),
+                'training_time_seconds': float(outcome['seconds']),
+                'cv_scores': [float(score) for score in cv_scores]
+            })
+            
+            # Feature importance
+            feature_importance = self._get_feature_importance(model, feature_names)
+            
+            # Log experiment
+            run_id = self._log_experiment_safely(model, metrics, feature_importance)
+            
+            results[name] = {
+                'model': model,
+                'metrics': metrics,
+                'feature_importance': feature_importance,
+                'run_id': run_id,
+                'status': 'success'
+            }
+            if self.cost_plan is not None:
+                results[name]['cost'] = self._cost_report(self.cost_plan[name])
+            cost_name, rows, subsampled = costed[name]
+            self.cost_model.record(cost_name, min(rows, X_train.shape[0]), X_train.shape[1], cv_folds,
+                                   outcome['seconds'], subsampled, outcome['cores'])
+            
+            print(f"✅ {name}: CV Acc = {metrics['cv_mean_accuracy']:.4f} ± {metrics['cv_std_accuracy']:.4f}, "
+                  f"Test Acc = {metrics['test_accuracy']:.4f}")
+        
+        if self.cost_model_path:
+            self.cost_model.save(self.cost_model_path)
+        
+        # Report models in their usual order, not in finishing order
+        return {name: results[name] for name in self.models}
     
     def _prepare_data(self, X, y):
         """Prepare and validate data for training"""
+        # Sparse matrices stay sparse; they are never converted to a frame
+        if sp.issparse(X):
+            return self._prepare_sparse_data(X), self._encode_target(y)
+        
         # Convert to DataFrame if necessary
         if not isinstance(X, pd.DataFrame):
             X = pd.DataFrame(X)
             
         # Handle target variable
-        if y.dtype == 'object':
-            y = self.label_encoder.fit_transform(y)
+        y = self._encode_target(y)
             
         # Select only numeric columns
         numeric_cols = X.select_dtypes(include=[np.number]).columns
@@ -194,8 +339,35 @@ class AdvancedModelTrainer:
         
         return X_scaled, y
     
-    def _calculate_comprehensive_metrics(self, y_train, y_train_pred, y_test, y_test_pred, y_test_proba=None):
-        """Calculate comprehensive evaluation metrics"""
+    @staticmethod
+    def _cost_report(decision):
+        """A cost plan decision without the estimator, for the results"""
+        return {key: value for key, value in decision.items() if key != 'model'}
+    
+    def _prepare_sparse_data(self, X):
+        """Float64 CSR copy of a sparse X, scaled without centering so zeros stay implicit"""
+        X = sp.csr_matrix(X, dtype=np.float64, copy=True)
+        if X.shape[1] == 0:
+            raise ValueError("No features available for training")
+        # Missing and infinite stored values become 0, the value of every implicit entry
+        X.data[~np.isfinite(X.data)] = 0.0
+        X.eliminate_zeros()
+        self.scaler = StandardScaler(with_mean=False)
+        return self.scaler.fit_transform(X)
+    
+    def _encode_target(self, y):
+        """Label-encode text targets"""
+        if is_text_dtype(y):
+            return self.label_encoder.fit_transform(y)
+        return y
+    
+    def _calculate_comprehensive_metrics(self, y_train, y_train_pred, y_test, y_test_pred, y_test_proba=None,
+                                         y_train_fit_pred=None):
+        """Calculate comprehensive evaluation metrics
+        
+        train_accuracy is out-of-fold; in_sample_accuracy, given y_train_fit_pred from a refit,
+        scores the model on the rows it was fitted on.
+        """
         from sklearn.metrics import (
             accuracy_score, precision_score, recall_score, f1_score,
             balanced_accuracy_score, matthews_corrcoef
@@ -224,6 +396,9 @@ class AdvancedModelTrainer:
                 metrics['roc_auc_ovr'] = float(roc_auc_score(y_test, y_test_proba, multi_class='ovr'))
         except Exception:
             metrics['roc_auc'] = 0.5
+        
+        if y_train_fit_pred is not None:
+            metrics['in_sample_accuracy'] = float(accuracy_score(y_train, y_train_fit_pred))
             
         return metrics
     
@@ -283,6 +458,7 @@ class AdvancedModelTrainer:
             'cv_mean_accuracy': 0.0,
             'cv_std_accuracy': 0.0,
             'train_accuracy': 0.0,
+            'in_sample_accuracy': 0.0,
             'test_accuracy': 0.0,
             'test_precision': 0.0,
             'test_recall': 0.0,
@@ -311,9 +487,12 @@ class AdvancedModelTrainer:
             best_model = sorted_models[0]
             recommendations.append(f"Best performing model: {best_model[0]} (Test Accuracy: {best_model[1]['metrics']['test_accuracy']:.4f})")
             
-            # Check for overfitting
+            # Check for overfitting; out-of-fold train_accuracy is held out too, so compare in-sample
+            # accuracy, which reused fold models do not have
             for name, result in sorted_models[:3]:
-                train_acc = result['metrics']['train_accuracy']
+                if 'in_sample_accuracy' not in result['metrics']:
+                    continue
+                train_acc = result['metrics']['in_sample_accuracy']
                 test_acc = result['metrics']['test_accuracy']
                 gap = train_acc - test_acc
                 
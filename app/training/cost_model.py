@@ -0,0 +1,231 @@
+import joblib
+import numpy as np
+from typing import Dict, List, Optional
+from sklearn.base import BaseEstimator, ClassifierMixin, clone
+from sklearn.utils.metaestimators import available_if
+from .halving import stratified_rows
+from .scheduler import take_rows
+
+# Single-core seconds of one fit: seconds * rows ** rows_exponent * features, measured on 8k x 20
+# synthetic rows (predicting a fifth as many rows for knn, whose cost is mostly prediction).
+# xgboost and lightgbm were not installed when measured and are assumed to scale like
+# hist_gradient_boosting.
+MODEL_FIT_COSTS = {
+    'random_forest': {'seconds': 1.7e-5, 'rows_exponent': 1.0},
+    'extra_trees': {'seconds': 3.6e-6, 'rows_exponent': 1.0},
+    'gradient_boosting': {'seconds': 6.3e-5, 'rows_exponent': 1.0},
+    'logistic_regression': {'seconds': 1.1e-7, 'rows_exponent': 1.0},
+    'ridge_classifier': {'seconds': 6.0e-8, 'rows_exponent': 1.0},
+    'svm_rbf': {'seconds': 1.3e-9, 'rows_exponent': 2.2},
+    'svm_linear': {'seconds': 1.9e-9, 'rows_exponent': 2.2},
+    'naive_bayes': {'seconds': 4.4e-8, 'rows_exponent': 1.0},
+    'knn': {'seconds': 6.1e-9, 'rows_exponent': 1.5},
+    'hist_gradient_boosting': {'seconds': 2.8e-6, 'rows_exponent': 1.0},
+    'linear_svc': {'seconds': 3.5e-7, 'rows_exponent': 1.0},
+    'nystroem_svc': {'seconds': 7.0e-6, 'rows_exponent': 1.0},
+    'xgboost': {'seconds': 2.8e-6, 'rows_exponent': 1.0},
+    'lightgbm': {'seconds': 2.8e-6, 'rows_exponent': 1.0}
+}
+
+# Peak memory of a fit: fixed MB plus bytes per input cell (data copies, kernel caches, distances)
+MODEL_MEMORY_COSTS = {
+    'svm_rbf': {'fixed_mb': 200, 'bytes_per_cell': 24},
+    'svm_linear': {'fixed_mb': 200, 'bytes_per_cell': 24},
+    'knn': {'fixed_mb': 1024, 'bytes_per_cell': 16},
+    'random_forest': {'fixed_mb': 20, 'bytes_per_cell': 12},
+    'extra_trees': {'fixed_mb': 20, 'bytes_per_cell': 12},
+    'gradient_boosting': {'fixed_mb': 10, 'bytes_per_cell': 12},
+    'hist_gradient_boosting': {'fixed_mb': 10, 'bytes_per_cell': 9}
+}
+
+# Memory cost of models not listed above: a couple of copies of the data
+DEFAULT_MEMORY_COST = {'fixed_mb': 10, 'bytes_per_cell': 16}
+
+# Past runs kept per model; calibration is the median ratio of measured to predicted time over them
+COST_HISTORY_RUNS = 20
+
+# Candidates are not subsampled below this many rows; they are skipped instead
+COST_MIN_ROWS = 1_000
+
+
+class CostModel:
+    """Predicted training time and peak memory of candidate models from data shape
+
+    Predictions start from MODEL_FIT_COSTS and MODEL_MEMORY_COSTS. Every
+    recorded run stores the ratio of its measured to its predicted time; a
+    model's predictions are scaled by the median of its recent ratios, or by the
+    median over all models until it has runs of its own, which captures the
+    speed of the machine. Predictions are single-core, so runs are recorded in
+    core-seconds (wall seconds times the cores the job held) and calibration
+    does not depend on n_jobs. Only time is calibrated: worker processes do not
+    measure their peak memory reliably.
+    """
+
+    def __init__(self):
+        self.history: Dict[str, List[float]] = {}
+
+    def fit_seconds(self, name: str, n_rows: int, n_features: int,
+                    calibrated: bool = True) -> Optional[float]:
+        """Seconds of one fit on n_rows x n_features; None for models without a cost entry"""
+        cost = MODEL_FIT_COSTS.get(name)
+        if cost is None:
+            return None
+        seconds = cost['seconds'] * max(n_rows, 1) ** cost['rows_exponent'] * max(n_features, 1)
+        return seconds * self.calibration(name) if calibrated else seconds
+
+    def job_seconds(self, name: str, n_rows: int, n_features: int, cv_folds: int,
+                    calibrated: bool = True, subsampled: bool = False) -> Optional[float]:
+        """Seconds of cv_folds-fold CV plus a refit on all n_rows
+
+        subsampled jobs (RowSubsampledClassifier) fit n_rows in every fold too.
+        """
+        fold_rows = n_rows if subsampled else n_rows * (cv_folds - 1) // cv_folds
+        fold = self.fit_seconds(name, fold_rows, n_features, calibrated)
+        if fold is None:
+            return None
+        return cv_folds * fold + self.fit_seconds(name, n_rows, n_features, calibrated)
+
+    def peak_memory_mb(self, name: str, n_rows: int, n_features: int) -> float:
+        """Peak memory of one fit in MB"""
+        cost = MODEL_MEMORY_COSTS.get(name, DEFAULT_MEMORY_COST)
+        return cost['fixed_mb'] + cost['bytes_per_cell'] * n_rows * n_features / 2 ** 20
+
+    def calibration(self, name: str) -> float:
+        """Factor from the default costs to this machine, from past runs"""
+        ratios = self.history.get(name) or [ratio for runs in self.history.values()
+                                            for ratio in runs]
+        return float(np.median(ratios)) if ratios else 1.0
+
+    def record(self, name: str, n_rows: int, n_features: int, cv_folds: int, seconds: float,
+               subsampled: bool = False, cores: int = 1) -> None:
+        """Add a job that took seconds of wall time on cores cores to the history of name"""
+        predicted = self.job_seconds(name, n_rows, n_features, cv_folds, calibrated=False,
+                                     subsampled=subsampled)
+        if predicted is None or predicted <= 0 or seconds <= 0:
+            return
+        runs = self.history.setdefault(name, [])
+        runs.append(seconds * max(cores, 1) / predicted)
+        del runs[:-COST_HISTORY_RUNS]
+
+    def plan(self, models: Dict, n_rows: int, n_features: int, cv_folds: int = 5,
+             time_budget: Optional[float] = None, memory_budget_mb: Optional[float] = None,
+             equivalents: Optional[Dict] = None) -> Dict:
+        """Decide how to train each candidate so it fits time_budget seconds and memory_budget_mb
+
+        A candidate predicted to fit is trained as is. Otherwise it is swapped for
+        its faster equivalent (equivalents: {name: (cost name, estimator)}) if that
+        fits, else subsampled to the most rows predicted to fit (the equivalent's
+        if it has one), else skipped when that is under COST_MIN_ROWS.
+
+        Returns {name: {'action': 'train' | 'swap' | 'subsample' | 'skip',
+        'model', 'cost_name', 'rows', 'predicted_seconds', 'predicted_memory_mb'}},
+        where model is the estimator to train (None when skipped) and rows the
+        training rows it will see.
+        """
+        equivalents = equivalents or {}
+        decisions = {}
+        for name, model in models.items():
+            options = [(name, model)] + ([equivalents[name]] if name in equivalents else [])
+            decision = None
+            for cost_name, estimator in options:
+                if self._fits(cost_name, n_rows, n_features, cv_folds, time_budget,
+                              memory_budget_mb):
+                    action = 'train' if cost_name == name else 'swap'
+                    decision = self._decision(action, estimator, cost_name, n_rows, n_features,
+                                              cv_folds)
+                    break
+            if decision is None:
+                cost_name, estimator = options[-1]
+                rows = self._max_rows(cost_name, n_rows, n_features, cv_folds, time_budget,
+                                      memory_budget_mb)
+                if rows >= COST_MIN_ROWS:
+                    subsample = RowSubsampledClassifier(estimator, max_rows=rows)
+                    decision = self._decision('subsample', subsample, cost_name, rows, n_features,
+                                              cv_folds, subsampled=True)
+                else:
+                    decision = self._decision('skip', None, cost_name, n_rows, n_features,
+                                              cv_folds)
+            decisions[name] = decision
+        return decisions
+
+    def _fits(self, name: str, n_rows: int, n_features: int, cv_folds: int,
+              time_budget: Optional[float], memory_budget_mb: Optional[float],
+              subsampled: bool = False) -> bool:
+        seconds = self.job_seconds(name, n_rows, n_features, cv_folds, subsampled=subsampled)
+        if time_budget is not None and seconds is not None and seconds > time_budget:
+            return False
+        if memory_budget_mb is None:
+            return True
+        return self.peak_memory_mb(name, n_rows, n_features) <= memory_budget_mb
+
+    def _max_rows(self, name: str, n_rows: int, n_features: int, cv_folds: int,
+                  time_budget: Optional[float], memory_budget_mb: Optional[float]) -> int:
+        """Most rows predicted to fit both budgets; predictions grow with rows, so bisect"""
+        low, high = 0, n_rows
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self._fits(name, middle, n_features, cv_folds, time_budget, memory_budget_mb,
+                          subsampled=True):
+                low = middle
+            else:
+                high = middle - 1
+        return low
+
+    def _decision(self, action: str, model, cost_name: str, n_rows: int, n_features: int,
+                  cv_folds: int, subsampled: bool = False) -> Dict:
+        return {
+            'action': action,
+            'model': model,
+            'cost_name': cost_name,
+            'rows': n_rows,
+            'predicted_seconds': self.job_seconds(cost_name, n_rows, n_features, cv_folds,
+                                                  subsampled=subsampled),
+            'predicted_memory_mb': self.peak_memory_mb(cost_name, n_rows, n_features)
+        }
+
+    def save(self, path: str) -> str:
+        """Persist the calibration history"""
+        joblib.dump(self, path)
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> 'CostModel':
+        """Restore a cost model written by save()"""
+        state = joblib.load(path)
+        if not isinstance(state, cls):
+            raise ValueError(f"{path} does not contain {cls.__name__} state")
+        return state
+
+
+class RowSubsampledClassifier(ClassifierMixin, BaseEstimator):
+    """Fits estimator on at most max_rows stratified rows of whatever it is given
+
+    Cross-validation and the refit both see the subsample, so the cost of an
+    expensive model is bounded whatever the size of the training split.
+    """
+
+    def __init__(self, estimator, max_rows: int = COST_MIN_ROWS, random_state: int = 42):
+        self.estimator = estimator
+        self.max_rows = max_rows
+        self.random_state = random_state
+
+    def fit(self, X, y) -> 'RowSubsampledClassifier':
+        rows = stratified_rows(y, self.max_rows, self.random_state)
+        self.estimator_ = clone(self.estimator).fit(take_rows(X, rows), take_rows(y, rows))
+        self.classes_ = self.estimator_.classes_
+        return self
+
+    def predict(self, X) -> np.ndarray:
+        return self.estimator_.predict(X)
+
+    @available_if(lambda self: hasattr(self.estimator, 'predict_proba'))
+    def predict_proba(self, X) -> np.ndarray:
+        return self.estimator_.predict_proba(X)
+
+    @property
+    def feature_importances_(self) -> np.ndarray:
+        return self.estimator_.feature_importances_
+
+    @property
+    def coef_(self) -> np.ndarray:
+        return self.estimator_.coef_
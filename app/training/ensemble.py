@@ -0,0 +1,50 @@
+import numpy as np
+from typing import Dict, List
+from sklearn.utils.metaestimators import available_if
+
+
+def _members_have(attribute: str):
+    return lambda ensemble: all(hasattr(member, attribute) for member in ensemble.estimators)
+
+
+class FoldEnsemble:
+    """Classifiers fitted on the CV folds, averaged in place of a refit on all training rows
+
+    Each member saw (k-1)/k of the rows. Probabilities are averaged when every
+    member has predict_proba; otherwise members vote. Feature importances and
+    coefficients are member means, so the ensemble reads like a single model.
+    """
+
+    def __init__(self, estimators: List):
+        self.estimators = estimators
+        self.classes_ = estimators[0].classes_
+
+    def get_params(self, deep: bool = False) -> Dict:
+        """Parameters of the fold models, which share them"""
+        return {**self.estimators[0].get_params(deep=deep), 'fold_models': len(self.estimators)}
+
+    def predict(self, X) -> np.ndarray:
+        if _members_have('predict_proba')(self):
+            return self.classes_[self.predict_proba(X).argmax(axis=1)]
+        votes = np.zeros((X.shape[0], len(self.classes_)))
+        rows = np.arange(X.shape[0])
+        for member in self.estimators:
+            votes[rows, np.searchsorted(self.classes_, member.predict(X))] += 1
+        # Ties go to the first class, as argmax over averaged probabilities would
+        return self.classes_[votes.argmax(axis=1)]
+
+    @available_if(_members_have('predict_proba'))
+    def predict_proba(self, X) -> np.ndarray:
+        return np.mean([member.predict_proba(X) for member in self.estimators], axis=0)
+
+    @property
+    def feature_importances_(self) -> np.ndarray:
+        if not _members_have('feature_importances_')(self):
+            raise AttributeError("feature_importances_")
+        return np.mean([member.feature_importances_ for member in self.estimators], axis=0)
+
+    @property
+    def coef_(self) -> np.ndarray:
+        if not _members_have('coef_')(self):
+            raise AttributeError("coef_")
+        return np.mean([member.coef_ for member in self.estimators], axis=0)
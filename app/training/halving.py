@@ -0,0 +1,162 @@
+import math
+import time
+import numpy as np
+from typing import Dict, List, Optional
+from sklearn.model_selection import train_test_split
+from app.preprocessing.parallel import effective_n_jobs
+from .scheduler import schedule_training, take_rows
+
+# Candidates promoted from one rung to the next: 1 / HALVING_ETA of them; rows grow by HALVING_ETA
+HALVING_ETA = 3
+
+# Rows of the first rung; fewer and the scores of slow learners say little
+HALVING_MIN_ROWS = 1_000
+
+# Folds of the cross-validation that scores candidates on a rung
+HALVING_CV_FOLDS = 3
+
+# Assumed growth of fit time with rows (t ~ rows ** exponent) until a model is timed on two rungs
+HALVING_DEFAULT_EXPONENT = 2.0
+
+
+def successive_halving(models: Dict, X, y, time_budget: float, cv_folds: int = 5,
+                       n_jobs: Optional[int] = -1, eta: int = HALVING_ETA,
+                       min_rows: int = HALVING_MIN_ROWS, random_state: int = 42) -> Dict:
+    """Choose which models get full cross-validation, and on how many rows, within time_budget
+
+    Every model is scored by HALVING_CV_FOLDS-fold CV on min_rows stratified rows;
+    the best 1/eta move to eta times as many rows, and so on. Fit times are
+    extrapolated from the rungs run so far (t ~ rows ** exponent, fitted per
+    model): a rung starts only if it is predicted to use at most half the budget
+    left. Last, the survivors' cv_folds-fold CV plus refit is sized to the rest of
+    the budget: on all rows if predicted to fit, else on the most rows that fit,
+    dropping the weakest survivors if even the last rung's size does not.
+    Rungs stop early once the budget is spent; models not scored by then are
+    eliminated.
+
+    Returns {'survivors': names best first, 'final_rows': row positions to train
+    the survivors on (None for all), 'rungs': [{'rows', 'scores', 'seconds'}],
+    'eliminated': {name: {'rows', 'score'}}, 'failed': {name: error}, 'seconds'}.
+    """
+    started = time.perf_counter()
+    cores = effective_n_jobs(n_jobs)
+    n = len(y)
+    sizes = _rung_sizes(n, min_rows, eta)
+    survivors, rungs, eliminated, failed = list(models), [], {}, {}
+
+    def remaining() -> float:
+        return time_budget - (time.perf_counter() - started)
+
+    for size in sizes[:-1]:
+        if len(survivors) <= 1:
+            break
+        predicted = _predicted_seconds(rungs, survivors, size, HALVING_CV_FOLDS, cores)
+        if rungs and predicted > remaining() / 2:
+            break
+        rows = stratified_rows(y, size, random_state)
+        X_rung, y_rung = take_rows(X, rows), take_rows(y, rows)
+        scores, seconds = {}, {}
+        training = schedule_training({name: models[name] for name in survivors}, X_rung, y_rung,
+                                     None, None, HALVING_CV_FOLDS, n_jobs, refit=False)
+        for name, outcome in training:
+            if 'error' in outcome:
+                failed[name] = outcome['error']
+            else:
+                scores[name], seconds[name] = float(outcome['cv_scores'].mean()), outcome['seconds']
+            if remaining() <= 0:
+                training.close()
+                break
+        rungs.append({'rows': size, 'scores': scores, 'seconds': seconds})
+
+        ranked = sorted(scores, key=scores.get, reverse=True)
+        keep = ranked[:max(1, math.ceil(len(survivors) / eta))]
+        for name in survivors:
+            if name not in keep and name not in failed:
+                eliminated[name] = {'rows': size, 'score': scores.get(name)}
+        survivors = keep
+        if remaining() <= 0:
+            break
+
+    final_size = _final_size(rungs, survivors, n, cv_folds, cores, remaining())
+    while len(survivors) > 1 and final_size is None:
+        dropped = survivors.pop()
+        eliminated[dropped] = {'rows': rungs[-1]['rows'], 'score': rungs[-1]['scores'].get(dropped)}
+        final_size = _final_size(rungs, survivors, n, cv_folds, cores, remaining())
+    if final_size is None:
+        # Even the best model alone is predicted to overrun; train it on the rows it was scored on
+        final_size = rungs[-1]['rows']
+    return {
+        'survivors': survivors,
+        'final_rows': None if final_size >= n else stratified_rows(y, final_size, random_state),
+        'rungs': rungs,
+        'eliminated': eliminated,
+        'failed': failed,
+        'seconds': time.perf_counter() - started
+    }
+
+
+def stratified_rows(y, n_rows: int, random_state: int = 42) -> np.ndarray:
+    """Sorted positions of n_rows rows keeping the class balance of y"""
+    positions = np.arange(len(y))
+    if n_rows >= len(y):
+        return positions
+    try:
+        rows = train_test_split(positions, train_size=n_rows, stratify=np.asarray(y),
+                                random_state=random_state)[0]
+    except ValueError:
+        # Classes too rare to stratify
+        rows = np.random.default_rng(random_state).choice(positions, size=n_rows, replace=False)
+    return np.sort(rows)
+
+
+def _rung_sizes(n: int, min_rows: int, eta: int) -> List[int]:
+    """min_rows, min_rows * eta, ... below n, then n"""
+    sizes, size = [], min_rows
+    while size < n:
+        sizes.append(size)
+        size *= eta
+    return sizes + [n]
+
+
+def _exponent(rungs: List[Dict], name: str) -> float:
+    """Growth of a model's fit time with rows, from its last two timed rungs"""
+    timed = [rung for rung in rungs if name in rung['seconds']]
+    if len(timed) < 2:
+        return HALVING_DEFAULT_EXPONENT
+    before, after = timed[-2], timed[-1]
+    ratio = after['seconds'][name] / max(before['seconds'][name], 1e-6)
+    exponent = math.log(max(ratio, 1e-6)) / math.log(after['rows'] / before['rows'])
+    return float(np.clip(exponent, 1.0, 3.0))
+
+
+def _predicted_seconds(rungs: List[Dict], names: List[str], size: int, cv_folds: int,
+                       cores: int) -> float:
+    """Wall-clock seconds of cv_folds-fold CV plus refit of names on size rows, spread over cores"""
+    total = 0.0
+    for name in names:
+        timed = [rung for rung in rungs if name in rung['seconds']]
+        if not timed:
+            continue
+        last = timed[-1]
+        per_fit = last['seconds'][name] / HALVING_CV_FOLDS
+        total += per_fit * (size / last['rows']) ** _exponent(rungs, name) * (cv_folds + 1)
+    return total / cores
+
+
+def _final_size(rungs: List[Dict], survivors: List[str], n: int, cv_folds: int, cores: int,
+                remaining: float) -> Optional[int]:
+    """Most rows, from the last rung's size up to n, whose final training fits in remaining"""
+    if not rungs:
+        return n
+
+    def fits(size: int) -> bool:
+        return _predicted_seconds(rungs, survivors, size, cv_folds, cores) <= remaining
+
+    low, high = rungs[-1]['rows'], n
+    if not fits(low):
+        return None
+    # Predicted time grows with rows, so bisect for the largest size that fits
+    while low < high:
+        middle = (low + high + 1) // 2
+        low, high = (middle, high) if fits(middle) else (low, middle - 1)
+    return low
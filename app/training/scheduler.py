@@ -0,0 +1,226 @@
+import time
+import numpy as np
+import pandas as pd
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import nullcontext
+from multiprocessing import Manager
+from typing import Dict, Iterator, List, Optional, Tuple
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.model_selection import StratifiedKFold
+from threadpoolctl import threadpool_limits
+from app.preprocessing.parallel import effective_n_jobs
+from .ensemble import FoldEnsemble
+
+# Folds a model always completes before it can be pruned
+PRUNE_MIN_FOLDS = 2
+
+# Standard errors added to a running CV score for its optimistic bound (about 97.7% one-sided)
+PRUNE_Z = 2.0
+
+
+def uses_estimator_parallelism(model) -> bool:
+    """Models with an n_jobs parameter parallelize inside one fit; the rest over CV folds"""
+    return 'n_jobs' in model.get_params()
+
+
+def job_parallelism(model, cores: int, cv_folds: int) -> Tuple[int, int]:
+    """(CV workers, estimator threads) of a job given cores; their product never exceeds cores"""
+    if uses_estimator_parallelism(model):
+        return 1, cores
+    return min(cores, cv_folds), 1
+
+
+def take_rows(data, rows: np.ndarray):
+    """Rows of a frame, series, array or sparse matrix by position"""
+    if isinstance(data, (pd.DataFrame, pd.Series)):
+        return data.iloc[rows]
+    return data[rows]
+
+
+def train_candidate(model, X_train, y_train, X_test, y_test, cv_folds: int = 5, cv_jobs: int = 1,
+                    model_jobs: int = 1, refit: bool = True, reuse_folds: bool = False,
+                    prune_below=None) -> Dict:
+    """Cross-validate, then refit (or reuse the fold models) and predict the test split
+
+    Runs in a worker process. BLAS and OpenMP pools are capped at model_jobs
+    threads per process so concurrent jobs do not oversubscribe the machine.
+    Each training row is predicted once, by the fold model that did not see it;
+    these out-of-fold predictions give the fold scores and 'y_train_pred'.
+    When the model is refitted, 'y_train_fit_pred' are its predictions of its own
+    training rows, for comparing in-sample and held-out accuracy; fold models
+    each saw only part of the rows, so reused folds have no in-sample score.
+    With reuse_folds the fold models become a FoldEnsemble instead of paying
+    for another fit on all training rows.
+    With prune_below, folds run in waves of cv_jobs; once PRUNE_MIN_FOLDS are
+    done, the model is abandoned as soon as the optimistic bound of its running
+    score (score_upper_bound) falls below prune_below. prune_below is a number or
+    a shared value (Manager().Value, NaN while unset) read after every wave.
+    Returns {'model', 'cv_scores', 'y_train_pred', 'y_train_fit_pred', 'y_test_pred',
+    'y_test_proba', 'seconds', 'cores'}, cores being cv_jobs * model_jobs
+    ('y_train_fit_pred' is None with reuse_folds); with refit=False only CV runs
+    and only 'cv_scores' and 'seconds' are returned. A pruned model returns
+    {'pruned': {'folds', 'cv_scores', 'upper_bound', 'threshold'}, 'seconds'}.
+    """
+    start_time = time.time()
+    if uses_estimator_parallelism(model):
+        model = clone(model).set_params(n_jobs=model_jobs)
+    with threadpool_limits(limits=model_jobs):
+        splitter = StratifiedKFold(n_splits=cv_folds, shuffle=True, random_state=42)
+        folds = list(splitter.split(X_train, y_train))
+        y_true = np.asarray(y_train)
+        # Without pruning every fold runs in one wave
+        wave = cv_jobs if prune_below is not None else len(folds)
+        fitted = []
+        for start in range(0, len(folds), wave):
+            fitted += Parallel(n_jobs=cv_jobs)(
+                delayed(_fit_fold)(clone(model), X_train, y_train, train, test)
+                for train, test in folds[start:start + wave]
+            )
+            cv_scores = np.array([np.mean(predictions == y_true[test])
+                                  for (_, predictions), (_, test) in zip(fitted, folds)])
+            if prune_below is None or len(fitted) < PRUNE_MIN_FOLDS or len(fitted) == len(folds):
+                continue
+            threshold = _current_value(prune_below)
+            bound = score_upper_bound(cv_scores, sum(len(test) for _, test in folds[:len(fitted)]))
+            if threshold is not None and bound < threshold:
+                return {
+                    'pruned': {'folds': len(fitted), 'cv_scores': cv_scores, 'upper_bound': bound,
+                               'threshold': threshold},
+                    'seconds': time.time() - start_time
+                }
+        if not refit:
+            return {'cv_scores': cv_scores, 'seconds': time.time() - start_time}
+
+        y_train_pred = np.empty(len(y_true), dtype=fitted[0][1].dtype)
+        for (_, predictions), (_, test) in zip(fitted, folds):
+            y_train_pred[test] = predictions
+        y_train_fit_pred = None
+        if reuse_folds:
+            model = FoldEnsemble([estimator for estimator, _ in fitted])
+        else:
+            y_train_fit_pred = model.fit(X_train, y_train).predict(X_train)
+        return {
+            'model': model,
+            'cv_scores': cv_scores,
+            'y_train_pred': y_train_pred,
+            'y_train_fit_pred': y_train_fit_pred,
+            'y_test_pred': model.predict(X_test),
+            'y_test_proba': (model.predict_proba(X_test) if hasattr(model, 'predict_proba')
+                             else None),
+            'seconds': time.time() - start_time,
+            'cores': cv_jobs * model_jobs
+        }
+
+
+def score_upper_bound(scores: np.ndarray, n_rows: int) -> float:
+    """Running mean accuracy plus PRUNE_Z standard errors
+
+    The standard error is the larger of the spread between folds and the binomial
+    error of an accuracy measured on n_rows, so a few agreeing folds are not
+    taken as certain.
+    """
+    mean = float(np.mean(scores))
+    spread = float(np.std(scores, ddof=1)) / np.sqrt(len(scores)) if len(scores) > 1 else 0.0
+    binomial = np.sqrt(mean * (1 - mean) / max(n_rows, 1))
+    return mean + PRUNE_Z * max(spread, binomial)
+
+
+def _current_value(value) -> Optional[float]:
+    """A number, or the current content of a shared value; None when unset"""
+    value = getattr(value, 'value', value)
+    return None if value is None or np.isnan(value) else float(value)
+
+
+def _fit_fold(model, X, y, train: np.ndarray, test: np.ndarray) -> Tuple:
+    """Fold task: the model fitted on the train rows and its predictions for the test rows"""
+    model.fit(take_rows(X, train), take_rows(y, train))
+    return model, model.predict(take_rows(X, test))
+
+
+def schedule_training(models: Dict, X_train, y_train, X_test, y_test, cv_folds: int = 5,
+                      n_jobs: Optional[int] = -1, refit: bool = True, reuse_folds: bool = False,
+                      order: Optional[List[str]] = None,
+                      prune_top_k: Optional[int] = None) -> Iterator[Tuple[str, Dict]]:
+    """Train candidate models concurrently within a budget of n_jobs cores
+
+    Yields (name, outcome) as each model finishes, where outcome is the result of
+    train_candidate() or {'error': message}. Jobs run on a process pool; each is
+    granted a fair share of the free cores when it starts, capped by what it can
+    use (cv_folds for models without n_jobs), and the cores held by running jobs
+    never exceed the budget. Fold-parallel models start first since their share
+    is capped; models with n_jobs start last and pick up the cores freed by then.
+    order, cheapest first, overrides this start order.
+    With a single core everything runs in this process, one model after another;
+    n_jobs=None does the same but gives each job every core, as models and CV
+    used them before scheduling existed.
+    Closing the generator early starts no further jobs; running ones finish first.
+
+    With prune_top_k, jobs are pruned (see train_candidate) once they cannot
+    plausibly beat the prune_top_k-th best mean CV score of the finished models.
+    Pool workers read this threshold from a shared value between fold waves, so
+    jobs already running are pruned against models that finish after they
+    started. Starting cheap models first fills this leaderboard before the
+    expensive ones run.
+    """
+    budget = effective_n_jobs(n_jobs)
+    if order is None:
+        # sorted is stable: model order is kept within each group
+        order = sorted(models, key=lambda name: uses_estimator_parallelism(models[name]))
+    pending = [name for name in order if name in models]
+    data = (X_train, y_train, X_test, y_test)
+    leaderboard, shared = [], None
+
+    def threshold() -> Optional[float]:
+        ranked = sorted(leaderboard, reverse=True)
+        return ranked[prune_top_k - 1] if prune_top_k and len(ranked) >= prune_top_k else None
+
+    def options(name: str, cores: int) -> Dict:
+        cv_jobs, model_jobs = job_parallelism(models[name], cores, cv_folds)
+        return {'cv_folds': cv_folds, 'cv_jobs': cv_jobs, 'model_jobs': model_jobs, 'refit': refit,
+                'reuse_folds': reuse_folds,
+                'prune_below': shared if shared is not None else threshold()}
+
+    def record(outcome: Dict) -> Dict:
+        if 'cv_scores' in outcome:
+            leaderboard.append(float(np.mean(outcome['cv_scores'])))
+            if shared is not None and threshold() is not None:
+                shared.value = threshold()
+        return outcome
+
+    if budget == 1 or len(pending) == 1:
+        cores = effective_n_jobs(-1) if n_jobs is None else budget
+        for name in pending:
+            print(f"\n🔄 Training {name.replace('_', ' ').title()}...")
+            try:
+                outcome = train_candidate(models[name], *data, **options(name, cores))
+            except Exception as e:
+                outcome = {'error': str(e)}
+            yield name, record(outcome)
+        return
+
+    free, running = budget, {}
+    with Manager() if prune_top_k else nullcontext() as manager, \
+            ProcessPoolExecutor(max_workers=min(budget, len(pending))) as executor:
+        if manager is not None:
+            shared = manager.Value('d', np.nan)
+        while pending or running:
+            while pending and free > 0:
+                share = max(1, free // len(pending))
+                name = pending.pop(0)
+                cap = budget if uses_estimator_parallelism(models[name]) else cv_folds
+                cores = min(share, cap)
+                print(f"\n🔄 Training {name.replace('_', ' ').title()} on {cores} core(s)...")
+                future = executor.submit(train_candidate, models[name], *data,
+                                         **options(name, cores))
+                running[future] = (name, cores)
+                free -= cores
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, cores = running.pop(future)
+                free += cores
+                try:
+                    outcome = future.result()
+                except Exception as e:
+                    outcome = {'error': str(e)}
+                yield name, record(outcome)
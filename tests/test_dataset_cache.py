@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+from app.storage.dataset_cache import DatasetCache, content_key
+
+
+def _csv_bytes(seed: int, n: int = 200) -> bytes:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({'x': rng.normal(size=n), 'label': rng.choice(['a', 'b'], n)})
+    return df.to_csv(index=False).encode()
+
+
+def test_load_csv_parses_once(tmp_path, monkeypatch):
+    """A repeated upload is served from the columnar copy without re-parsing"""
+    cache = DatasetCache(tmp_path)
+    content = _csv_bytes(0)
+    key, first = cache.load_csv(content)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("cached upload was parsed again")
+    monkeypatch.setattr(pd, 'read_csv', fail)
+    same_key, second = cache.load_csv(content)
+
+    assert key == same_key == content_key(content)
+    pd.testing.assert_frame_equal(first, second)
+    assert cache.get_or_compute(key, 'profile', lambda: {'rows': len(first)}) == {'rows': 200}
+    assert cache.get_or_compute(key, 'profile', fail) == {'rows': 200}
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    """Entries beyond the count limit are dropped oldest-use first"""
+    cache = DatasetCache(tmp_path, max_entries=2)
+    keys = [cache.load_csv(_csv_bytes(seed))[0] for seed in range(2)]
+    cache.get_frame(keys[0])
+    cache.load_csv(_csv_bytes(2))
+
+    assert cache.get_frame(keys[0]) is not None
+    assert cache.get_frame(keys[1]) is None
+
+    cache.max_bytes = 0
+    cache.put_result(keys[0], 'profile', {'rows': 200})
+    assert [entry.name for entry in tmp_path.iterdir()] == [keys[0]]
@@ -0,0 +1,415 @@
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.sparse as sp
+
+from app.preprocessing import column_stats, feature_plan, profiler, text
+
+from app.preprocessing.datetime_detection import detect_datetime_columns, infer_datetime_format
+from app.preprocessing.correlation import compute_correlations, unpack_matrix
+from app.preprocessing.column_stats import (
+    StreamingColumnStats, compute_column_stats, compute_csv_column_stats
+)
+from app.preprocessing.ingest import compact_dtypes
+from app.preprocessing.interactions import screen_interactions
+from app.preprocessing.profiler import AutoFeatureEngineer, DataProfiler
+from app.preprocessing.selection import screen_features
+from app.training.advanced_trainer import AdvancedModelTrainer
+
+
+@pytest.fixture
+def sample_df():
+    rng = np.random.default_rng(0)
+    n = 500
+    df = pd.DataFrame({
+        'amount': rng.normal(100, 15, n),
+        'count': rng.integers(0, 20, n),
+        'segment': rng.choice(['a', 'b', 'c'], n),
+        'signup_date': pd.date_range('2021-01-01', periods=n, freq='h').astype(str),
+        'score': rng.exponential(2.0, n)
+    })
+    df.loc[::9, 'amount'] = np.nan
+    df.loc[::13, 'segment'] = None
+    return df
+
+
+def test_column_stats_match_pandas(sample_df):
+    """Single-pass statistics agree with the per-column pandas equivalents"""
+    stats = compute_column_stats(sample_df)
+
+    for col in stats['numeric_cols']:
+        series = sample_df[col].dropna()
+        col_stats = stats['numeric'][col]
+        assert col_stats['count'] == len(series)
+        assert col_stats['unique_count'] == series.nunique()
+        assert col_stats['median'] == pytest.approx(series.median())
+        assert col_stats['q1'] == pytest.approx(series.quantile(0.25))
+        assert col_stats['std'] == pytest.approx(series.std())
+        assert col_stats['skewness'] == pytest.approx(series.skew())
+        assert col_stats['kurtosis'] == pytest.approx(series.kurtosis())
+
+    assert stats['missing'] == sample_df.isnull().sum().to_dict()
+    assert stats['nunique'] == sample_df.nunique().to_dict()
+    assert stats['categorical']['segment']['most_frequent_count'] == \
+        sample_df['segment'].value_counts().iloc[0]
+
+
+@pytest.mark.parametrize('backend', ['thread', 'process'])
+def test_parallel_column_stats_match_serial(sample_df, monkeypatch, backend):
+    """Column groups computed on a worker pool give the same statistics as the serial pass"""
+    monkeypatch.setattr(column_stats, 'PARALLEL_MIN_CELLS', 0)
+    monkeypatch.setattr(column_stats, 'NUMERIC_BLOCK_CELLS', len(sample_df))
+    serial = compute_column_stats(sample_df)
+    parallel = compute_column_stats(sample_df, n_jobs=2, backend=backend)
+
+    assert parallel['numeric_like_cols'] == serial['numeric_like_cols']
+    assert parallel['categorical'] == serial['categorical']
+    for col, col_stats in serial['numeric'].items():
+        assert parallel['numeric'][col] == pytest.approx(col_stats, nan_ok=True)
+
+
+def test_analyze_dataset_profile_sections(sample_df):
+    """Profile sections and recommendations are built from the shared statistics"""
+    profile = DataProfiler().analyze_dataset(sample_df)
+
+    assert profile['shape'] == sample_df.shape
+    assert profile['unique_counts']['segment'] == 3
+    assert profile['missing_values']['amount'] == sample_df['amount'].isnull().sum()
+    assert 'signup_date' in profile['datetime_cols']
+    assert set(profile['outliers']) == set(profile['numeric_cols'])
+    assert any('missing values' in rec for rec in profile['recommendations'])
+
+
+@pytest.mark.parametrize('method', ['pearson', 'spearman'])
+def test_blockwise_correlations_match_pandas(sample_df, monkeypatch, method):
+    """Blockwise float32 correlations agree with pandas and keep only the strongest pairs"""
+    from app.preprocessing import correlation
+    monkeypatch.setattr(correlation, 'CORRELATION_BLOCK_COLS', 2)
+    df = sample_df.assign(double=sample_df['score'] * 2 + 1, inverse=-sample_df['amount'])
+    if method == 'spearman':
+        # Columns are ranked independently, which matches pandas only without missing values
+        df = df.dropna()
+
+    summary = compute_correlations(df, method, threshold=0.5, top_k=1, include_matrix=True)
+    expected = df.select_dtypes('number').corr(method=method)
+
+    np.testing.assert_allclose(unpack_matrix(summary['matrix']).to_numpy(), expected.to_numpy(), atol=1e-5)
+    assert summary['high_correlation_count'] == 2
+    assert len(summary['high_correlations']) == 1
+    assert abs(summary['high_correlations'][0]['correlation']) == pytest.approx(1.0, abs=1e-5)
+
+
+def test_datetime_format_inference():
+    """One explicit format is inferred per column; identifiers and free text are not datetimes"""
+    dates = pd.Series(pd.date_range('2021-01-01', periods=400, freq='D'))
+    df = pd.DataFrame({
+        'eu': dates.dt.strftime('%d/%m/%Y'),
+        'stamp': dates.dt.strftime('%Y-%m-%d %H:%M:%S'),
+        'mixed': np.where(np.arange(400) % 2, dates.dt.strftime('%Y-%m-%d'), dates.dt.strftime('%b %d, %Y')),
+        'code': np.arange(400).astype(str),
+        'note': np.full(400, 'call back later')
+    })
+
+    assert infer_datetime_format(df['eu']) == '%d/%m/%Y'
+    assert detect_datetime_columns(df) == {'eu': '%d/%m/%Y', 'stamp': '%Y-%m-%d %H:%M:%S', 'mixed': 'mixed'}
+
+
+def test_compact_dtypes_preserve_values(sample_df):
+    """Compaction shrinks the frame without changing values or statistics"""
+    sample_df['note'] = [f'free text {i}' for i in range(len(sample_df))]
+    compact = compact_dtypes(sample_df)
+
+    assert str(compact['count'].dtype) == 'int8'
+    assert isinstance(compact['segment'].dtype, pd.CategoricalDtype)
+    assert pd.api.types.is_datetime64_any_dtype(compact['signup_date'])
+    assert str(compact['note'].dtype) == 'string'
+    assert compact.attrs['compaction']['saved_mb'] > 0
+    pd.testing.assert_series_equal(compact['count'].astype(np.int64), sample_df['count'])
+    pd.testing.assert_series_equal(compact['amount'].astype(np.float64), sample_df['amount'])
+
+    original, compacted = compute_column_stats(sample_df), compute_column_stats(compact)
+    assert compacted['categorical']['segment'] == original['categorical']['segment']
+    memory = DataProfiler()._calculate_memory_usage(compact)
+    assert memory['saved_mb'] > 0 and 'segment' in memory['dtype_conversions']
+
+
+def test_streaming_stats_match_in_memory(sample_df, tmp_path):
+    """Chunked CSV profiling merges to the same statistics as the in-memory pass"""
+    path = tmp_path / 'sample.csv'
+    sample_df.to_csv(path, index=False)
+    expected = compute_column_stats(pd.read_csv(path))
+
+    streamed = compute_csv_column_stats(path, chunksize=64)
+    merged = StreamingColumnStats()
+    for chunk in pd.read_csv(path, chunksize=100):
+        part = StreamingColumnStats()
+        part.update(chunk)
+        merged.merge(part)
+
+    for stats in (streamed, merged.result()):
+        assert stats['n_rows'] == expected['n_rows']
+        assert stats['missing'] == expected['missing']
+        assert stats['nunique'] == expected['nunique']
+        for col, col_stats in expected['numeric'].items():
+            for name in ('mean', 'std', 'min', 'max', 'median', 'skewness', 'kurtosis'):
+                assert stats['numeric'][col][name] == pytest.approx(col_stats[name])
+    pd.testing.assert_frame_equal(merged.correlation_matrix(),
+                                  pd.read_csv(path).select_dtypes('number').corr())
+
+
+def test_update_profile_matches_full_stream(sample_df, tmp_path):
+    """Appending rows to persisted state gives the same profile as streaming everything"""
+    profiler = DataProfiler()
+    path = profiler.profile_state(sample_df.iloc[:300]).save(tmp_path / 'state.pkl')
+
+    updated = profiler.update_profile(StreamingColumnStats.load(path), sample_df.iloc[300:])
+    full = profiler._profile_from_accumulator(profiler.profile_state(sample_df))
+
+    assert updated['shape'] == sample_df.shape
+    assert updated['missing_values'] == full['missing_values']
+    assert updated['unique_counts'] == full['unique_counts']
+    for col, summary in full['statistical_summary']['numeric'].items():
+        assert updated['statistical_summary']['numeric'][col] == pytest.approx(summary)
+
+
+def test_analyze_csv_profile_shape(sample_df, tmp_path):
+    """Streaming profile exposes the same sections as the in-memory profile"""
+    path = tmp_path / 'sample.csv'
+    sample_df.to_csv(path, index=False)
+
+    streamed = DataProfiler().analyze_csv(path, chunksize=100)
+    in_memory = DataProfiler().analyze_dataset(pd.read_csv(path))
+
+    assert set(streamed) == set(in_memory)
+    assert streamed['shape'] == in_memory['shape']
+    assert streamed['datetime_cols'] == in_memory['datetime_cols']
+
+
+def test_approximate_mode_bounds(sample_df):
+    """Sketch-backed profiling and feature engineering stay close to the exact results"""
+    df = sample_df.copy()
+    df['user_id'] = np.arange(len(df)).astype(str)
+
+    exact = DataProfiler().analyze_dataset(df)
+    approx = DataProfiler(mode='approximate', accuracy=0.05).analyze_dataset(df)
+
+    assert set(approx) == set(exact)
+    assert approx['unique_counts']['user_id'] == pytest.approx(len(df), rel=0.1)
+    for col in exact['numeric_cols']:
+        assert approx['statistical_summary']['numeric'][col]['median'] == \
+            pytest.approx(exact['statistical_summary']['numeric'][col]['median'], rel=0.05)
+
+    engineered = AutoFeatureEngineer(mode='approximate').engineer_features(df)
+    assert 'user_id_frequency' in engineered.columns
+    assert (engineered['user_id_frequency'] >= 1).all()
+
+
+def test_fitted_engineer_replays_on_new_batches(sample_df, tmp_path):
+    """transform reproduces fit_transform, survives a save/load round trip and works in a Pipeline"""
+    from sklearn.linear_model import LinearRegression
+    from sklearn.pipeline import make_pipeline
+
+    df = sample_df.assign(target=sample_df['score'] * 2)
+    train, batch = df.iloc[:400], df.iloc[400:].drop(columns='target')
+    engineer = AutoFeatureEngineer()
+    engineered = engineer.fit_transform(train, target_col='target')
+
+    assert 'target_squared' not in engineered.columns
+    pd.testing.assert_frame_equal(engineer.transform(train), engineered)
+    restored = AutoFeatureEngineer.load(engineer.save(str(tmp_path / 'engineer.joblib')))
+    scored = restored.transform(batch.assign(segment='unseen'))
+    assert list(scored.columns) == engineer.feature_names_out_
+    assert 'signup_date' not in scored.columns and 'signup_date_dayofweek' in scored.columns
+    assert not scored.isnull().any().any()
+
+    pipeline = make_pipeline(AutoFeatureEngineer(), LinearRegression())
+    pipeline.fit(train.drop(columns='target'), train['target'])
+    assert len(pipeline.predict(batch)) == len(batch)
+
+
+def test_column_blocks_match_per_column_inserts():
+    """Appending a stage as one block gives the frame per-column inserts and drop/concat gave"""
+    df = pd.DataFrame({
+        'small': np.arange(4, dtype=np.int8),
+        'amount': [1.5, np.nan, 2.0, 3.0],
+        'label': pd.Series(['x', 'y', None, 'z'], dtype='string'),
+        'when': pd.date_range('2020-01-01', periods=4),
+        'flag': [True, False, True, True]
+    })
+    features = {
+        'small_squared': np.square(df['small'].to_numpy(np.float64)),
+        'amount': df['amount'].fillna(0.0),
+        'when_year': df['when'].dt.year,
+        'flag_int': df['flag'].astype(int)
+    }
+    expected = df.copy()
+    for name, values in features.items():
+        expected[name] = values
+    pd.testing.assert_frame_equal(AutoFeatureEngineer._append_features(df.copy(), features), expected)
+
+    encoded = [pd.Series([1, 0, 0, 1], name='label_x', dtype=np.uint8), df['label'].str.len().rename('label_length')]
+    expected = pd.concat([df.drop(columns=['label'])] + encoded, axis=1)
+    pd.testing.assert_frame_equal(AutoFeatureEngineer._concat_columns([df] + encoded, drop=['label']), expected)
+    assert list(AutoFeatureEngineer._select_columns(df, [np.number])) == ['small', 'amount']
+
+
+def test_selected_features_are_computed_from_their_sources_only(sample_df):
+    """After select_features, transform evaluates just the requested plan nodes"""
+    engineer = AutoFeatureEngineer()
+    engineered = engineer.fit_transform(sample_df)
+    assert 'amount_x_count' in engineer.feature_plan_ and 'float(amount)' in engineer.feature_plan_
+
+    wanted = ['amount_squared', 'amount_x_count', 'signup_date_dayofweek', 'segment_b']
+    engineer.select_features(wanted)
+    scored = engineer.transform(sample_df[['signup_date', 'count', 'segment', 'amount']])
+
+    assert list(scored.columns) == [col for col in engineered.columns if col in wanted]
+    pd.testing.assert_frame_equal(scored, engineered[scored.columns])
+    with pytest.raises(ValueError):
+        engineer.transform(sample_df[['amount', 'count']])
+    assert engineer.select_features(None).get_feature_names_out().tolist() == list(engineered.columns)
+
+
+def test_chunked_engineering_matches_in_memory_transform(sample_df, tmp_path):
+    """fit_chunked learns fill values from every chunk; transform_chunked writes partitions equal to transform"""
+    df = sample_df.assign(target=sample_df['score'] * 2)
+    df.to_csv(tmp_path / 'data.csv', index=False)
+    engineer = AutoFeatureEngineer().fit_chunked(str(tmp_path / 'data.csv'), target_col='target',
+                                                 chunksize=120, sample_rows=200)
+    assert engineer.fill_values_['amount'] == pytest.approx(df['amount'].median())
+    assert engineer.category_encodings_['segment']['categories'] == ['a', 'b', 'c']
+
+    written = engineer.transform_chunked(str(tmp_path / 'data.csv'), str(tmp_path / 'out'), chunksize=120)
+    assert len(written['partitions']) == 5 and written['n_rows'] == len(df)
+    expected = engineer.transform(pd.read_csv(tmp_path / 'data.csv'))
+    pd.testing.assert_frame_equal(pd.read_parquet(tmp_path / 'out'), expected, check_dtype=False)
+    with pytest.raises(ValueError):
+        engineer.transform_chunked(str(tmp_path / 'data.csv'), str(tmp_path / 'out'))
+
+
+@pytest.mark.parametrize('backend', ['thread', 'process'])
+def test_parallel_feature_engineering_matches_serial(sample_df, monkeypatch, backend):
+    """Per-column stages and plan evaluation on a worker pool give exactly the serial output"""
+    monkeypatch.setattr(profiler, 'PARALLEL_MIN_CELLS', 0)
+    monkeypatch.setattr(feature_plan, 'PARALLEL_MIN_CELLS', 0)
+    df = sample_df.assign(target=sample_df['score'] * 2)
+    serial = AutoFeatureEngineer()
+    expected = serial.fit_transform(df, target_col='target')
+
+    engineer = AutoFeatureEngineer(n_jobs=2, backend=backend)
+    pd.testing.assert_frame_equal(engineer.fit_transform(df, target_col='target'), expected)
+    assert engineer.clip_bounds_ == serial.clip_bounds_
+    pd.testing.assert_frame_equal(engineer.transform(df), serial.transform(df))
+
+
+def test_interaction_screening_finds_late_pairs():
+    """Pairs are screened over every numeric column, not just the first few"""
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(2000, 30)), columns=[f'x{i}' for i in range(30)])
+    df['target'] = df['x2'] + df['x20'] * df['x27'] + 0.1 * rng.normal(size=len(df))
+
+    screening = screen_interactions(df.drop(columns='target'), df['target'], top_k=3)
+    assert screening['pairs'][0][:2] == ('x20', 'x27')
+    assert screening['screened_pairs'] == 30 * 29 // 2 and screening['complete']
+    assert not screen_interactions(df.drop(columns='target'), df['target'], time_budget=0)['complete']
+
+    engineered = AutoFeatureEngineer(max_interactions=3).engineer_features(df, target_col='target')
+    assert 'x20_x_x27' in engineered.columns and 'x0_x_x1' not in engineered.columns
+
+
+@pytest.mark.parametrize('arrow', [True, False])
+def test_text_kernels_match_python_string_methods(monkeypatch, arrow):
+    """Tokenized kernels agree with str.split and ASCII regex counts on both backends, non-ASCII input included"""
+    monkeypatch.setattr(text, 'ARROW_TEXT_AVAILABLE', arrow and text.ARROW_TEXT_AVAILABLE)
+    values = pd.Series(['  a  b a\tc ', '', 'x', None, 'dé f dé', 'Hello World 42!', '   ', '٣ x\u3000y'] * 3)
+    words = values.astype(str).str.split()
+    rendered = text.as_text(values)
+    tokens = text.tokenize(rendered)
+    assert text.word_counts(tokens).tolist() == words.str.len().tolist()
+    assert text.unique_word_counts(tokens).tolist() == [len(set(w)) for w in words]
+    assert np.allclose(text.mean_word_lengths(tokens), [np.mean([len(t) for t in w]) if w else 0 for w in words])
+    for stat, pattern in text.TEXT_PATTERNS.items():
+        assert text.character_counts(rendered, pattern).tolist() == \
+            [len(re.findall(pattern, value)) for value in values.astype(str)], stat
+
+
+def test_feature_screening_drops_redundant_and_weak_features(sample_df):
+    """Constant, duplicate and near-duplicate columns go first; the strongest features are kept"""
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(2000, 40)), columns=[f'x{i}' for i in range(40)])
+    df = df.assign(copy=df['x3'], near=df['x7'] + 0.01 * rng.normal(size=len(df)), const=1.0)
+    y = (df['x3'] + df['x7'] - df['x30'] > 0).astype(int)
+
+    screening = screen_features(df, y, max_features=3)
+    kept, pruned = ('x7', 'near') if 'x7' in screening['selected'] else ('near', 'x7')
+    assert sorted(screening['selected']) == sorted(['x3', 'x30', kept])
+    assert screening['dropped']['constant'] == ['const']
+    assert screening['dropped']['duplicate'] == {'copy': 'x3'}
+    assert screening['dropped']['correlated'] == {pruned: kept}
+    assert screening['complete'] and screening['training_time']['saving'] > 0
+
+    target = sample_df.assign(target=sample_df['score'] * 2)
+    engineer = AutoFeatureEngineer(max_features=5)
+    engineered = engineer.fit_transform(target, target_col='target')
+    assert engineer.feature_selection_['n_selected'] == 5
+    assert len(engineered.select_dtypes(include=[np.number]).columns) == 5 + 1
+    pd.testing.assert_frame_equal(engineer.transform(target), engineered)
+
+
+def test_sparse_output_keeps_one_hot_levels_sparse(sample_df):
+    """Medium-cardinality columns become CSR indicators; unseen levels land in the missing column"""
+    df = sample_df.assign(store=[f's{i % 40}' for i in range(len(sample_df))])
+    engineer = AutoFeatureEngineer(sparse_output=True)
+    matrix = engineer.fit_transform(df)
+    names = engineer.get_feature_names_out().tolist()
+
+    assert sp.isspmatrix_csr(matrix) and matrix.shape == (len(df), len(names))
+    store = [i for i, name in enumerate(names) if name.startswith('store_')]
+    assert len(store) == 40 + 1 and names[store[-1]] == 'store_nan'
+    assert (matrix[:, store].sum(axis=1) == 1).all()
+    assert (engineer.transform(df) != matrix).nnz == 0
+
+    unseen = df.head(3).assign(store='new')
+    assert engineer.transform(unseen)[:, store[-1]].toarray().ravel().tolist() == [1.0, 1.0, 1.0]
+
+    results = AdvancedModelTrainer().train_multiple_models(matrix, (df['score'] > 2).astype(int), cv_folds=2,
+                                                          feature_names=names)
+    assert results['naive_bayes']['status'] == 'skipped'
+    assert results['logistic_regression']['status'] == 'success'
+
+
+def test_hashing_encodes_unseen_values_without_refit(sample_df, monkeypatch):
+    """High-cardinality columns hash to a fixed set of signed buckets, dense or sparse"""
+    df = sample_df.assign(user=[f'u{i}' for i in range(len(sample_df))])
+    engineer = AutoFeatureEngineer(hash_buckets=16)
+    engineered = engineer.fit_transform(df)
+    buckets = [f'user_hash_{k}' for k in range(16)]
+
+    assert engineer.category_encodings_['user']['strategy'] == 'hashing'
+    assert (engineered[buckets].abs().sum(axis=1) == 1).all()
+    assert set(np.unique(engineered[buckets])) == {-1.0, 0.0, 1.0}
+    unseen = engineer.transform(df.head(2).assign(user='new'))[buckets].to_numpy()
+    assert (unseen[0] == unseen[1]).all() and np.abs(unseen).sum() == 2
+
+    monkeypatch.setattr(profiler, 'SPARSE_ONE_HOT_MAX_LEVELS', 100)
+    sparse = AutoFeatureEngineer(hash_buckets=16, sparse_output=True)
+    matrix = sparse.fit_transform(df)
+    names = sparse.get_feature_names_out().tolist()
+    assert matrix.shape[1] == len(names) and names[-16:] == buckets
+    assert np.allclose(matrix[:, -16:].toarray(), engineered[buckets].to_numpy())
+
+
+def test_quick_profile_bounds_contain_truth(sample_df):
+    """Sampled profile flags itself as an estimate and its intervals cover the full-data values"""
+    df = pd.concat([sample_df] * 20, ignore_index=True)
+    quick = DataProfiler().quick_profile(df, sample_size=2000)
+    intervals = quick['confidence_intervals']
+
+    assert quick['is_estimate'] and quick['shape'] == df.shape
+    missing = intervals['missing_percentage']['amount']
+    assert missing['lower'] <= df['amount'].isnull().mean() * 100 <= missing['upper']
+    median = intervals['median']['score']
+    assert median['lower'] <= df['score'].median() <= median['upper']
+    assert intervals['unique_counts']['segment']['estimate'] == 3
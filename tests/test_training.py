@@ -0,0 +1,221 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.sparse as sp
+from sklearn.datasets import make_classification
+from sklearn.dummy import DummyClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import StratifiedKFold, cross_val_score, train_test_split
+from sklearn.preprocessing import StandardScaler
+
+from app.training.advanced_trainer import AdvancedModelTrainer
+from app.training.cost_model import COST_MIN_ROWS, CostModel
+from app.training.ensemble import FoldEnsemble
+from app.training.halving import successive_halving
+from app.training.scheduler import PRUNE_MIN_FOLDS, job_parallelism, schedule_training, score_upper_bound
+
+
+class SlowConstantClassifier(DummyClassifier):
+    """Constant predictions from fits slow enough to still be running when quick models finish"""
+
+    def fit(self, X, y, sample_weight=None):
+        time.sleep(0.5)
+        return super().fit(X, y, sample_weight)
+
+
+@pytest.fixture
+def classification_data():
+    X, y = make_classification(n_samples=400, n_features=8, random_state=0)
+    return pd.DataFrame(X, columns=[f'f{i}' for i in range(8)]), y
+
+
+def test_scheduled_training_matches_serial(classification_data):
+    """Concurrent jobs give the same results, in the same order, as one-by-one training"""
+    X, y = classification_data
+    names = ['random_forest', 'logistic_regression', 'naive_bayes', 'knn']
+    runs = {}
+    for n_jobs in (1, 2):
+        trainer = AdvancedModelTrainer()
+        trainer.models = {name: trainer.models[name] for name in names}
+        runs[n_jobs] = trainer.train_multiple_models(X, y, cv_folds=3, n_jobs=n_jobs)
+
+    assert list(runs[2]) == names
+    for name in names:
+        serial, scheduled = runs[1][name]['metrics'], runs[2][name]['metrics']
+        assert runs[2][name]['status'] == 'success'
+        assert scheduled['cv_scores'] == serial['cv_scores']
+        assert scheduled['test_accuracy'] == serial['test_accuracy']
+
+    rf, svc = AdvancedModelTrainer().models['random_forest'], AdvancedModelTrainer().models['svm_rbf']
+    assert job_parallelism(rf, 4, 5) == (1, 4) and job_parallelism(svc, 8, 5) == (5, 1)
+
+
+def test_default_training_gives_each_model_every_core(classification_data, monkeypatch):
+    """n_jobs=None trains models one by one in this process, each with the whole machine"""
+    monkeypatch.setattr(os, 'cpu_count', lambda: 4)
+    X, y = classification_data
+    models = {name: AdvancedModelTrainer().models[name] for name in ['random_forest', 'naive_bayes']}
+    outcomes = dict(schedule_training(models, X, y, X, y, cv_folds=3, n_jobs=None))
+
+    assert outcomes['random_forest']['cores'] == 4 and outcomes['random_forest']['model'].n_jobs == 4
+    assert outcomes['naive_bayes']['cores'] == 3
+    assert dict(schedule_training(models, X, y, X, y, cv_folds=3, n_jobs=1))['random_forest']['cores'] == 1
+
+
+def test_successive_halving_promotes_best_models_within_budget(classification_data):
+    """Weak models are eliminated on small subsamples; survivors get full CV on the rows that fit"""
+    X, y = classification_data
+    trainer = AdvancedModelTrainer()
+    trainer.models = {name: trainer.models[name] for name in
+                      ['logistic_regression', 'ridge_classifier', 'naive_bayes', 'knn', 'random_forest']}
+    halving = successive_halving(trainer.models, X, y, time_budget=600, n_jobs=1, eta=2, min_rows=100)
+
+    assert [rung['rows'] for rung in halving['rungs']] == [100, 200]
+    assert len(halving['survivors']) == 2 and halving['final_rows'] is None
+    assert set(halving['survivors']) | set(halving['eliminated']) == set(trainer.models)
+    first = halving['rungs'][0]['scores']
+    assert all(first[name] <= min(first[kept] for kept in halving['survivors']) for name in halving['eliminated']
+               if halving['eliminated'][name]['rows'] == 100)
+
+    # Training splits smaller than the first rung give every model full CV
+    results = trainer.train_multiple_models(X, y, cv_folds=3, n_jobs=1, time_budget=600)
+    assert list(results) == list(trainer.models)
+    assert all(result['status'] == 'success' for result in results.values())
+    assert trainer.halving['rungs'] == [] and trainer.halving['final_rows'] is None
+
+
+def test_fold_models_give_out_of_fold_scores_and_an_ensemble(classification_data):
+    """Out-of-fold predictions give the CV scores; reused fold models replace the refit"""
+    X, y = classification_data
+    names = ['logistic_regression', 'ridge_classifier']
+    runs = {}
+    for reuse in (False, True):
+        trainer = AdvancedModelTrainer()
+        trainer.models = {name: trainer.models[name] for name in names}
+        runs[reuse] = trainer.train_multiple_models(X, y, cv_folds=4, n_jobs=1, reuse_fold_models=reuse)
+
+    X_train, _, y_train, _ = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+    expected = cross_val_score(LogisticRegression(random_state=42, max_iter=1000, solver='liblinear'),
+                               StandardScaler().fit(X).transform(X_train), y_train,
+                               cv=StratifiedKFold(n_splits=4, shuffle=True, random_state=42))
+    refit, reused = runs[False]['logistic_regression'], runs[True]['logistic_regression']
+    assert np.allclose(refit['metrics']['cv_scores'], expected)
+    assert refit['metrics']['train_accuracy'] == pytest.approx(np.mean(expected), abs=0.01)
+    assert reused['metrics']['cv_scores'] == refit['metrics']['cv_scores']
+
+    assert isinstance(reused['model'], FoldEnsemble) and len(reused['model'].estimators) == 4
+    assert reused['metrics']['test_accuracy'] == pytest.approx(refit['metrics']['test_accuracy'], abs=0.05)
+    assert runs[True]['ridge_classifier']['status'] == 'success'
+    assert 'top_features' in reused['feature_importance']
+
+
+def test_overfitting_check_compares_in_sample_and_test_accuracy():
+    """Out-of-fold train_accuracy is held out, so the train-test gap uses in-sample accuracy"""
+    X, y = make_classification(n_samples=400, n_features=8, flip_y=0.3, random_state=0)
+    trainer = AdvancedModelTrainer()
+    trainer.models = {name: trainer.models[name] for name in ['random_forest', 'logistic_regression']}
+    results = trainer.train_multiple_models(pd.DataFrame(X), y, cv_folds=4, n_jobs=1)
+
+    forest = results['random_forest']['metrics']
+    assert forest['in_sample_accuracy'] - forest['test_accuracy'] > 0.1
+    assert abs(forest['train_accuracy'] - forest['test_accuracy']) < 0.1
+    assert "random_forest shows signs of overfitting" in ' '.join(trainer.get_model_recommendations(results))
+
+    # Fold models each saw part of the rows: no in-sample score, so no verdict either way
+    reused = trainer.train_multiple_models(pd.DataFrame(X), y, cv_folds=4, n_jobs=1, reuse_fold_models=True)
+    assert 'in_sample_accuracy' not in reused['random_forest']['metrics']
+    verdicts = ' '.join(trainer.get_model_recommendations(reused))
+    assert 'overfitting' not in verdicts and 'generalization' not in verdicts
+
+
+def test_reused_fold_models_leave_the_trainer_retrainable(classification_data):
+    """The FoldEnsemble goes to the results only, so the same trainer can train again"""
+    X, y = classification_data
+    trainer = AdvancedModelTrainer()
+    trainer.models = {name: trainer.models[name] for name in ['random_forest', 'logistic_regression']}
+    for _ in range(2):
+        results = trainer.train_multiple_models(X, y, cv_folds=3, n_jobs=1, reuse_fold_models=True)
+        assert all(result['status'] == 'success' for result in results.values())
+        assert isinstance(results['random_forest']['model'], FoldEnsemble)
+    assert not isinstance(trainer.models['random_forest'], FoldEnsemble)
+
+
+def test_hopeless_models_are_pruned_between_folds(classification_data):
+    """A model far below the leaderboard stops after the first folds and is reported as pruned"""
+    X, y = classification_data
+    trainer = AdvancedModelTrainer()
+    trainer.models = {name: trainer.models[name] for name in ['logistic_regression', 'naive_bayes', 'random_forest']}
+    trainer.models['constant'] = DummyClassifier(strategy='constant', constant=0)
+    results = trainer.train_multiple_models(X, y, cv_folds=5, n_jobs=1, prune_top_k=2)
+
+    assert list(results) == ['logistic_regression', 'naive_bayes', 'random_forest', 'constant']
+    assert results['constant']['status'] == 'pruned'
+    pruning = results['constant']['pruning']
+    assert pruning['folds'] == PRUNE_MIN_FOLDS and pruning['upper_bound'] < pruning['threshold']
+    assert all(results[name]['status'] == 'success' for name in ['logistic_regression', 'naive_bayes', 'random_forest'])
+
+    assert score_upper_bound(np.array([0.5, 0.5]), 100) == pytest.approx(0.6)
+
+    # On a pool, a job started before any model finished is pruned against the live leaderboard
+    trainer.models = {'logistic_regression': trainer.models['logistic_regression'],
+                      'slow_constant': SlowConstantClassifier(strategy='constant', constant=0)}
+    results = trainer.train_multiple_models(X, y, cv_folds=5, n_jobs=2, prune_top_k=1)
+    assert results['logistic_regression']['status'] == 'success'
+    assert results['slow_constant']['status'] == 'pruned'
+    leader = results['logistic_regression']['metrics']['cv_mean_accuracy']
+    assert results['slow_constant']['pruning']['threshold'] == pytest.approx(leader)
+
+
+def test_cost_model_swaps_subsamples_or_skips_expensive_models(classification_data, tmp_path):
+    """Models predicted over budget get a faster stand-in, fewer rows or no run; runs calibrate the costs"""
+    costs = CostModel()
+    trainer = AdvancedModelTrainer()
+    budget = costs.job_seconds('gradient_boosting', 50_000, 20, 5) / 2
+    plan = costs.plan({name: trainer.models[name] for name in ['gradient_boosting', 'knn', 'naive_bayes']},
+                      50_000, 20, 5, time_budget=budget, equivalents=trainer._fast_equivalents())
+    assert plan['gradient_boosting']['action'] == 'swap'
+    assert plan['gradient_boosting']['cost_name'] == 'hist_gradient_boosting'
+    assert plan['naive_bayes']['action'] == 'train'
+    budget = costs.job_seconds('knn', 5_000, 20, 5)
+    tight = costs.plan({'knn': trainer.models['knn']}, 50_000, 20, 5, time_budget=budget)
+    assert tight['knn']['action'] == 'subsample' and COST_MIN_ROWS <= tight['knn']['rows'] < 50_000
+    assert tight['knn']['model'].max_rows == tight['knn']['rows']
+
+    costs.record('knn', 10_000, 20, 5, 2 * costs.job_seconds('knn', 10_000, 20, 5))
+    assert costs.calibration('knn') == pytest.approx(2.0) and costs.calibration('svm_rbf') == pytest.approx(2.0)
+    # A job on four cores is recorded in core-seconds, so the core count does not change the calibration
+    costs.record('svm_rbf', 10_000, 20, 5, costs.job_seconds('svm_rbf', 10_000, 20, 5, calibrated=False) / 2,
+                 cores=4)
+    assert costs.calibration('svm_rbf') == pytest.approx(2.0)
+
+    X, y = classification_data
+    path = str(tmp_path / 'costs.joblib')
+    trainer = AdvancedModelTrainer(cost_model_path=path)
+    trainer.models = {name: trainer.models[name] for name in ['naive_bayes', 'svm_rbf']}
+    results = trainer.train_multiple_models(X, y, cv_folds=5, n_jobs=1, model_time_budget=0.005)
+    assert results['naive_bayes']['status'] == 'success'
+    assert results['svm_rbf']['status'] == 'skipped' and results['svm_rbf']['cost']['action'] == 'skip'
+    assert list(CostModel.load(path).history) == ['naive_bayes']
+
+
+def test_cost_model_keeps_sparse_input_off_dense_only_stand_ins(classification_data):
+    """With sparse X, gradient boosting is subsampled or skipped instead of swapped for HistGradientBoosting"""
+    X, y = classification_data
+    costs = CostModel()
+    budget = costs.job_seconds('gradient_boosting', 320, 8, 5) / 4
+    runs = {}
+    for sparse in (False, True):
+        # A fresh trainer each time, so the first run does not calibrate the costs of the second
+        trainer = AdvancedModelTrainer()
+        trainer.models = {name: trainer.models[name] for name in ['gradient_boosting', 'logistic_regression']}
+        data = sp.csr_matrix(X.to_numpy()) if sparse else X
+        runs[sparse] = trainer.train_multiple_models(data, y, cv_folds=5, n_jobs=1, model_time_budget=budget)
+    assert runs[False]['gradient_boosting']['cost']['action'] == 'swap'
+
+    results = runs[True]
+    assert results['gradient_boosting']['status'] == 'skipped'
+    assert results['gradient_boosting']['cost']['cost_name'] == 'gradient_boosting'
+    assert results['logistic_regression']['status'] == 'success'